@@ -5,6 +5,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from utils.export import export_users_csv
 
 from .admin_utils import change_user_role, get_user_role, ban_users, unban_users
+from .models import GazetteerEntry, GeocodeCache
 
 User = get_user_model()
 
@@ -75,3 +76,18 @@ class UserAdmin(BaseUserAdmin):
     def unban_selected_users(self, request, queryset):
         count = unban_users(queryset)
         self.message_user(request, f'Successfully unbanned {count} user(s).')
+
+
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ['address', 'status', 'latitude', 'longitude', 'expires_at']
+    list_filter = ['status']
+    search_fields = ['address']
+    readonly_fields = ['address_hash', 'updated_at']
+
+
+@admin.register(GazetteerEntry)
+class GazetteerEntryAdmin(admin.ModelAdmin):
+    list_display = ['zip_code', 'city', 'state', 'latitude', 'longitude']
+    list_filter = ['state']
+    search_fields = ['zip_code', 'city']
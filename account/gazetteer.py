@@ -0,0 +1,181 @@
+"""
+Offline gazetteer of US ZIP code and city/state centroids.
+
+Approximate locations (no street address, or privacy mode) are resolved
+from GazetteerEntry without calling the geocoding API; places it does not
+know stay unresolved. The table is loaded after migrate when empty, and by
+`manage.py load_gazetteer`, from the files named by the GAZETTEER_FILES
+setting, or the small bundled account/data/gazetteer.csv when none are
+set. Production should point GAZETTEER_FILES at the Census Bureau
+Gazetteer files for ZCTAs and places (the tab-separated
+*_Gaz_zcta_national.txt and *_Gaz_place_national.txt), which cover every
+US ZIP code and city and are read as published.
+
+The bundled CSV columns are zip_code, city, state, latitude and longitude;
+city rows leave zip_code empty.
+"""
+import csv
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import GazetteerEntry, Location, normalize_location_part
+
+GAZETTEER_CSV = os.path.join(os.path.dirname(__file__), "data", "gazetteer.csv")
+
+US_COUNTRY_NAMES = {"", "us", "usa", "u.s.", "u.s.a.", "united states", "united states of america"}
+
+US_STATE_CODES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "district of columbia": "dc",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il",
+    "indiana": "in", "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la",
+    "maine": "me", "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd",
+    "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va",
+    "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+}
+
+Point = Tuple[float, float]
+
+
+def normalize_state(state) -> str:
+    """Two-letter lowercase code for a US state name or code."""
+    state = normalize_location_part(state).replace(".", "")
+    return US_STATE_CODES.get(state, state)
+
+
+def normalize_zip(zip_code) -> str:
+    """Five-digit ZIP code, or "" when there is none."""
+    match = re.match(r"\s*(\d{5})", zip_code or "")
+    return match.group(1) if match else ""
+
+
+# Legal/statistical area descriptions the Census appends to place names
+PLACE_SUFFIX_RE = re.compile(
+    r"\s+(?:\(balance\)|city and borough|city|town|township|village|borough|municipality|cdp|"
+    r"(?:consolidated|metropolitan|unified) government|urban county|comunidad|zona urbana)$"
+)
+
+
+def gazetteer_files() -> List[str]:
+    """Files named by the GAZETTEER_FILES setting, or the bundled CSV."""
+    return list(getattr(settings, "GAZETTEER_FILES", None) or [GAZETTEER_CSV])
+
+
+def place_name(name) -> str:
+    """Normalized city name from a Census place name such as "Atlanta city"."""
+    name = normalize_location_part(name)
+    while True:
+        stripped = PLACE_SUFFIX_RE.sub("", name)
+        if stripped == name:
+            return name
+        name = stripped
+
+
+def read_gazetteer(path: str) -> Iterator[GazetteerEntry]:
+    """
+    Entries from one gazetteer file.
+
+    Reads the bundled CSV layout, the Census ZCTA gazetteer (GEOID is the
+    ZIP code) and the Census places gazetteer (USPS state code and NAME),
+    telling them apart by their header.
+    """
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        delimiter = "\t" if "\t" in f.readline() else ","
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter=delimiter)
+        # Census headers carry trailing spaces on the last column
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        fields = set(reader.fieldnames)
+        for row in reader:
+            if "latitude" in fields:
+                zip_code, city, state = row.get("zip_code"), row.get("city"), row.get("state")
+                latitude, longitude = row["latitude"], row["longitude"]
+            elif "usps" in fields:
+                zip_code, city, state = "", place_name(row["name"]), row["usps"]
+                latitude, longitude = row["intptlat"], row["intptlong"]
+            elif "geoid" in fields:
+                zip_code, city, state = row["geoid"], "", ""
+                latitude, longitude = row["intptlat"], row["intptlong"]
+            else:
+                raise ValueError(f"{path} is not a recognized gazetteer file")
+            yield GazetteerEntry(
+                zip_code=normalize_zip(zip_code),
+                city=normalize_location_part(city),
+                state=normalize_state(state),
+                latitude=float(latitude),
+                longitude=float(longitude),
+            )
+
+
+def load_gazetteer(paths=None, batch_size: int = 1000) -> int:
+    """
+    Replace the gazetteer table with the entries of one or more files.
+
+    Args:
+        paths: A path or list of paths; defaults to gazetteer_files()
+
+    Returns:
+        Number of entries loaded
+    """
+    if paths is None:
+        paths = gazetteer_files()
+    elif isinstance(paths, str):
+        paths = [paths]
+    entries = [entry for path in paths for entry in read_gazetteer(path)]
+    with transaction.atomic():
+        GazetteerEntry.objects.all().delete()
+        GazetteerEntry.objects.bulk_create(entries, batch_size=batch_size)
+    Location.refresh_centroids()
+    return len(entries)
+
+
+def lookup_centroids(addresses: Iterable[tuple]) -> Dict[tuple, Optional[Point]]:
+    """
+    Resolve (city, state, zip_code, country) tuples to centroids in two queries.
+
+    A ZIP code, when given, takes precedence over the city/state pair.
+    Addresses outside the US, or not in the gazetteer, map to None.
+    """
+    keys = {}
+    for address in addresses:
+        city, state, zip_code, country = address
+        if normalize_location_part(country) not in US_COUNTRY_NAMES:
+            keys[address] = None
+            continue
+        keys[address] = (normalize_zip(zip_code), normalize_location_part(city), normalize_state(state))
+
+    zip_codes = {key[0] for key in keys.values() if key and key[0]}
+    cities = {key[1] for key in keys.values() if key and key[1] and key[2]}
+    states = {key[2] for key in keys.values() if key and key[1] and key[2]}
+
+    by_zip = {}
+    if zip_codes:
+        rows = GazetteerEntry.objects.filter(zip_code__in=zip_codes)
+        by_zip = {row[0]: row[1:] for row in rows.values_list("zip_code", "latitude", "longitude")}
+    by_city = {}
+    if cities:
+        rows = GazetteerEntry.objects.filter(zip_code="", city__in=cities, state__in=states)
+        by_city = {(row[0], row[1]): row[2:] for row in rows.values_list("city", "state", "latitude", "longitude")}
+
+    results = {}
+    for address, key in keys.items():
+        if key is None:
+            results[address] = None
+            continue
+        zip_code, city, state = key
+        results[address] = by_zip.get(zip_code) or by_city.get((city, state))
+    return results
+
+
+def lookup_centroid(city="", state="", zip_code="", country="") -> Optional[Point]:
+    """Centroid of a ZIP code or city/state pair, or None if unknown."""
+    address = (city, state, zip_code, country)
+    return lookup_centroids([address])[address]
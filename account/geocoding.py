@@ -0,0 +1,441 @@
+"""
+Geocoding providers with a persistent, shared result cache.
+
+Both account.utils.geocode_applicant_address and job.utils.geocode_address
+build an address string and resolve it here. Results are stored in
+GeocodeCache under a hash of the normalized address, so identical addresses
+across accounts and job postings cost one API call per TTL. Definitive
+failures (no results, invalid address) are cached for a shorter time;
+transport errors and quota or key problems are never cached.
+
+Lookups that miss the cache go to the provider named by the
+GEOCODING_PROVIDER setting: GoogleGeocodingProvider (a pooled session,
+bounded retries with backoff and a circuit breaker) or the offline
+StubGeocodingProvider used by tests and benchmarks.
+
+Only street addresses are sent to the provider: approximate locations are
+resolved offline from the gazetteer (see account.gazetteer). geocode_rows
+resolves a batch of rows, using a rate-limited thread pool for the
+geocode_addresses and geocode_worker commands.
+"""
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+GEOCODE_TIMEOUT = 5
+
+# Statuses that will not change on retry and are safe to cache as failures
+CACHEABLE_FAILURES = {"ZERO_RESULTS", "INVALID_REQUEST"}
+
+# Statuses worth retrying after a short backoff
+RETRYABLE_STATUSES = {"ERROR", "OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+DEFAULT_PROVIDER = "account.geocoding.GoogleGeocodingProvider"
+
+
+def normalize_address(address: str) -> str:
+    """Lowercase, collapse whitespace and tidy commas so spellings compare equal."""
+    address = re.sub(r"\s*,\s*", ", ", (address or "").lower())
+    return " ".join(address.split()).strip(" ,")
+
+
+def address_hash(address: str) -> str:
+    """SHA-256 hex digest of the normalized address."""
+    return hashlib.sha256(normalize_address(address).encode()).hexdigest()
+
+
+def get_cache_ttl(status: str) -> timedelta:
+    """Cache lifetime for a result: GEOCODE_CACHE_TTL, or GEOCODE_NEGATIVE_TTL for failures."""
+    if status == "OK":
+        return timedelta(seconds=getattr(settings, "GEOCODE_CACHE_TTL", 90 * 24 * 3600))
+    return timedelta(seconds=getattr(settings, "GEOCODE_NEGATIVE_TTL", 24 * 3600))
+
+
+def is_definitive(status: str) -> bool:
+    """Whether a status is a final answer for the address rather than an outage."""
+    return status in ("OK", "CACHED") or status in CACHEABLE_FAILURES
+
+
+class GeocodingProvider:
+    """
+    Interface for geocoding backends.
+
+    geocode() returns (latitude, longitude, status) where status is "OK", a
+    definitive failure such as "ZERO_RESULTS", or a transient failure such as
+    "ERROR" (request failed) or "UNAVAILABLE" (circuit breaker open).
+    """
+
+    configured = True
+
+    def geocode(self, full_address: str) -> Tuple[Optional[float], Optional[float], str]:
+        raise NotImplementedError
+
+
+class CircuitBreaker:
+    """
+    Stops calls after `threshold` consecutive failures.
+
+    Once open, calls are refused for `reset_after` seconds; the next call is
+    then let through as a trial and closes the breaker if it succeeds.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 60.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_after:
+                # Half-open: let one trial call through
+                self.opened_at = None
+                self.failures = self.threshold - 1
+                return True
+            return False
+
+    def record(self, success: bool) -> None:
+        with self.lock:
+            if success:
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class GoogleGeocodingProvider(GeocodingProvider):
+    """Google Geocoding API over one pooled requests.Session."""
+
+    def __init__(self, api_key=None, timeout=GEOCODE_TIMEOUT, retries=2, backoff=0.5,
+                 failure_threshold=5, reset_after=60.0, pool_size=16):
+        self.api_key = settings.GOOGLE_MAPS_API_KEY if api_key is None else api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_after)
+        self.session = requests.Session()
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def request(self, full_address: str) -> Tuple[Optional[float], Optional[float], str]:
+        """Make a single API call; status is "ERROR" when the request itself failed."""
+        params = {"address": full_address, "key": self.api_key}
+        try:
+            response = self.session.get(GEOCODE_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error geocoding address '{full_address}': {e}")
+            return None, None, "ERROR"
+
+        status = data.get("status") or "ERROR"
+        if status == "OK" and data.get("results"):
+            location = data["results"][0]["geometry"]["location"]
+            return location["lat"], location["lng"], status
+        return None, None, "ZERO_RESULTS" if status == "OK" else status
+
+    def geocode(self, full_address: str) -> Tuple[Optional[float], Optional[float], str]:
+        if not self.breaker.allow():
+            return None, None, "UNAVAILABLE"
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            latitude, longitude, status = self.request(full_address)
+            if status not in RETRYABLE_STATUSES:
+                break
+        self.breaker.record(is_definitive(status))
+        return latitude, longitude, status
+
+
+class StubGeocodingProvider(GeocodingProvider):
+    """
+    Offline provider for tests and benchmarks.
+
+    Addresses listed in `results` (normalized address -> (lat, lng), or None
+    for no results) are answered from it; any other address gets stable
+    pseudo-random coordinates inside the continental US. `latency` adds a
+    delay per call to imitate a remote API.
+    """
+
+    def __init__(self, results=None, latency=0.0):
+        self.results = {normalize_address(address): point for address, point in (results or {}).items()}
+        self.latency = latency
+        self.calls = 0
+
+    def geocode(self, full_address: str) -> Tuple[Optional[float], Optional[float], str]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        key = normalize_address(full_address)
+        if key in self.results:
+            if self.results[key] is None:
+                return None, None, "ZERO_RESULTS"
+            latitude, longitude = self.results[key]
+            return latitude, longitude, "OK"
+        digest = hashlib.sha256(key.encode()).digest()
+        latitude = 25.0 + int.from_bytes(digest[:4], "big") / 2 ** 32 * 24.0
+        longitude = -124.0 + int.from_bytes(digest[4:8], "big") / 2 ** 32 * 57.0
+        return round(latitude, 6), round(longitude, 6), "OK"
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> GeocodingProvider:
+    """
+    Return the process-wide provider built from GEOCODING_PROVIDER.
+
+    Keyword arguments come from GEOCODING_PROVIDER_OPTIONS. The instance is
+    shared so its session pool and circuit breaker span all callers.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            provider_class = import_string(getattr(settings, "GEOCODING_PROVIDER", DEFAULT_PROVIDER))
+            _provider = provider_class(**getattr(settings, "GEOCODING_PROVIDER_OPTIONS", {}))
+        return _provider
+
+
+def reset_provider() -> None:
+    """Drop the shared provider so the next call rebuilds it from settings."""
+    global _provider
+    with _provider_lock:
+        _provider = None
+
+
+def geocode_full_address(full_address: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Geocode an address string, answering from GeocodeCache when possible.
+
+    Returns:
+        Tuple of (latitude, longitude) or (None, None) if geocoding fails
+    """
+    from .models import GeocodeCache
+
+    cached = GeocodeCache.objects.filter(
+        address_hash=address_hash(full_address), expires_at__gt=timezone.now()
+    ).first()
+    if cached:
+        return cached.latitude, cached.longitude
+
+    provider = get_provider()
+    if not provider.configured:
+        print("Warning: GOOGLE_MAPS_API_KEY not set in environment variables")
+        return None, None
+
+    latitude, longitude, status = provider.geocode(full_address)
+    if status == "OK":
+        print(f"Geocoded '{full_address}' to ({latitude}, {longitude})")
+    elif status not in RETRYABLE_STATUSES:
+        print(f"Geocoding failed for '{full_address}': {status}")
+
+    store_result(full_address, latitude, longitude, status)
+    return latitude, longitude
+
+
+def store_result(full_address: str, latitude, longitude, status: str) -> None:
+    """Cache a geocoding result unless the failure may be transient."""
+    from .models import GeocodeCache
+
+    if status == "OK" or status in CACHEABLE_FAILURES:
+        GeocodeCache.objects.update_or_create(
+            address_hash=address_hash(full_address),
+            defaults={
+                "address": normalize_address(full_address)[:500],
+                "latitude": latitude,
+                "longitude": longitude,
+                "status": status,
+                "expires_at": timezone.now() + get_cache_ttl(status),
+            },
+        )
+
+
+def format_address(*parts: str) -> str:
+    """Join the non-empty address parts with commas."""
+    return ", ".join(part.strip() for part in parts if part and part.strip())
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads; rate 0 disables it."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def geocode_many(addresses, workers: int = 8, rate: float = 40.0) -> Dict[str, Tuple[Optional[float], Optional[float], str]]:
+    """
+    Geocode many address strings, calling the API concurrently for cache misses.
+
+    Duplicate addresses are requested once. Only the HTTP calls run in worker
+    threads; cache reads and writes stay on the calling thread's connection.
+
+    Returns:
+        Dict mapping each address to (latitude, longitude, status); status is
+        "CACHED" for cache hits (see is_definitive for transient failures)
+    """
+    from .models import GeocodeCache
+
+    # Spellings that normalize to the same address share one lookup
+    by_hash = {}
+    for address in addresses:
+        if address:
+            spellings = by_hash.setdefault(address_hash(address), [])
+            if address not in spellings:
+                spellings.append(address)
+    results = {}
+    cached = GeocodeCache.objects.filter(address_hash__in=list(by_hash), expires_at__gt=timezone.now())
+    for key, latitude, longitude in cached.values_list("address_hash", "latitude", "longitude"):
+        for address in by_hash.pop(key):
+            results[address] = (latitude, longitude, "CACHED")
+
+    provider = get_provider()
+    if by_hash and not provider.configured:
+        raise ImproperlyConfigured("GOOGLE_MAPS_API_KEY is not set")
+
+    limiter = RateLimiter(rate)
+
+    def fetch(spellings):
+        limiter.wait()
+        return spellings, provider.geocode(spellings[0])
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for spellings, (latitude, longitude, status) in pool.map(fetch, by_hash.values()):
+            store_result(spellings[0], latitude, longitude, status)
+            for address in spellings:
+                results[address] = (latitude, longitude, status)
+    return results
+
+
+def geocode_rows(rows, build_address, workers: int = 8, rate: float = 40.0) -> dict:
+    """
+    Resolve model instances with address fields to coordinates.
+
+    Rows with a street address are geocoded through geocode_many; the rest
+    get the offline gazetteer centroid for their ZIP code or city/state.
+
+    Returns:
+        Dict mapping each row's pk to (latitude, longitude, status)
+    """
+    from .gazetteer import lookup_centroids
+
+    exact = {}
+    approximate = {}
+    for obj in rows:
+        if (obj.street_address or "").strip():
+            exact[obj.pk] = build_address(obj)
+        else:
+            approximate[obj.pk] = (obj.city, obj.state, obj.zip_code, obj.country)
+
+    results = {}
+    centroids = lookup_centroids(approximate.values())
+    for pk, address in approximate.items():
+        point = centroids[address]
+        results[pk] = (*point, "OK") if point else (None, None, "ZERO_RESULTS")
+
+    found = geocode_many(exact.values(), workers=workers, rate=rate)
+    for pk, address in exact.items():
+        results[pk] = found.get(address, (None, None, "ZERO_RESULTS"))
+    return results
+
+
+def geocoding_targets():
+    """(model, build_address) pairs for every model with geocoded coordinates."""
+    from job.models import JobPosting
+    from .models import Account
+    from .utils import applicant_address
+
+    return [
+        (Account, lambda a: applicant_address(
+            a.street_address or "", a.city or "", a.state or "", a.zip_code or "", a.country or "USA"
+        )),
+        (JobPosting, lambda j: format_address(j.street_address, j.city, j.state, j.zip_code, j.country)),
+    ]
+
+
+def process_pending_geocodes(batch_size: int = 100, workers: int = 4, rate: float = 40.0) -> dict:
+    """
+    Geocode one batch of accounts and job postings marked pending.
+
+    Each row is written with a conditional update that only applies if the
+    row is still pending with the same address, so an edit made while the
+    batch was being geocoded is not overwritten with stale coordinates.
+    Rows that hit a transient failure (e.g. the API is down) stay pending.
+
+    Returns:
+        Dict of counts: {"done": n, "failed": n}
+    """
+    from django.db import transaction
+
+    from applicant.cache import bump_generation as bump_candidate_generation
+    from job.cache import bump_generation
+    from job.models import JobPosting
+    from .models import GeocodeStatus
+
+    address_fields = ["street_address", "city", "state", "zip_code", "country"]
+    counts = {"done": 0, "failed": 0}
+    jobs_updated = False
+    accounts_updated = False
+
+    for model, build_address in geocoding_targets():
+        pending = list(
+            model.objects
+            .filter(geocode_status=GeocodeStatus.PENDING)
+            .only("pk", *address_fields)[:batch_size]
+        )
+        if not pending:
+            continue
+
+        results = geocode_rows(pending, build_address, workers=workers, rate=rate)
+        with transaction.atomic():
+            for obj in pending:
+                latitude, longitude, status = results[obj.pk]
+                if not is_definitive(status):
+                    continue
+                status = GeocodeStatus.DONE if latitude is not None else GeocodeStatus.FAILED
+                updated = model.objects.filter(
+                    pk=obj.pk,
+                    geocode_status=GeocodeStatus.PENDING,
+                    **{field: getattr(obj, field) for field in address_fields},
+                ).update(latitude=latitude, longitude=longitude, geocode_status=status)
+                if updated:
+                    counts[status] += 1
+                    jobs_updated = jobs_updated or model is JobPosting
+                    accounts_updated = accounts_updated or model is not JobPosting
+
+    # update() skips save signals, so refresh cached job board pages and map tiles here
+    if jobs_updated:
+        bump_generation()
+    if accounts_updated:
+        bump_candidate_generation()
+    return counts
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from account.models import Account, Location
+from job.models import JobPosting
+from recruiter.models import SavedSearch
+
+
+class Command(BaseCommand):
+    help = 'Link accounts, job postings and saved searches to normalized Location rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of rows written per bulk update',
+        )
+
+    def backfill(self, queryset, batch_size):
+        """Assign place on every row of a queryset; return the number updated."""
+        batch = []
+        updated = 0
+        for obj in queryset.iterator(chunk_size=batch_size):
+            place = Location.for_address(obj.city, obj.state, obj.country)
+            if obj.place_id == (place.pk if place else None):
+                continue
+            obj.place = place
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                queryset.model.objects.bulk_update(batch, ['place'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            queryset.model.objects.bulk_update(batch, ['place'])
+            updated += len(batch)
+        return updated
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for label, queryset in [
+            ('accounts', Account.objects.only('pk', 'city', 'state', 'country', 'place')),
+            ('job postings', JobPosting.objects.only('pk', 'city', 'state', 'country', 'place')),
+            ('saved searches', SavedSearch.objects.only('pk', 'city', 'state', 'country', 'place')),
+        ]:
+            updated = self.backfill(queryset, batch_size)
+            self.stdout.write(f'Linked {updated} {label}')
+
+        refreshed = Location.refresh_centroids()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {Location.objects.count()} locations, {refreshed} centroids refreshed.'
+        ))
@@ -0,0 +1,143 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from account.geocoding import geocode_rows, geocoding_targets, is_definitive
+from account.models import ADDRESS_FIELDS, GeocodeStatus, Location
+from applicant.cache import bump_generation as bump_candidate_generation
+from job.cache import bump_generation
+
+MODELS = dict(zip(['accounts', 'jobs'], geocoding_targets()))
+
+
+class Command(BaseCommand):
+    help = 'Geocode accounts and job postings in bulk, concurrently and resumably'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=list(MODELS),
+            default=list(MODELS),
+            help='Which rows to geocode (default: accounts and jobs)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-geocode all rows, even those with existing coordinates',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of concurrent geocoding requests',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=40.0,
+            help='Maximum geocoding requests per second (0 for no limit)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows read, geocoded and written per chunk',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.BASE_DIR, 'geocode_addresses.checkpoint.json'),
+            help='File recording progress so an interrupted run can resume',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Ignore any existing checkpoint and start from the beginning',
+        )
+
+    def load_checkpoint(self, path, reset):
+        if reset or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_checkpoint(self, path, checkpoint):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def geocode_model(self, label, checkpoint, options):
+        """Geocode one model chunk by chunk in primary key order; return (done, failed)."""
+        model, build_address = MODELS[label]
+        queryset = model.objects.only('pk', 'geocode_status', *ADDRESS_FIELDS).order_by('pk')
+        if not options['force']:
+            queryset = queryset.filter(latitude__isnull=True)
+
+        done = failed = 0
+        while True:
+            chunk = queryset
+            if checkpoint.get(label) is not None:
+                chunk = chunk.filter(pk__gt=checkpoint[label])
+            rows = list(chunk[:options['chunk_size']])
+            if not rows:
+                break
+
+            results = geocode_rows(rows, build_address, workers=options['workers'], rate=options['rate'])
+
+            # Write each row only if its address and status are unchanged since it
+            # was read, so edits made during the run are not overwritten
+            with transaction.atomic():
+                for obj in rows:
+                    latitude, longitude, status = results[obj.pk]
+                    if not is_definitive(status):
+                        # Transient failure: leave the row for a later run
+                        failed += 1
+                        continue
+                    status = GeocodeStatus.DONE if latitude is not None else GeocodeStatus.FAILED
+                    updated = model.objects.filter(
+                        pk=obj.pk,
+                        geocode_status=obj.geocode_status,
+                        **{field: getattr(obj, field) for field in ADDRESS_FIELDS},
+                    ).update(latitude=latitude, longitude=longitude, geocode_status=status)
+                    if not updated:
+                        continue
+                    if latitude is not None:
+                        done += 1
+                    else:
+                        failed += 1
+
+            checkpoint[label] = str(rows[-1].pk)
+            self.save_checkpoint(options['checkpoint'], checkpoint)
+            self.stdout.write(f'  {label}: {done} geocoded, {failed} failed so far')
+        return done, failed
+
+    def handle(self, *args, **options):
+        checkpoint = self.load_checkpoint(options['checkpoint'], options['reset'])
+        if checkpoint:
+            self.stdout.write(f"Resuming from checkpoint {options['checkpoint']}")
+
+        for label in options['models']:
+            self.stdout.write(f'Geocoding {label}...')
+            try:
+                done, failed = self.geocode_model(label, checkpoint, options)
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+            except KeyboardInterrupt:
+                raise CommandError('Interrupted; run again to resume from the checkpoint')
+            self.stdout.write(self.style.SUCCESS(f'Completed {label}: {done} geocoded, {failed} failed'))
+
+        # update() skips save signals, so refresh the caches they would have
+        if 'jobs' in options['models']:
+            bump_generation()
+        if 'accounts' in options['models']:
+            bump_candidate_generation()
+        Location.refresh_centroids()
+
+        if os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+        self.stdout.write(self.style.SUCCESS('Done.'))
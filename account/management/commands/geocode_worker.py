@@ -0,0 +1,46 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from account.geocoding import process_pending_geocodes
+
+
+class Command(BaseCommand):
+    help = 'Geocode accounts and job postings whose address is pending, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Maximum rows of each model geocoded per batch',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when the queue is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Geocode worker started')
+        try:
+            while True:
+                counts = process_pending_geocodes(batch_size=options['batch_size'])
+                if counts['done'] or counts['failed']:
+                    self.stdout.write(f"Geocoded {counts['done']}, failed {counts['failed']}")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('Geocode worker stopped'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from account.gazetteer import gazetteer_files, load_gazetteer
+
+
+class Command(BaseCommand):
+    help = 'Load ZIP code and city/state centroids used for offline approximate geocoding'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            default=None,
+            help=(
+                'Gazetteer file: the bundled CSV layout or a Census ZCTA/places gazetteer file. '
+                'Repeat for several files (default: settings.GAZETTEER_FILES, or the bundled CSV)'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        paths = options['path'] or gazetteer_files()
+        count = load_gazetteer(paths)
+        self.stdout.write(self.style.SUCCESS(f'Loaded {count} gazetteer entries from {", ".join(paths)}'))
@@ -0,0 +1,108 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:37
+
+import django.contrib.auth.models
+import django.contrib.auth.validators
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address_hash', models.CharField(max_length=64, unique=True)),
+                ('address', models.CharField(max_length=500)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(help_text='Geocoding API status, e.g. OK or ZERO_RESULTS', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GazetteerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zip_code', models.CharField(blank=True, db_index=True, max_length=5)),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('state', models.CharField(blank=True, max_length=2)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+            options={
+                'verbose_name_plural': 'gazetteer entries',
+                'indexes': [models.Index(fields=['state', 'city'], name='gazetteer_state_city_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('state', models.CharField(blank=True, max_length=255)),
+                ('country', models.CharField(blank=True, max_length=255)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='account_loc_latitud_4ad16c_idx')],
+                'unique_together': {('city', 'state', 'country')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Account',
+            fields=[
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('phone_number', models.CharField(blank=True, max_length=15, null=True)),
+                ('profile_picture', models.CharField(blank=True, max_length=255, null=True)),
+                ('street_address', models.CharField(blank=True, max_length=255, null=True)),
+                ('city', models.CharField(max_length=255)),
+                ('state', models.CharField(max_length=255)),
+                ('country', models.CharField(max_length=255)),
+                ('zip_code', models.CharField(max_length=255)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('geo_cell', models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('latitude'), '+', models.Value(90)), '*', models.Value(10)), models.IntegerField()), '*', models.Value(3600)), '+', django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('longitude'), '+', models.Value(180)), '*', models.Value(10)), models.IntegerField())), output_field=models.IntegerField(null=True))),
+                ('geocode_status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='done', editable=False, max_length=10)),
+                ('preferred_commute_radius', models.FloatField(default=25, help_text='Preferred commuting distance in miles.')),
+                ('preferred_commute_mode', models.CharField(choices=[('driving', 'Driving 🚗'), ('transit', 'Public Transit 🚆'), ('walking', 'Walking 🚶'), ('bicycling', 'Bicycling 🚴')], default='driving', help_text='Preferred mode of transportation.', max_length=20)),
+                ('preferred_commute_time', models.IntegerField(default=30, help_text='Preferred maximum commute time in minutes.')),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+                ('place', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='accounts', to='account.location')),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+                'indexes': [models.Index(django.db.models.functions.text.Lower('city'), name='account_city_lower_idx'), models.Index(django.db.models.functions.text.Lower('state'), name='account_state_lower_idx'), models.Index(django.db.models.functions.text.Lower('country'), name='account_country_lower_idx'), models.Index(fields=['geo_cell'], name='account_geo_cell_idx'), models.Index(condition=models.Q(('geocode_status', 'pending')), fields=['geocode_status'], name='account_geocode_pending_idx')],
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
@@ -2,6 +2,159 @@
 import uuid
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+
+from utils.geo import grid_cell_expression
+
+
+def normalize_location_part(value) -> str:
+    """Lowercase and collapse whitespace so free-text place names compare equal."""
+    return " ".join((value or "").split()).lower()
+
+
+class Location(models.Model):
+    """
+    Normalized city/state/country dimension shared by accounts, job postings
+    and saved searches, with a centroid for approximate map placement.
+    """
+    # A place's own centroid needs this many geocoded members...
+    CENTROID_MIN_MEMBERS = 3
+    # ...and is rounded to this many decimal places (about 1 km)
+    CENTROID_PRECISION = 2
+
+    city = models.CharField(max_length=255, blank=True)
+    state = models.CharField(max_length=255, blank=True)
+    country = models.CharField(max_length=255, blank=True)
+
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['city', 'state', 'country']
+        indexes = [models.Index(fields=['latitude', 'longitude'])]
+
+    @classmethod
+    def for_address(cls, city="", state="", country=""):
+        """Return the Location for an address, creating it if needed."""
+        key = {
+            "city": normalize_location_part(city),
+            "state": normalize_location_part(state),
+            "country": normalize_location_part(country),
+        }
+        if not any(key.values()):
+            return None
+        location, created = cls.objects.get_or_create(**key)
+        if created:
+            from .gazetteer import lookup_centroid
+
+            centroid = lookup_centroid(location.city, location.state, country=location.country)
+            if centroid:
+                location.latitude, location.longitude = centroid
+                location.save(update_fields=["latitude", "longitude"])
+        return location
+
+    @classmethod
+    def matching(cls, city="", state="", country=""):
+        """
+        Locations whose parts contain the given (case-insensitive) values.
+
+        The text match runs over this small table only; callers filter their
+        rows with place__in=..., which is an integer join.
+        """
+        locations = cls.objects.all()
+        if city:
+            locations = locations.filter(city__contains=normalize_location_part(city))
+        if state:
+            locations = locations.filter(state__contains=normalize_location_part(state))
+        if country:
+            locations = locations.filter(country__contains=normalize_location_part(country))
+        return locations
+
+    @classmethod
+    def refresh_centroids(cls):
+        """
+        Recompute where approximate map markers for each place are drawn.
+
+        Places in the gazetteer use its centroid. Others use the mean of their
+        geocoded accounts and jobs once they have CENTROID_MIN_MEMBERS of
+        them, rounded to CENTROID_PRECISION places, so a centroid never gives
+        away one member's address; until then they have none.
+
+        Returns:
+            Number of centroids changed
+        """
+        from applicant.cache import bump_generation
+        from job.models import JobPosting
+        from .gazetteer import lookup_centroids
+
+        points = {}
+        for model in (Account, JobPosting):
+            rows = (
+                model.objects
+                .filter(place__isnull=False, latitude__isnull=False, longitude__isnull=False)
+                .values("place")
+                .annotate(lat=models.Avg("latitude"), lng=models.Avg("longitude"), n=models.Count("pk"))
+            )
+            for row in rows:
+                lat, lng, n = points.get(row["place"], (0.0, 0.0, 0))
+                points[row["place"]] = (lat + row["lat"] * row["n"], lng + row["lng"] * row["n"], n + row["n"])
+
+        locations = list(cls.objects.all())
+        gazetteer = lookup_centroids((place.city, place.state, "", place.country) for place in locations)
+        changed = []
+        for location in locations:
+            centroid = gazetteer[(location.city, location.state, "", location.country)]
+            lat, lng, n = points.get(location.pk, (0.0, 0.0, 0))
+            if not centroid and n >= cls.CENTROID_MIN_MEMBERS:
+                centroid = (round(lat / n, cls.CENTROID_PRECISION), round(lng / n, cls.CENTROID_PRECISION))
+            centroid = centroid or (None, None)
+            if (location.latitude, location.longitude) != centroid:
+                location.latitude, location.longitude = centroid
+                changed.append(location)
+        cls.objects.bulk_update(changed, ["latitude", "longitude"], batch_size=500)
+        if changed:
+            # Approximate candidates are drawn at these centroids on the map
+            bump_generation()
+        return len(changed)
+
+    def __str__(self):
+        return ", ".join(part for part in [self.city, self.state, self.country] if part)
+
+
+def assign_place(instance, kwargs):
+    """
+    Point instance.place at the Location for its city/state/country.
+
+    Called from save(); when update_fields is used, the place is only
+    recomputed (and saved) if an address part is among the updated fields.
+    """
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None:
+        if not {"city", "state", "country"} & set(update_fields):
+            return
+        kwargs["update_fields"] = set(update_fields) | {"place"}
+    instance.place = Location.for_address(instance.city, instance.state, instance.country)
+
+
+class GeocodeStatus(models.TextChoices):
+    """Whether an address still needs to be resolved by the geocoding worker."""
+    PENDING = "pending", "Pending"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
+# Address parts that feed geocoding; Account remembers their loaded values
+ADDRESS_FIELDS = ("street_address", "city", "state", "zip_code", "country")
+TRACKED_FIELDS = ADDRESS_FIELDS + ("latitude", "longitude")
+GEOCODE_FIELDS = {"latitude", "longitude", "geocode_status"}
+PLACE_FIELDS = ("city", "state", "country")
+
+
+def mark_geocode_pending(instance):
+    """Clear coordinates and queue the instance for the geocoding worker."""
+    instance.latitude = None
+    instance.longitude = None
+    instance.geocode_status = GeocodeStatus.PENDING
 
 
 class Account(AbstractUser):
@@ -38,6 +191,30 @@ class Account(AbstractUser):
     # Geographic coordinates (for map visualization)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    # Grid cell of the coordinates for radius queries, kept current by the
+    # database on every write (see utils.geo)
+    geo_cell = models.GeneratedField(
+        expression=grid_cell_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
+    # Set to pending when the address changes; resolved by the geocode_worker command
+    geocode_status = models.CharField(
+        max_length=10,
+        choices=GeocodeStatus.choices,
+        default=GeocodeStatus.DONE,
+        editable=False,
+    )
+
+    # Normalized location, filled on save from city/state/country
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="accounts",
+    )
 
     # 🚗 Commute preferences (new)
     COMMUTE_CHOICES = [
@@ -64,6 +241,109 @@ class Account(AbstractUser):
         help_text="Preferred maximum commute time in minutes."
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive exact location lookups, e.g. Lower('city') == value
+            models.Index(Lower('city'), name='account_city_lower_idx'),
+            models.Index(Lower('state'), name='account_state_lower_idx'),
+            models.Index(Lower('country'), name='account_country_lower_idx'),
+            models.Index(fields=['geo_cell'], name='account_geo_cell_idx'),
+            # Small partial index for the geocoding worker's queue scan
+            models.Index(
+                fields=['geocode_status'],
+                name='account_geocode_pending_idx',
+                condition=models.Q(geocode_status='pending'),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_fields(field_names)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self.snapshot_fields(TRACKED_FIELDS if fields is None else fields)
+
+    def snapshot_fields(self, fields):
+        """Remember the current values of the tracked fields among fields."""
+        tracked = self.__dict__.setdefault("_tracked_values", {})
+        for field in TRACKED_FIELDS:
+            if field in fields and field in self.__dict__:
+                tracked[field] = self.__dict__[field]
+
+    def changed_fields(self, fields=TRACKED_FIELDS):
+        """
+        Tracked fields whose value differs from the one loaded from, or last
+        saved to, the database. Every field counts as changed on a new account.
+        """
+        if self._state.adding:
+            return set(fields)
+        tracked = self.__dict__.setdefault("_tracked_values", {})
+        # Deferred fields are still unset, so they cannot have been changed
+        loaded = [field for field in fields if field in self.__dict__]
+        unknown = [field for field in loaded if field not in tracked]
+        if unknown:
+            # Loaded some other way (e.g. deferred at first); read the stored values once
+            row = type(self)._base_manager.filter(pk=self.pk).values(*unknown).first()
+            if row is None:
+                return set(loaded)
+            tracked.update(row)
+        return {field for field in loaded if self.__dict__[field] != tracked[field]}
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or self.place_id is None or self.changed_fields(PLACE_FIELDS):
+            assign_place(self, kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and set(ADDRESS_FIELDS) & set(update_fields):
+            # The pre_save signal may queue the new address for geocoding
+            kwargs["update_fields"] = set(update_fields) | GEOCODE_FIELDS
+        super().save(*args, **kwargs)
+        self.snapshot_fields(TRACKED_FIELDS if kwargs.get("update_fields") is None else kwargs["update_fields"])
+
     def __str__(self):
         """String representation of the user."""
         return self.username
+
+
+class GeocodeCache(models.Model):
+    """
+    Geocoding result for a normalized address, shared by account and job
+    geocoding. Failed lookups are stored too (with null coordinates) so
+    unresolvable addresses are not retried until they expire.
+    """
+    address_hash = models.CharField(max_length=64, unique=True)
+    address = models.CharField(max_length=500)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=20, help_text="Geocoding API status, e.g. OK or ZERO_RESULTS")
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.address} ({self.status})"
+
+
+class GazetteerEntry(models.Model):
+    """
+    Offline centroid for a US ZIP code or city/state pair, loaded from
+    account/data/gazetteer.csv (see account.gazetteer). City rows have an
+    empty zip_code; city and state are stored normalized (state as its
+    two-letter code).
+    """
+    zip_code = models.CharField(max_length=5, blank=True, db_index=True)
+    city = models.CharField(max_length=255, blank=True)
+    state = models.CharField(max_length=2, blank=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    class Meta:
+        verbose_name_plural = "gazetteer entries"
+        indexes = [
+            models.Index(fields=["state", "city"], name="gazetteer_state_city_idx"),
+        ]
+
+    def __str__(self):
+        place = ", ".join(part for part in [self.city, self.state] if part)
+        return f"{self.zip_code} {place}".strip()
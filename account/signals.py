@@ -1,52 +1,51 @@
-from django.db.models.signals import pre_save
+from django.core.signals import setting_changed
+from django.db.models.signals import post_migrate, pre_save
 from django.dispatch import receiver
-from .models import Account
-from .utils import geocode_applicant_address
+from .gazetteer import load_gazetteer
+from .geocoding import reset_provider
+from .models import ADDRESS_FIELDS, Account, GazetteerEntry, GeocodeStatus, mark_geocode_pending
 
 
 @receiver(pre_save, sender=Account)
-def geocode_account_address(sender, instance, **kwargs):
+def geocode_account_address(sender, instance, update_fields=None, **kwargs):
     """
-    Automatically geocode the account's address when it changes.
+    Queue the account's address for geocoding when it changes.
 
-    This signal fires before saving an Account and updates the latitude/longitude
-    fields based on the address. For new accounts, it always geocodes.
-    For existing accounts, it only geocodes if address fields have changed.
+    This signal fires before saving an Account. For new accounts, and for
+    existing accounts whose address fields changed, the coordinates are
+    cleared and geocode_status is set to pending; the geocode_worker command
+    fills them in later so saves never wait on the geocoding API.
+    Coordinates supplied by the caller (e.g. picked on a map) are kept.
+
+    Changes are detected against the values Account remembers from loading,
+    so no query is made, and saves limited by update_fields to other
+    fields (e.g. last_login on each login) are skipped entirely.
     """
-    # Check if this is a new account or if address fields have changed
-    address_changed = False
-
-    if instance.pk:
-        # This is an existing account - check if address changed
-        try:
-            old_instance = Account.objects.get(pk=instance.pk)
-            address_fields = ['street_address', 'city', 'state', 'zip_code', 'country']
-
-            for field in address_fields:
-                old_value = getattr(old_instance, field, None)
-                new_value = getattr(instance, field, None)
-                if old_value != new_value:
-                    address_changed = True
-                    break
-        except Account.DoesNotExist:
-            # Shouldn't happen, but treat as new account
-            address_changed = True
-    else:
-        # New account - always geocode
-        address_changed = True
+    address_fields = set(ADDRESS_FIELDS)
+    if update_fields is not None:
+        address_fields &= set(update_fields)
+        if not address_fields:
+            return
 
+    changed = instance.changed_fields()
     # Only geocode if address changed
-    if address_changed:
-        # Always geocode with exact address for the Account model
-        # Privacy is handled at the view/template layer, not in the model
-        latitude, longitude = geocode_applicant_address(
-            street_address=instance.street_address or "",
-            city=instance.city or "",
-            state=instance.state or "",
-            zip_code=instance.zip_code or "",
-            country=instance.country or "USA",
-            use_exact=True  # Always use exact for storage; privacy filter at display time
-        )
-
-        instance.latitude = latitude
-        instance.longitude = longitude
+    if changed & address_fields:
+        has_coordinates = instance.latitude is not None and instance.longitude is not None
+        if has_coordinates and changed & {'latitude', 'longitude'}:
+            instance.geocode_status = GeocodeStatus.DONE
+        else:
+            mark_geocode_pending(instance)
+
+
+@receiver(setting_changed)
+def reset_geocoding_provider(sender, setting, **kwargs):
+    """Rebuild the shared geocoding provider when its settings change (e.g. in tests)."""
+    if setting in ('GOOGLE_MAPS_API_KEY', 'GEOCODING_PROVIDER', 'GEOCODING_PROVIDER_OPTIONS'):
+        reset_provider()
+
+
+@receiver(post_migrate)
+def load_bundled_gazetteer(sender, **kwargs):
+    """Load the configured gazetteer files after migrate if the table is empty."""
+    if sender.name == 'account' and not GazetteerEntry.objects.exists():
+        load_gazetteer()
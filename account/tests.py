@@ -1,3 +1,530 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import requests
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from account.admin_utils import ban_users
+from account.gazetteer import load_gazetteer, lookup_centroid
+from account.geocoding import address_hash, geocode_many, geocode_rows, get_provider, process_pending_geocodes
+from account.models import Account, GazetteerEntry, GeocodeCache, GeocodeStatus, Location
+from account.utils import geocode_applicant_address
+from applicant.cache import get_generation as get_candidate_generation
+from job.forms import JobPostingForm
+from job.models import JobPosting
+from job.utils import geocode_address, queue_job_geocode
+
+
+class LocationTestCase(TestCase):
+    """Test cases for the normalized location table"""
+
+    def create_account(self, username, city, state='GA', **extra):
+        return Account.objects.create_user(
+            username=username,
+            password='testpass123',
+            city=city,
+            state=state,
+            country='USA',
+            zip_code='30332',
+            **extra
+        )
+
+    def test_spelling_variants_share_a_location(self):
+        """Test that case and whitespace differences map to the same row"""
+        first = self.create_account('first', 'Atlanta')
+        second = self.create_account('second', '  atlanta ', state='ga')
+
+        self.assertIsNotNone(first.place)
+        self.assertEqual(first.place_id, second.place_id)
+        self.assertEqual(Location.objects.count(), 1)
+
+    def test_place_follows_address_updates(self):
+        """Test that saving a new city with update_fields moves the place"""
+        account = self.create_account('mover', 'Atlanta')
+        account.city = 'Savannah'
+        account.save(update_fields=['city'])
+
+        account.refresh_from_db()
+        self.assertEqual(account.place.city, 'savannah')
+
+    def test_matching_is_case_insensitive_substring(self):
+        """Test that matching() behaves like the old icontains filters"""
+        account = self.create_account('matcher', 'Atlanta')
+
+        matched = Account.objects.filter(place__in=Location.matching(city='LANTA'))
+        self.assertEqual(list(matched), [account])
+        self.assertFalse(Account.objects.filter(place__in=Location.matching(city='Boston')).exists())
+
+    def test_backfill_links_rows_and_refreshes_centroids(self):
+        """Test that the backfill command links unlinked rows and averages coordinates"""
+        first = self.create_account('first', 'Smallville')
+        second = self.create_account('second', 'Smallville')
+        job = JobPosting.objects.create(owner=first, title='Engineer', city='Smallville', state='GA')
+        # Bypass save() so the rows look like pre-existing, unlinked data
+        Account.objects.filter(pk=first.pk).update(place=None, latitude=33.0, longitude=-84.0)
+        Account.objects.filter(pk=second.pk).update(place=None, latitude=34.0, longitude=-85.0)
+        JobPosting.objects.update(place=None, latitude=33.5321, longitude=-84.5123)
+
+        call_command('backfill_locations', stdout=StringIO())
+
+        job.refresh_from_db()
+        place = Location.objects.get(city='smallville')
+        self.assertEqual(job.place, place)
+        self.assertEqual(Account.objects.filter(place=place).count(), 2)
+        self.assertEqual((place.latitude, place.longitude), (33.51, -84.5))
+
+    def test_centroids_do_not_reveal_members(self):
+        """Test that small places get no centroid and gazetteer places use the gazetteer"""
+        lone = self.create_account('lone', 'Smallville')
+        atlanta = self.create_account('atlanta', 'Atlanta')
+        Account.objects.filter(pk__in=[lone.pk, atlanta.pk]).update(latitude=33.1234, longitude=-84.5678)
+
+        Location.refresh_centroids()
+
+        centroids = {place.city: (place.latitude, place.longitude) for place in Location.objects.all()}
+        self.assertEqual(centroids['smallville'], (None, None))
+        self.assertEqual(centroids['atlanta'], (33.749, -84.388))
+
+class AccountChangeTrackingTestCase(TestCase):
+    """Test cases for detecting address changes without re-reading the account"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.account = Account.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            street_address='North Ave NW',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Account.objects.filter(pk=self.account.pk).update(
+            latitude=33.7756, longitude=-84.3963, geocode_status=GeocodeStatus.DONE
+        )
+
+    def test_unrelated_saves_only_update(self):
+        """Test that saves without address changes neither query nor requeue"""
+        account = Account.objects.get(pk=self.account.pk)
+        account.first_name = 'Ada'
+        with self.assertNumQueries(1):
+            account.save()
+        with self.assertNumQueries(1):
+            account.save(update_fields=['last_login'])
+
+        account.refresh_from_db()
+        self.assertEqual(account.geocode_status, GeocodeStatus.DONE)
+        self.assertEqual(account.latitude, 33.7756)
+
+    def test_ban_users_skips_geocoding(self):
+        """Test that banning loads and updates each account once"""
+        with self.assertNumQueries(2):
+            self.assertEqual(ban_users(Account.objects.filter(pk=self.account.pk)), 1)
+        self.assertEqual(Account.objects.get(pk=self.account.pk).geocode_status, GeocodeStatus.DONE)
+
+    def test_address_change_is_queued_once(self):
+        """Test that an address edit is queued, and saving again does not requeue it"""
+        account = Account.objects.get(pk=self.account.pk)
+        account.city = 'Savannah'
+        account.save(update_fields=['city'])
+
+        account.refresh_from_db()
+        self.assertEqual(account.geocode_status, GeocodeStatus.PENDING)
+        self.assertIsNone(account.latitude)
+        self.assertEqual(account.place.city, 'savannah')
+
+        # The worker resolves it; a later save of the same instance keeps the result
+        Account.objects.filter(pk=account.pk).update(latitude=32.08, longitude=-81.09, geocode_status=GeocodeStatus.DONE)
+        account.refresh_from_db(fields=['latitude', 'longitude', 'geocode_status'])
+        account.save()
+        account.refresh_from_db()
+        self.assertEqual(account.geocode_status, GeocodeStatus.DONE)
+        self.assertEqual(account.latitude, 32.08)
+
+    def test_deferred_address_is_compared_with_stored_value(self):
+        """Test that an address deferred when loading is still compared correctly"""
+        account = Account.objects.only('pk', 'username').get(pk=self.account.pk)
+        account.city = 'Atlanta'
+        account.save()
+        self.assertEqual(Account.objects.get(pk=self.account.pk).geocode_status, GeocodeStatus.DONE)
+
+
+@override_settings(GOOGLE_MAPS_API_KEY='test-key', GEOCODING_PROVIDER_OPTIONS={'backoff': 0})
+class GeocodeCacheTestCase(TestCase):
+    """Test cases for the shared persistent geocoding cache"""
+
+    def api_response(self, status='OK', lat=33.7756, lng=-84.3963):
+        response = mock.Mock()
+        results = [{'geometry': {'location': {'lat': lat, 'lng': lng}}}] if status == 'OK' else []
+        response.json.return_value = {'status': status, 'results': results}
+        return response
+
+    def test_identical_addresses_share_one_call(self):
+        """Test that job and account geocoders reuse a cached result across spellings"""
+        with mock.patch('account.geocoding.requests.Session.get', return_value=self.api_response()) as get:
+            first = geocode_address('North Ave NW', 'Atlanta', 'GA', '30332', 'USA')
+            second = geocode_applicant_address('north ave nw ', ' ATLANTA', 'GA', '30332', 'USA')
+
+        self.assertEqual(first, (33.7756, -84.3963))
+        self.assertEqual(second, first)
+        self.assertEqual(get.call_count, 1)
+
+    def test_failures_are_negatively_cached(self):
+        """Test that ZERO_RESULTS is cached but transport errors are retried"""
+        with mock.patch('account.geocoding.requests.Session.get', return_value=self.api_response('ZERO_RESULTS')) as get:
+            self.assertEqual(geocode_address('1 Main St', 'Nowhere', 'ZZ'), (None, None))
+            self.assertEqual(geocode_address('1 Main St', 'Nowhere', 'ZZ'), (None, None))
+        self.assertEqual(get.call_count, 1)
+
+        with mock.patch('account.geocoding.requests.Session.get', side_effect=requests.exceptions.Timeout) as get:
+            geocode_address('1 Main St', 'Elsewhere', 'ZZ')
+            geocode_address('1 Main St', 'Elsewhere', 'ZZ')
+        # Each lookup makes one attempt plus two retries
+        self.assertEqual(get.call_count, 6)
+        self.assertFalse(GeocodeCache.objects.filter(address_hash=address_hash('1 Main St, Elsewhere, ZZ, USA')).exists())
+
+    def test_expired_entries_are_refreshed(self):
+        """Test that an expired cache row triggers a new lookup"""
+        with mock.patch('account.geocoding.requests.Session.get', return_value=self.api_response()):
+            geocode_address('1 Main St', 'Atlanta', 'GA')
+        GeocodeCache.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        with mock.patch('account.geocoding.requests.Session.get', return_value=self.api_response(lat=1.0, lng=2.0)) as get:
+            self.assertEqual(geocode_address('1 Main St', 'Atlanta', 'GA'), (1.0, 2.0))
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(GeocodeCache.objects.count(), 1)
+
+
+@override_settings(GOOGLE_MAPS_API_KEY='test-key')
+class GeocodeQueueTestCase(TestCase):
+    """Test cases for background geocoding of accounts and job postings"""
+
+    def setUp(self):
+        """Set up test data"""
+        response = mock.Mock()
+        response.json.return_value = {
+            'status': 'OK',
+            'results': [{'geometry': {'location': {'lat': 33.7756, 'lng': -84.3963}}}],
+        }
+        patcher = mock.patch('account.geocoding.requests.Session.get', return_value=response)
+        self.api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.account = Account.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            street_address='North Ave NW',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+
+    def create_job(self, **fields):
+        job = JobPosting(owner=self.account, title='Engineer', city='Atlanta', state='GA', **fields)
+        queue_job_geocode(job)
+        job.save()
+        return job
+
+    def test_saves_do_not_call_the_geocoder(self):
+        """Test that new accounts and postings are queued instead of geocoded inline"""
+        job = self.create_job()
+
+        self.api.assert_not_called()
+        self.assertEqual(self.account.geocode_status, GeocodeStatus.PENDING)
+        self.assertEqual(job.geocode_status, GeocodeStatus.PENDING)
+        self.assertIsNone(job.latitude)
+
+    def test_worker_fills_in_coordinates(self):
+        """Test that one worker batch resolves pending accounts and postings"""
+        job = self.create_job()
+
+        self.assertEqual(process_pending_geocodes(), {'done': 2, 'failed': 0})
+
+        self.account.refresh_from_db()
+        job.refresh_from_db()
+        self.assertEqual((self.account.latitude, self.account.longitude), (33.7756, -84.3963))
+        self.assertEqual(job.geocode_status, GeocodeStatus.DONE)
+        self.assertEqual(process_pending_geocodes(), {'done': 0, 'failed': 0})
+
+    def test_map_picked_coordinates_are_kept(self):
+        """Test that caller-supplied coordinates skip the queue"""
+        job = self.create_job(latitude=1.0, longitude=2.0)
+
+        self.assertEqual(job.geocode_status, GeocodeStatus.DONE)
+        self.assertEqual((job.latitude, job.longitude), (1.0, 2.0))
+
+    def test_prefilled_coordinates_follow_the_address(self):
+        """Test that coordinates prefilled from the account are dropped when the address changes"""
+        Account.objects.filter(pk=self.account.pk).update(latitude=33.7756, longitude=-84.3963)
+        self.account.refresh_from_db()
+
+        def submit(**changes):
+            form = JobPostingForm(recruiter_user=self.account)
+            data = {name: form[name].value() for name in form.fields if form[name].value() is not None}
+            data.update(title='Engineer', company='Acme', job_type='full-time', description='Build things', **changes)
+            form = JobPostingForm(data, recruiter_user=self.account)
+            self.assertTrue(form.is_valid(), form.errors)
+            job = form.save(commit=False)
+            job.owner = self.account
+            queue_job_geocode(job, changed_fields=form.changed_data)
+            return job
+
+        job = submit()
+        self.assertEqual(job.geocode_status, GeocodeStatus.DONE)
+        self.assertEqual((job.latitude, job.longitude), (33.7756, -84.3963))
+
+        job = submit(street_address='2 Bay St', city='Savannah')
+        self.assertEqual(job.geocode_status, GeocodeStatus.PENDING)
+        self.assertIsNone(job.latitude)
+
+    def test_address_edited_during_batch_is_not_overwritten(self):
+        """Test that a stale result is discarded when the address changed meanwhile"""
+        def edit_while_geocoding(*args, **kwargs):
+            results = geocode_many(*args, **kwargs)
+            Account.objects.filter(pk=self.account.pk).update(city='Savannah')
+            return results
+
+        with mock.patch('account.geocoding.geocode_many', side_effect=edit_while_geocoding):
+            process_pending_geocodes()
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.geocode_status, GeocodeStatus.PENDING)
+        self.assertIsNone(self.account.latitude)
+
+
+@override_settings(GOOGLE_MAPS_API_KEY='test-key', GEOCODING_PROVIDER_OPTIONS={'backoff': 0})
+class BulkGeocodeTestCase(TestCase):
+    """Test cases for the geocode_addresses command"""
+
+    def setUp(self):
+        """Set up test data"""
+        response = mock.Mock()
+        response.json.return_value = {
+            'status': 'OK',
+            'results': [{'geometry': {'location': {'lat': 33.7756, 'lng': -84.3963}}}],
+        }
+        patcher = mock.patch('account.geocoding.requests.Session.get', return_value=response)
+        self.api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'checkpoint.json')
+
+        self.accounts = sorted(
+            (
+                Account.objects.create_user(
+                    username=f'user{i}', password='testpass123', street_address='1 Main St', city='Atlanta', state='GA'
+                )
+                for i in range(3)
+            ),
+            key=lambda account: account.pk,
+        )
+        self.job = JobPosting(
+            owner=self.accounts[0], title='Engineer', street_address='2 Bay St', city='Savannah', state='GA'
+        )
+        queue_job_geocode(self.job)
+        self.job.save()
+
+    def geocode(self, **options):
+        call_command(
+            'geocode_addresses', checkpoint=self.checkpoint, workers=2, rate=0, chunk_size=2,
+            stdout=StringIO(), **options
+        )
+
+    def test_geocodes_accounts_and_jobs(self):
+        """Test that every row is geocoded with one request per distinct address"""
+        self.geocode()
+
+        self.assertEqual(self.api.call_count, 2)
+        self.assertFalse(Account.objects.filter(latitude__isnull=True).exists())
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.latitude, 33.7756)
+        self.assertEqual(self.job.geocode_status, GeocodeStatus.DONE)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_spellings_of_one_address_all_get_results(self):
+        """Test that spellings sharing a normalized address each get the one result"""
+        Account.objects.filter(pk=self.accounts[1].pk).update(street_address='1 MAIN ST ', city='atlanta')
+
+        results = geocode_many(['1 Main St, Atlanta, GA, USA', '1 main st, atlanta, ga, usa'], workers=1, rate=0)
+        self.assertEqual(results['1 Main St, Atlanta, GA, USA'], (33.7756, -84.3963, 'OK'))
+        self.assertEqual(results['1 main st, atlanta, ga, usa'], (33.7756, -84.3963, 'OK'))
+        self.assertEqual(self.api.call_count, 1)
+
+        self.geocode(models=['accounts'])
+
+        self.assertEqual(self.api.call_count, 1)
+        self.assertFalse(Account.objects.exclude(geocode_status=GeocodeStatus.DONE).exists())
+        self.assertFalse(Account.objects.filter(latitude__isnull=True).exists())
+
+    def test_resumes_after_checkpoint(self):
+        """Test that rows up to the checkpointed primary key are skipped"""
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'accounts': str(self.accounts[1].pk)}, f)
+
+        self.geocode(models=['accounts'])
+
+        geocoded = Account.objects.filter(latitude__isnull=False)
+        self.assertQuerySetEqual(geocoded, [self.accounts[2].pk], transform=lambda a: a.pk)
+
+    def test_edits_during_the_run_are_kept(self):
+        """Test that rows edited while being geocoded keep the edit and stay pending"""
+        def edit_then_geocode(rows, *args, **kwargs):
+            Account.objects.filter(pk=self.accounts[0].pk).update(
+                street_address='9 Elm St', geocode_status=GeocodeStatus.PENDING
+            )
+            return geocode_rows(rows, *args, **kwargs)
+
+        generation = get_candidate_generation()
+        with mock.patch(
+            'account.management.commands.geocode_addresses.geocode_rows', side_effect=edit_then_geocode
+        ):
+            self.geocode(models=['accounts'])
+
+        edited = Account.objects.get(pk=self.accounts[0].pk)
+        self.assertEqual(edited.street_address, '9 Elm St')
+        self.assertIsNone(edited.latitude)
+        self.assertEqual(edited.geocode_status, GeocodeStatus.PENDING)
+        self.assertEqual(Account.objects.filter(latitude=33.7756).count(), 2)
+        self.assertGreater(get_candidate_generation(), generation)
+
+    def test_transient_errors_leave_rows_pending(self):
+        """Test that transport failures are neither written nor cached"""
+        self.api.side_effect = requests.exceptions.ConnectionError()
+
+        self.geocode(models=['jobs'])
+
+        self.job.refresh_from_db()
+        self.assertIsNone(self.job.latitude)
+        self.assertEqual(self.job.geocode_status, GeocodeStatus.PENDING)
+        self.assertFalse(GeocodeCache.objects.exists())
+
+
+@override_settings(GOOGLE_MAPS_API_KEY='test-key')
+class GeocodingProviderTestCase(TestCase):
+    """Test cases for the pluggable geocoding providers"""
+
+    def api_response(self):
+        response = mock.Mock()
+        response.json.return_value = {
+            'status': 'OK',
+            'results': [{'geometry': {'location': {'lat': 33.7756, 'lng': -84.3963}}}],
+        }
+        return response
+
+    @override_settings(GEOCODING_PROVIDER_OPTIONS={'backoff': 0})
+    def test_transient_errors_are_retried(self):
+        """Test that a timeout is retried on the shared session"""
+        provider = get_provider()
+        self.assertIs(get_provider(), provider)
+
+        side_effect = [requests.exceptions.Timeout, self.api_response()]
+        with mock.patch('account.geocoding.requests.Session.get', side_effect=side_effect) as get:
+            self.assertEqual(provider.geocode('Atlanta, GA'), (33.7756, -84.3963, 'OK'))
+        self.assertEqual(get.call_count, 2)
+
+    @override_settings(GEOCODING_PROVIDER_OPTIONS={'retries': 0, 'failure_threshold': 2})
+    def test_circuit_breaker_stops_calls(self):
+        """Test that repeated failures stop further API calls"""
+        with mock.patch('account.geocoding.requests.Session.get', side_effect=requests.exceptions.Timeout) as get:
+            for city in ['Nowhere', 'Elsewhere', 'Anywhere']:
+                geocode_address('1 Main St', city, 'ZZ')
+            self.assertEqual(get_provider().geocode('Atlanta, GA'), (None, None, 'UNAVAILABLE'))
+        self.assertEqual(get.call_count, 2)
+
+    @override_settings(
+        GEOCODING_PROVIDER='account.geocoding.StubGeocodingProvider',
+        GEOCODING_PROVIDER_OPTIONS={'results': {'1 Main St, Nowhere, ZZ, USA': None}},
+    )
+    def test_stub_provider(self):
+        """Test that the stub answers offline with stable coordinates"""
+        with mock.patch('account.geocoding.requests.Session.get') as get:
+            first = get_provider().geocode('Atlanta, GA, USA')
+            self.assertEqual(get_provider().geocode('atlanta,  GA, USA'), first)
+            self.assertEqual(geocode_address('1 Main St', 'Nowhere', 'ZZ'), (None, None))
+        get.assert_not_called()
+        self.assertEqual(first[2], 'OK')
+
+
+class GazetteerTestCase(TestCase):
+    """Test cases for offline approximate geocoding"""
+
+    def test_bundled_centroids(self):
+        """Test that the bundled gazetteer resolves ZIP codes and city/state pairs"""
+        self.assertEqual(lookup_centroid('atlanta', 'Georgia'), (33.749, -84.388))
+        self.assertEqual(lookup_centroid('Atlanta', 'GA', '30332-0001'), (33.7756, -84.3963))
+        self.assertIsNone(lookup_centroid('Atlanta', 'GA', country='Canada'))
+        self.assertIsNone(lookup_centroid('Nowhere', 'ZZ'))
+
+    def test_approximate_geocoding_is_offline(self):
+        """Test that approximate lookups never call the geocoding API"""
+        with mock.patch('account.geocoding.requests.Session.get') as get:
+            approximate = geocode_applicant_address('North Ave NW', 'Atlanta', 'GA', '30332', use_exact=False)
+            job = geocode_address(city='Savannah', state='GA')
+        get.assert_not_called()
+        self.assertEqual(approximate, (33.749, -84.388))
+        self.assertEqual(job, (32.0809, -81.0912))
+
+    @override_settings(GOOGLE_MAPS_API_KEY='test-key')
+    def test_gazetteer_misses_stay_unresolved(self):
+        """Test that places missing from the gazetteer are not sent to the geocoding API"""
+        account = Account.objects.create_user(
+            username='toronto', password='testpass123', city='Toronto', state='ON', country='Canada'
+        )
+        with mock.patch('account.geocoding.requests.Session.get') as get:
+            self.assertEqual(geocode_address(city='Kalamazoo', state='MI'), (None, None))
+            self.assertEqual(
+                geocode_applicant_address('1 Main St', 'Kalamazoo', 'MI', use_exact=False), (None, None)
+            )
+            self.assertEqual(process_pending_geocodes(workers=1, rate=0), {'done': 0, 'failed': 1})
+        get.assert_not_called()
+        account.refresh_from_db()
+        self.assertEqual(account.geocode_status, GeocodeStatus.FAILED)
+        self.assertIsNone(account.latitude)
+
+    def test_load_replaces_entries(self):
+        """Test that loading a CSV replaces the gazetteer table"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'gazetteer.csv')
+        with open(path, 'w') as f:
+            f.write('zip_code,city,state,latitude,longitude\n,Springfield,Illinois,39.78,-89.65\n')
+
+        self.assertEqual(load_gazetteer(path), 1)
+        self.assertEqual(GazetteerEntry.objects.count(), 1)
+        self.assertEqual(lookup_centroid('Springfield', 'IL'), (39.78, -89.65))
+
+    def test_load_census_gazetteer_files(self):
+        """Test that the Census ZCTA and places gazetteer files load as published"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        zcta = os.path.join(directory.name, '2020_Gaz_zcta_national.txt')
+        with open(zcta, 'w') as f:
+            f.write('GEOID\tALAND\tAWATER\tALAND_SQMI\tAWATER_SQMI\tINTPTLAT\tINTPTLONG                  \n')
+            f.write('49007\t18054419\t207405\t6.971\t0.080\t42.291686\t-85.587517                 \n')
+        places = os.path.join(directory.name, '2020_Gaz_place_national.txt')
+        with open(places, 'w') as f:
+            f.write('USPS\tGEOID\tANSICODE\tNAME\tLSAD\tFUNCSTAT\tALAND\tAWATER\tALAND_SQMI\tAWATER_SQMI'
+                    '\tINTPTLAT\tINTPTLONG                  \n')
+            f.write('MI\t2642160\t02395496\tKalamazoo city\t25\tA\t62917000\t2154000\t24.29\t0.83'
+                    '\t42.274532\t-85.586680                 \n')
+            f.write('TN\t4752006\t02405092\tNashville-Davidson metropolitan government (balance)\t00\tF'
+                    '\t1230000000\t55000000\t475.1\t21.2\t36.171800\t-86.785002                 \n')
+
+        with mock.patch('account.geocoding.requests.Session.get') as get:
+            call_command('load_gazetteer', path=[zcta, places], stdout=StringIO())
+            self.assertEqual(GazetteerEntry.objects.count(), 3)
+            self.assertEqual(lookup_centroid('Kalamazoo', 'Michigan'), (42.274532, -85.58668))
+            self.assertEqual(lookup_centroid('Kalamazoo', 'MI', '49007'), (42.291686, -85.587517))
+            self.assertEqual(lookup_centroid('Nashville-Davidson', 'TN'), (36.1718, -86.785002))
+            self.assertEqual(geocode_address(city='Kalamazoo', state='MI'), (42.274532, -85.58668))
+        get.assert_not_called()
@@ -1,6 +1,7 @@
-import requests
 from typing import Optional, Tuple
-from django.conf import settings
+
+from .gazetteer import lookup_centroid
+from .geocoding import format_address, geocode_full_address
 
 
 def geocode_applicant_address(
@@ -14,8 +15,9 @@ def geocode_applicant_address(
     """
     Geocode an applicant's address using Google Geocoding API.
 
-    If use_exact is False or street_address is empty, only geocodes city/state
-    to provide approximate location for privacy.
+    If use_exact is False or street_address is empty, the approximate location
+    is resolved offline from the gazetteer (city/state centroid, or the ZIP
+    centroid when use_exact allows it) without calling the API.
 
     Returns a tuple of (latitude, longitude) or (None, None) if geocoding fails.
 
@@ -31,55 +33,33 @@ def geocode_applicant_address(
     Returns:
         Tuple of (latitude, longitude) or (None, None) if geocoding fails
     """
-    api_key = settings.GOOGLE_MAPS_API_KEY
-
-    if not api_key:
-        print("Warning: GOOGLE_MAPS_API_KEY not set in environment variables")
-        return None, None
-
-    # Build the address string based on privacy preference
-    if use_exact and street_address and street_address.strip():
-        # Use full address for exact location
-        address_parts = [
-            part.strip()
-            for part in [street_address, city, state, zip_code, country]
-            if part and part.strip()
-        ]
-    else:
-        # Use only city/state for approximate location (privacy mode)
-        address_parts = [
-            part.strip()
-            for part in [city, state, country]
-            if part and part.strip()
-        ]
-
-    if not address_parts:
-        return None, None
+    if not (use_exact and street_address and street_address.strip()):
+        # Only exact street addresses go to the external geocoder
+        point = lookup_centroid(city, state, zip_code if use_exact else "", country)
+        return point or (None, None)
 
-    full_address = ", ".join(address_parts)
+    full_address = applicant_address(street_address, city, state, zip_code, country, use_exact)
 
-    # Use Google Geocoding API
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {
-        "address": full_address,
-        "key": api_key
-    }
+    # Identical addresses are answered from the shared geocode cache
+    return geocode_full_address(full_address)
 
-    try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
 
-        if data.get("status") == "OK" and data.get("results"):
-            location = data["results"][0]["geometry"]["location"]
-            latitude = location["lat"]
-            longitude = location["lng"]
-            print(f"Geocoded applicant address '{full_address}' to ({latitude}, {longitude})")
-            return latitude, longitude
-        else:
-            print(f"Geocoding failed for applicant address '{full_address}': {data.get('status')}")
-            return None, None
+def applicant_address(
+    street_address: str = "",
+    city: str = "",
+    state: str = "",
+    zip_code: str = "",
+    country: str = "USA",
+    use_exact: bool = True
+) -> str:
+    """
+    Build the address string geocoded for an applicant.
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error geocoding applicant address: {e}")
-        return None, None
+    The street address is only included when use_exact is True; otherwise
+    only city/state are used to provide an approximate location for privacy.
+    """
+    if use_exact and street_address and street_address.strip():
+        # Use full address for exact location
+        return format_address(street_address, city, state, zip_code, country)
+    # Use only city/state for approximate location (privacy mode)
+    return format_address(city, state, country)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApplicantConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "applicant"
+
+    def ready(self):
+        """Import signals when the app is ready."""
+        import applicant.signals
@@ -0,0 +1,30 @@
+"""
+Generation counter for cached candidate data.
+
+The counter is bumped whenever an applicant, their skills, work experience
+or privacy settings change (see applicant/signals.py). Anything derived
+from candidate profiles records the generation it was built from and is
+ignored once the counter has moved on, so an edit is never hidden by a
+stale copy.
+"""
+from django.core.cache import cache
+
+GENERATION_KEY = "candidates:generation"
+
+
+def get_generation() -> int:
+    """Return the current candidate data generation."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def bump_generation() -> None:
+    """Invalidate everything derived from candidate profiles."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Key expired or was never set; start a fresh generation
+        cache.set(GENERATION_KEY, 1, timeout=None)
@@ -0,0 +1,59 @@
+"""
+Filter helpers for applicant searches.
+
+Filters on multi-valued relations (skills, education, work experience, links)
+are compiled to correlated EXISTS subqueries instead of joins. Each filter then
+adds no rows to the outer query, so results never need DISTINCT and query cost
+stays linear in the number of filters.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Education, Link, Skill, WorkExperience
+
+RELATED_MODELS = {
+    "skills": Skill,
+    "education": Education,
+    "work_experiences": WorkExperience,
+    "links": Link,
+}
+
+
+def related_exists(relation, *args, **lookups):
+    """
+    Build an EXISTS subquery matching applicants with at least one related
+    row that satisfies the given Q objects and lookups.
+
+    Args:
+        relation: Related name on Applicant (skills, education, work_experiences, links)
+    """
+    model = RELATED_MODELS[relation]
+    return Exists(model.objects.filter(*args, applicant=OuterRef("pk"), **lookups))
+
+
+def filter_related(queryset, relation, *args, **lookups):
+    """Filter applicants to those with a matching related row."""
+    return queryset.filter(related_exists(relation, *args, **lookups))
+
+
+def filter_all_skills(queryset, skill_names, alternatives=None):
+    """
+    Filter applicants to those having every skill (substring, case-insensitive).
+
+    alternatives optionally maps a skill name to related names that also
+    satisfy it; they are folded into that skill's EXISTS subquery.
+    """
+    alternatives = alternatives or {}
+    for skill_name in skill_names:
+        names = [skill_name, *alternatives.get(skill_name, [])]
+        queryset = filter_related(
+            queryset, "skills", reduce(or_, [Q(skill_name__icontains=name) for name in names])
+        )
+    return queryset
+
+
+def parse_skill_list(value):
+    """Split a comma-separated skills parameter into trimmed, non-empty names."""
+    return [s.strip() for s in (value or "").split(",") if s.strip()]
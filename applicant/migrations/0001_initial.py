@@ -0,0 +1,123 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('account', '0001_initial'),
+        ('job', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Applicant',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='applicant', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('headline', models.CharField(blank=True, max_length=500)),
+                ('resume', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProfilePrivacySettings',
+            fields=[
+                ('applicant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='privacy_settings', serialize=False, to='applicant.applicant')),
+                ('show_email', models.BooleanField(default=True, help_text='Allow recruiters to see your email')),
+                ('show_phone', models.BooleanField(default=True, help_text='Allow recruiters to see your phone number')),
+                ('show_location', models.BooleanField(default=True, help_text='Allow recruiters to see your location (city, state, country)')),
+                ('show_exact_location', models.BooleanField(default=True, help_text='Show exact location (street address) on map')),
+                ('show_approximate_location', models.BooleanField(default=True, help_text='Show approximate location (city/state) on map when exact location is hidden')),
+                ('show_resume', models.BooleanField(default=True, help_text='Allow recruiters to see your resume')),
+                ('show_headline', models.BooleanField(default=True, help_text='Allow recruiters to see your professional headline')),
+                ('show_skills', models.BooleanField(default=True, help_text='Allow recruiters to see your skills')),
+                ('show_work_experience', models.BooleanField(default=True, help_text='Allow recruiters to see your work experience')),
+                ('show_education', models.BooleanField(default=True, help_text='Allow recruiters to see your education')),
+                ('show_links', models.BooleanField(default=True, help_text='Allow recruiters to see your portfolio/social links')),
+                ('show_gpa', models.BooleanField(default=True, help_text='Allow recruiters to see your GPA')),
+                ('show_current_employment', models.BooleanField(default=True, help_text='Allow recruiters to see your current job status')),
+                ('show_current_education', models.BooleanField(default=True, help_text='Allow recruiters to see your current education status')),
+                ('visible_to_recruiters', models.BooleanField(default=True, help_text='Make profile visible in recruiter searches')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Education',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('institution', models.CharField(max_length=255)),
+                ('degree', models.CharField(max_length=200)),
+                ('field_of_study', models.CharField(max_length=200)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_current', models.BooleanField(default=False)),
+                ('gpa', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='education', to='applicant.applicant')),
+            ],
+            options={
+                'ordering': ['-start_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Link',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField()),
+                ('platform', models.CharField(choices=[('linkedin', 'LinkedIn'), ('github', 'GitHub'), ('portfolio', 'Portfolio Website'), ('personal', 'Personal Website'), ('twitter', 'Twitter'), ('other', 'Other')], default='other', max_length=20)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='links', to='applicant.applicant')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WorkExperience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('company', models.CharField(max_length=255)),
+                ('position', models.CharField(max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_current', models.BooleanField(default=False)),
+                ('description', models.TextField(blank=True)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='work_experiences', to='applicant.applicant')),
+            ],
+            options={
+                'ordering': ['-start_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('review', 'Review'), ('interview', 'Interview'), ('offer', 'Offer'), ('closed', 'Closed')], default='applied', max_length=16)),
+                ('note', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='job.jobposting')),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['job', 'status'], name='application_job_status_idx')],
+                'unique_together': {('applicant', 'job')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill_name', models.CharField(max_length=100)),
+                ('proficiency_level', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced'), ('expert', 'Expert')], default='intermediate', max_length=20)),
+                ('years_of_experience', models.PositiveIntegerField(blank=True, null=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='applicant.applicant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill_name'], name='skill_name_idx')],
+                'unique_together': {('applicant', 'skill_name')},
+            },
+        ),
+    ]
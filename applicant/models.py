@@ -58,24 +58,30 @@ class Applicant(models.Model):
         settings, created = ProfilePrivacySettings.objects.get_or_create(applicant=self)
         return settings
 
-    def get_job_recommendations(self, min_matching_skills=1):
+    def get_job_recommendations(self, min_matching_skills=1, expand=False):
         """
         Get job recommendations based on matching skills.
         
         Args:
             min_matching_skills (int): Minimum number of matching skills required
+            expand (bool): Also match skills that commonly co-occur with the applicant's
         
         Returns:
             QuerySet: JobPosting objects that match the criteria
         """
         from job.models import JobPosting, JobSkill
+        from job.utils import expand_skills
         from django.db.models import Count, Q
         
         # Get all skill names of this applicant
-        applicant_skill_names = self.skills.values_list('skill_name', flat=True)
+        applicant_skill_names = list(self.skills.values_list('skill_name', flat=True))
         
         if not applicant_skill_names:
             return JobPosting.objects.none()
+
+        if expand:
+            related = expand_skills(applicant_skill_names)
+            applicant_skill_names += [name for names in related.values() for name in names]
         
         # Find jobs that have at least min_matching_skills in common
         recommended_jobs = JobPosting.objects.filter(
@@ -148,6 +154,9 @@ class Skill(models.Model):
 
     class Meta:
         unique_together = ["applicant", "skill_name"]
+        indexes = [
+            models.Index(fields=["skill_name"], name="skill_name_idx"),
+        ]
 
 
 class Link(models.Model):
@@ -210,6 +219,9 @@ class Application(models.Model):
     class Meta:
         ordering = ["-updated_at"]
         unique_together = (("applicant", "job"),)  # one application per job per user
+        indexes = [
+            models.Index(fields=["job", "status"], name="application_job_status_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.applicant.username} → {self.job.title} [{self.get_status_display()}]" #type: ignore
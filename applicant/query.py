@@ -0,0 +1,260 @@
+"""
+Boolean query language for applicant searches.
+
+Expressions combine field terms with AND, OR, NOT/- and parentheses:
+
+    skill:python AND (city:atlanta OR remote) AND -skill:php
+    skill:"machine learning" company:google      (juxtaposition means AND)
+
+A bare word matches name, username, headline or any skill. The text is
+parsed into a small AST and compiled into a single Q object. Terms on the
+same multi-valued relation that are ORed together share one EXISTS
+subquery, and all city/state/country terms of a group share one
+place__in subquery against the Location table. Compiled plans are cached
+by normalized expression text.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache, reduce
+from operator import and_, or_
+
+from django.db.models import Q
+
+from account.models import Location, normalize_location_part
+
+from .filters import RELATED_MODELS, related_exists
+
+MAX_TERMS = 32
+# Nested groups and NOTs allowed; each level is a recursive call
+MAX_DEPTH = 16
+MAX_QUERY_LENGTH = 1000
+
+Term = namedtuple("Term", ["field", "value"])
+Not = namedtuple("Not", ["child"])
+And = namedtuple("And", ["children"])
+Or = namedtuple("Or", ["children"])
+
+# field -> (relation, lookups) for multi-valued relations
+RELATED_FIELDS = {
+    "skill": ("skills", ["skill_name"]),
+    "company": ("work_experiences", ["company"]),
+    "position": ("work_experiences", ["position"]),
+    "title": ("work_experiences", ["position"]),
+    "school": ("education", ["institution"]),
+    "institution": ("education", ["institution"]),
+    "degree": ("education", ["degree"]),
+    "major": ("education", ["field_of_study"]),
+    "project": ("links", ["url", "description"]),
+}
+
+# field -> lookups on Applicant itself
+LOCAL_FIELDS = {
+    "name": ["account__first_name", "account__last_name", "account__username"],
+    "username": ["account__username"],
+    "headline": ["headline"],
+}
+
+PLACE_FIELDS = {"city", "state", "country"}
+
+TOKEN_RE = re.compile(r'\s*(?:(-?\()|(\))|(-?)(?:(\w+):)?(?:"([^"]*)"|([^\s()"]+)))')
+
+
+class QueryParseError(ValueError):
+    """Raised when a query expression cannot be parsed."""
+
+
+def tokenize(text):
+    """
+    Split an expression into tokens.
+
+    Returns a list of "(", ")", "AND", "OR", "NOT" strings and
+    (negated, field, value) tuples for terms.
+    """
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise QueryParseError(f"Unexpected character at position {pos}: {text[pos]!r}")
+        pos = match.end()
+        lparen, rparen, minus, field, quoted, word = match.groups()
+        if lparen:
+            # "-(" negates a whole group
+            tokens.extend(["NOT", "("] if lparen == "-(" else ["("])
+        elif rparen:
+            tokens.append(rparen)
+        elif not minus and not field and quoted is None and word in ("AND", "OR", "NOT"):
+            tokens.append(word)
+        elif quoted is None and word.endswith(":"):
+            raise QueryParseError(f"Missing value for '{word[:-1]}'")
+        else:
+            value = quoted if quoted is not None else word
+            tokens.append((bool(minus), (field or "").lower(), value))
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser producing Term/Not/And/Or nodes."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.terms = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise QueryParseError("Empty query")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryParseError(f"Unexpected {self.peek()!r}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return combine(Or, children)
+
+    def parse_and(self):
+        children = [self.parse_unary()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            children.append(self.parse_unary())
+        return combine(And, children)
+
+    def nested(self, parse):
+        """Run parse one nesting level deeper, refusing to exceed MAX_DEPTH."""
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise QueryParseError(f"Query is nested too deeply (maximum {MAX_DEPTH} levels)")
+        try:
+            return parse()
+        finally:
+            self.depth -= 1
+
+    def parse_unary(self):
+        if self.peek() == "NOT":
+            self.take()
+            return Not(self.nested(self.parse_unary))
+        return self.parse_atom()
+
+    def parse_atom(self):
+        token = self.take()
+        if token == "(":
+            node = self.nested(self.parse_or)
+            if self.take() != ")":
+                raise QueryParseError("Missing ')'")
+            return node
+        if not isinstance(token, tuple):
+            raise QueryParseError(f"Unexpected {token!r}" if token else "Unexpected end of query")
+
+        negated, field, value = token
+        if field and field not in RELATED_FIELDS and field not in LOCAL_FIELDS and field not in PLACE_FIELDS:
+            raise QueryParseError(f"Unknown field '{field}'")
+        if not value.strip():
+            raise QueryParseError(f"Empty value for '{field or value}'")
+        self.terms += 1
+        if self.terms > MAX_TERMS:
+            raise QueryParseError(f"Too many terms (maximum {MAX_TERMS})")
+        node = Term(field, value.strip())
+        return Not(node) if negated else node
+
+
+def combine(node_type, children):
+    """Build an And/Or node, flattening nested nodes of the same type."""
+    if len(children) == 1:
+        return children[0]
+    flat = []
+    for child in children:
+        flat.extend(child.children if isinstance(child, node_type) else [child])
+    return node_type(tuple(flat))
+
+
+def parse_query(text):
+    """Parse an expression into an AST."""
+    if len(text) > MAX_QUERY_LENGTH:
+        raise QueryParseError(f"Query is too long (maximum {MAX_QUERY_LENGTH} characters)")
+    return Parser(tokenize(text)).parse()
+
+
+def related_q(term):
+    """Q on the related model matching a single relation term."""
+    lookups = RELATED_FIELDS[term.field][1]
+    return reduce(or_, [Q(**{f"{lookup}__icontains": term.value}) for lookup in lookups])
+
+
+def place_q(term):
+    """Q on Location matching a single city/state/country term."""
+    return Q(**{f"{term.field}__contains": normalize_location_part(term.value)})
+
+
+def compile_term(term):
+    """Compile a single term to a Q on Applicant."""
+    if term.field in RELATED_FIELDS:
+        return Q(related_exists(RELATED_FIELDS[term.field][0], related_q(term)))
+    if term.field in PLACE_FIELDS:
+        return Q(account__place__in=Location.objects.filter(place_q(term)))
+    if term.field in LOCAL_FIELDS:
+        lookups = LOCAL_FIELDS[term.field]
+    else:
+        lookups = LOCAL_FIELDS["name"] + LOCAL_FIELDS["headline"]
+    q = reduce(or_, [Q(**{f"{lookup}__icontains": term.value}) for lookup in lookups])
+    if not term.field:
+        q |= Q(related_exists("skills", skill_name__icontains=term.value))
+    return q
+
+
+def compile_node(node):
+    """Compile an AST node to a Q on Applicant, merging sibling subqueries."""
+    if isinstance(node, Term):
+        return compile_term(node)
+    if isinstance(node, Not):
+        return ~compile_node(node.child)
+
+    is_or = isinstance(node, Or)
+    op = or_ if is_or else and_
+    related = {}
+    places = []
+    parts = []
+    for child in node.children:
+        if isinstance(child, Term) and child.field in PLACE_FIELDS:
+            # Account has one place, so both AND and OR fold into one IN
+            places.append(place_q(child))
+        elif is_or and isinstance(child, Term) and child.field in RELATED_FIELDS:
+            # EXISTS(a) OR EXISTS(b) == EXISTS(a OR b); not true for AND
+            related.setdefault(RELATED_FIELDS[child.field][0], []).append(related_q(child))
+        else:
+            parts.append(compile_node(child))
+
+    for relation in RELATED_MODELS:
+        if relation in related:
+            parts.append(Q(related_exists(relation, reduce(or_, related[relation]))))
+    if places:
+        parts.append(Q(account__place__in=Location.objects.filter(reduce(op, places))))
+    return reduce(op, parts)
+
+
+@lru_cache(maxsize=256)
+def _compile_normalized(text):
+    return compile_node(parse_query(text))
+
+
+def compile_query(text):
+    """
+    Compile an expression to a Q object for filtering Applicant querysets.
+
+    Raises QueryParseError for invalid expressions.
+    """
+    return _compile_normalized(" ".join(text.split()))
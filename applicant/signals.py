@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from account.models import ADDRESS_FIELDS, GEOCODE_FIELDS, Account
+
+from .cache import bump_generation
+from .models import Applicant, ProfilePrivacySettings, Skill, WorkExperience
+
+# Account fields that move a candidate on the map
+LOCATION_FIELDS = set(ADDRESS_FIELDS) | GEOCODE_FIELDS
+
+
+@receiver(post_save, sender=Applicant)
+@receiver(post_delete, sender=Applicant)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_delete, sender=WorkExperience)
+@receiver(post_save, sender=ProfilePrivacySettings)
+@receiver(post_delete, sender=ProfilePrivacySettings)
+def invalidate_candidate_data(sender, **kwargs):
+    """
+    Bump the candidate generation whenever a profile, its skills, work
+    experience or privacy settings change, so cached map tiles built
+    earlier are no longer used.
+    """
+    bump_generation()
+
+
+@receiver(post_save, sender=Account)
+def invalidate_candidate_location(sender, instance, update_fields=None, **kwargs):
+    """Bump the candidate generation when an account's address or coordinates may have changed."""
+    if update_fields is None or LOCATION_FIELDS & set(update_fields):
+        bump_generation()
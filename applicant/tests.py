@@ -1,7 +1,11 @@
+from datetime import date
+
 from django.test import TestCase, Client
 from django.urls import reverse
 from account.models import Account
-from applicant.models import Applicant, ProfilePrivacySettings
+from applicant.filters import filter_all_skills
+from applicant.models import Applicant, Education, ProfilePrivacySettings, Skill
+from applicant.query import QueryParseError, compile_query, parse_query
 from recruiter.models import Recruiter
 import json
 
@@ -200,3 +204,162 @@ class ProfilePrivacySettingsTestCase(TestCase):
         self.assertIsNotNone(applicant_data)
         # Applicants should see full email, not hidden
         self.assertEqual(applicant_data['email'], 'applicant@test.com')
+
+
+class ApplicantSearchFiltersTestCase(TestCase):
+    """Test cases for EXISTS-based multi-valued relation filters"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.applicant_user = Account.objects.create_user(
+            username='testapplicant',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        self.applicant = Applicant.objects.create(account=self.applicant_user)
+        for name in ['Python', 'PyTorch', 'Django']:
+            Skill.objects.create(applicant=self.applicant, skill_name=name)
+        for degree in ['BS Computer Science', 'MS Computer Science']:
+            Education.objects.create(
+                applicant=self.applicant,
+                institution='Georgia Tech',
+                degree=degree,
+                field_of_study='Computer Science',
+                start_date=date(2018, 8, 1),
+            )
+
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        Recruiter.objects.create(account=self.recruiter_user)
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+    def test_filter_all_skills_requires_every_skill(self):
+        """Test that every listed skill must match and rows are not multiplied"""
+        matches = filter_all_skills(Applicant.objects.all(), ['py', 'django'])
+        self.assertEqual(list(matches), [self.applicant])
+
+        matches = filter_all_skills(Applicant.objects.all(), ['py', 'react'])
+        self.assertEqual(list(matches), [])
+
+    def test_applicant_search_returns_each_applicant_once(self):
+        """Test that matching several education rows does not duplicate results"""
+        response = self.client.get(reverse('applicant:applicant_search'), {
+            'institution': 'Georgia',
+            'field_of_study': 'Computer',
+            'skill': 'py',
+        })
+
+        data = json.loads(response.content)
+        self.assertEqual(data['pagination']['total_count'], 1)
+        self.assertEqual([item['username'] for item in data['data']], ['testapplicant'])
+
+    def test_candidate_search_with_multiple_skills(self):
+        """Test that candidate search matches applicants having all skills"""
+        response = self.client.get(reverse('recruiter:candidate_search'), {'skills': 'Python, PyTorch'})
+
+        self.assertEqual(list(response.context['candidates']), [self.applicant])
+
+
+class BooleanQueryTestCase(TestCase):
+    """Test cases for the boolean query= search language"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.python_atl = self.create_applicant('pyatl', 'Atlanta', ['Python', 'Django'])
+        self.python_php = self.create_applicant('pyphp', 'Atlanta', ['Python', 'PHP'])
+        self.remote = self.create_applicant('pyremote', 'Boston', ['Python'], headline='Remote backend engineer')
+        self.create_applicant('javabos', 'Boston', ['Java'])
+
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=self.recruiter_user)
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+    def create_applicant(self, username, city, skills, headline=''):
+        account = Account.objects.create_user(
+            username=username,
+            password='testpass123',
+            city=city,
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        applicant = Applicant.objects.create(account=account, headline=headline)
+        for skill_name in skills:
+            Skill.objects.create(applicant=applicant, skill_name=skill_name)
+        return applicant
+
+    def search(self, query):
+        return set(Applicant.objects.filter(compile_query(query)).values_list('account__username', flat=True))
+
+    def test_example_expression(self):
+        """Test AND, OR, grouping, bare words and negation together"""
+        self.assertEqual(
+            self.search('skill:python AND (city:atlanta OR remote) AND -skill:php'),
+            {'pyatl', 'pyremote'}
+        )
+
+    def test_implicit_and_and_negated_group(self):
+        """Test that juxtaposed terms are ANDed and -( ) negates a group"""
+        self.assertEqual(self.search('skill:python city:boston'), {'pyremote'})
+        self.assertEqual(self.search('-(skill:php OR skill:django) city:atlanta'), set())
+        self.assertEqual(self.search('NOT skill:python'), {'javabos'})
+
+    def test_ored_skills_share_one_exists(self):
+        """Test that ORed terms on one relation compile to a single subquery"""
+        sql = str(Applicant.objects.filter(compile_query('skill:php OR skill:django OR skill:java')).query)
+        self.assertEqual(sql.count('EXISTS'), 1)
+        self.assertEqual(self.search('skill:php OR skill:django'), {'pyatl', 'pyphp'})
+
+    def test_compiled_plan_is_cached(self):
+        """Test that equivalent expression text reuses the compiled plan"""
+        self.assertIs(compile_query('skill:python  AND city:atlanta'), compile_query(' skill:python AND city:atlanta'))
+
+    def test_invalid_expressions(self):
+        """Test that malformed expressions raise QueryParseError"""
+        for text in ['(skill:python', 'skill:', 'salary:100', 'skill:python OR', 'a)']:
+            with self.assertRaises(QueryParseError, msg=text):
+                parse_query(text)
+
+    def test_deep_or_long_expressions_are_rejected(self):
+        """Test that nesting and length limits raise QueryParseError instead of recursing"""
+        for text in ['(' * 20 + 'a' + ')' * 20, 'NOT ' * 20 + 'a', '-(' * 20 + 'a' + ')' * 20,
+                     '(' * 3000 + 'a' + ')' * 3000, 'NOT ' * 3000 + 'a', 'a ' * 1000]:
+            with self.assertRaises(QueryParseError, msg=text[:40]):
+                compile_query(text)
+        self.assertEqual(self.search('(' * 8 + 'skill:java' + ')' * 8), {'javabos'})
+
+        response = self.client.get(reverse('recruiter:candidate_search'), {'query': 'NOT ' * 3000 + 'a'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('applicant:applicant_search'), {'query': '(' * 3000 + 'a' + ')' * 3000})
+        self.assertEqual(response.status_code, 400)
+
+    def test_views_accept_query(self):
+        """Test that both search views apply query= and reject invalid input"""
+        response = self.client.get(reverse('recruiter:candidate_search'), {'query': 'skill:python -skill:php city:atlanta'})
+        self.assertEqual(list(response.context['candidates']), [self.python_atl])
+
+        response = self.client.get(reverse('applicant:applicant_search'), {'query': 'skill:python AND remote'})
+        data = json.loads(response.content)
+        self.assertEqual([item['username'] for item in data['data']], ['pyremote'])
+
+        response = self.client.get(reverse('applicant:applicant_search'), {'query': '(skill:python'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(json.loads(response.content)['success'])
@@ -10,7 +10,10 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from .decorators import applicant_required
+from .filters import filter_related
 from .models import Applicant, Application, Education, Link, Skill, WorkExperience, ProfilePrivacySettings
+from .query import QueryParseError, compile_query
+from account.models import Location
 from applicant.utils import is_applicant
 from recruiter.models import Message, Notification
 from utils.messaging import get_messages_context
@@ -39,6 +42,13 @@ def applicant_search(request):
         )
 
     # Apply filters
+    query = request.GET.get("query", "").strip()
+    if query:
+        try:
+            applicants = applicants.filter(compile_query(query))
+        except QueryParseError as e:
+            return JsonResponse({"success": False, "error": f"Invalid query: {e}"}, status=400)
+
     headline = request.GET.get("headline")
     if headline:
         applicants = applicants.filter(headline__icontains=headline)
@@ -46,29 +56,29 @@ def applicant_search(request):
     # Education filters
     institution = request.GET.get("institution")
     if institution:
-        applicants = applicants.filter(education__institution__icontains=institution)
+        applicants = filter_related(applicants, "education", institution__icontains=institution)
 
     degree = request.GET.get("degree")
     if degree:
-        applicants = applicants.filter(education__degree__icontains=degree)
+        applicants = filter_related(applicants, "education", degree__icontains=degree)
 
     field_of_study = request.GET.get("field_of_study")
     if field_of_study:
-        applicants = applicants.filter(
-            education__field_of_study__icontains=field_of_study
+        applicants = filter_related(
+            applicants, "education", field_of_study__icontains=field_of_study
         )
 
     gpa_min = request.GET.get("gpa_min")
     if gpa_min:
         try:
-            applicants = applicants.filter(education__gpa__gte=float(gpa_min))
+            applicants = filter_related(applicants, "education", gpa__gte=float(gpa_min))
         except (ValueError, TypeError):
             pass
 
     gpa_max = request.GET.get("gpa_max")
     if gpa_max:
         try:
-            applicants = applicants.filter(education__gpa__lte=float(gpa_max))
+            applicants = filter_related(applicants, "education", gpa__lte=float(gpa_max))
         except (ValueError, TypeError):
             pass
 
@@ -76,40 +86,36 @@ def applicant_search(request):
     if graduation_year:
         try:
             year = datetime.strptime(graduation_year, "%Y").date()
-            applicants = applicants.filter(education__end_date__year=year.year)
+            applicants = filter_related(applicants, "education", end_date__year=year.year)
         except ValueError:
             pass
 
     # Work experience filters
     company = request.GET.get("company")
     if company:
-        applicants = applicants.filter(work_experiences__company__icontains=company)
+        applicants = filter_related(applicants, "work_experiences", company__icontains=company)
 
     position = request.GET.get("position")
     if position:
-        applicants = applicants.filter(work_experiences__position__icontains=position)
+        applicants = filter_related(applicants, "work_experiences", position__icontains=position)
 
     # Skills filters
     skill = request.GET.get("skill")
     if skill:
-        applicants = applicants.filter(skills__skill_name__icontains=skill)
+        applicants = filter_related(applicants, "skills", skill_name__icontains=skill)
 
     skill_level = request.GET.get("skill_level")
     if skill_level:
-        applicants = applicants.filter(skills__proficiency_level=skill_level)
+        applicants = filter_related(applicants, "skills", proficiency_level=skill_level)
 
-    # Account-level filters
+    # Account-level filters, matched against the normalized location table
     city = request.GET.get("city")
-    if city:
-        applicants = applicants.filter(account__city__icontains=city)
-
     state = request.GET.get("state")
-    if state:
-        applicants = applicants.filter(account__state__icontains=state)
-
     country = request.GET.get("country")
-    if country:
-        applicants = applicants.filter(account__country__icontains=country)
+    if city or state or country:
+        applicants = applicants.filter(
+            account__place__in=Location.matching(city=city, state=state, country=country)
+        )
 
     username = request.GET.get("username")
     if username:
@@ -554,8 +560,13 @@ def job_recommendations(request):
     # Get maximum recommendations to display (default: 20)
     limit = int(request.GET.get('limit', 20))
     
+    # Optionally also match skills related to the applicant's own
+    expand = request.GET.get('expand') == '1'
+
     # Get job recommendations
-    recommended_jobs = applicant.get_job_recommendations(min_matching_skills=min_matching_skills)[:limit]
+    recommended_jobs = applicant.get_job_recommendations(
+        min_matching_skills=min_matching_skills, expand=expand
+    )[:limit]
     
     # Get applicant's skills for display
     applicant_skills = applicant.skills.all()
@@ -579,6 +590,7 @@ def job_recommendations(request):
         "jobs_with_matching_skills": jobs_with_matching_skills,
         "applicant_skills": applicant_skills,
         "min_matching_skills": min_matching_skills,
+        "skills_expanded": expand,
         "total_recommendations": len(jobs_with_matching_skills),
         "has_skills": applicant_skills.exists(),
     }
@@ -2,7 +2,7 @@ from django.contrib import admin
 
 from utils.export import export_job_postings_csv
 
-from .models import JobPosting, JobApplication, JobSkill
+from .models import CommuteTime, ExchangeRate, JobPosting, JobApplication, JobSkill, SkillCooccurrence
 
 
 @admin.action(description="Export selected job postings to CSV")
@@ -38,3 +38,24 @@ class JobApplicationAdmin(admin.ModelAdmin):
     list_filter = ('status', 'applied_at')
     search_fields = ('applicant__username', 'job__title', 'job__company')
     readonly_fields = ('applied_at', 'updated_at')
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ('currency', 'usd_rate', 'updated_at')
+    search_fields = ('currency',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(SkillCooccurrence)
+class SkillCooccurrenceAdmin(admin.ModelAdmin):
+    list_display = ('skill', 'rank', 'related_skill', 'count', 'score')
+    search_fields = ('skill', 'related_skill')
+
+
+@admin.register(CommuteTime)
+class CommuteTimeAdmin(admin.ModelAdmin):
+    list_display = ('origin_cell', 'job', 'mode', 'minutes', 'miles', 'expires_at')
+    list_filter = ('mode',)
+    search_fields = ('job__title',)
+    raw_id_fields = ('job',)
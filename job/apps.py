@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JobConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "job"
+
+    def ready(self):
+        """Import signals when the app is ready."""
+        import job.signals
@@ -0,0 +1,134 @@
+"""
+Page and result caching for the public job board views.
+
+Cached entries are namespaced by a generation counter that is bumped whenever
+a JobPosting or JobSkill changes (see job/signals.py), so stale pages are never
+served after an edit and no key enumeration is needed to invalidate them.
+"""
+import hashlib
+import re
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from applicant.utils import is_applicant
+
+GENERATION_KEY = "job_board:generation"
+PAGE_CACHE_TIMEOUT = 300
+
+# Output of {% csrf_token %}; the token is swapped per visitor on cached pages
+CSRF_INPUT_RE = re.compile(rb'<input type="hidden" name="csrfmiddlewaretoken" value="([^"]+)">')
+CSRF_PLACEHOLDER = b"__csrf_token__"
+
+
+def get_generation() -> int:
+    """Return the current job board cache generation."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def bump_generation() -> None:
+    """Invalidate every cached job board page and result list."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Key expired or was never set; start a fresh generation
+        cache.set(GENERATION_KEY, 1, timeout=None)
+
+
+def normalize_query_string(query_dict) -> str:
+    """
+    Build a canonical query string so that parameter order and empty
+    parameters (e.g. ?type=&company=) don't fragment the cache.
+    """
+    pairs = []
+    for key in sorted(query_dict.keys()):
+        for value in sorted(query_dict.getlist(key)):
+            value = value.strip()
+            if value:
+                pairs.append((key, value))
+    return urlencode(pairs)
+
+
+def get_viewer_role(user) -> str | None:
+    """
+    Cacheable viewer role for the job board, or None if the viewer should
+    bypass the cache.
+
+    Anonymous visitors share full rendered pages. Applicants share the
+    result list only; their applied markers are looked up per request.
+    """
+    if not user.is_authenticated:
+        return "anonymous"
+    if is_applicant(user):
+        return "applicant"
+    return None
+
+
+def make_cache_key(view_name: str, role: str, request) -> str:
+    query = normalize_query_string(request.GET)
+    digest = hashlib.md5(query.encode("utf-8")).hexdigest()
+    return f"job_board:{get_generation()}:{view_name}:{role}:{digest}"
+
+
+def get_cached_jobs(request, view_name: str, jobs):
+    """
+    Return the evaluated job list for this request, shared across viewers
+    of the same role and query string.
+    """
+    role = get_viewer_role(request.user)
+    if role is None:
+        return jobs
+
+    key = make_cache_key(view_name, f"{role}-results", request)
+    cached = cache.get(key)
+    if cached is None:
+        cached = list(jobs)
+        cache.set(key, cached, PAGE_CACHE_TIMEOUT)
+    return cached
+
+
+def cache_anonymous_page(view_name: str):
+    """
+    Serve the full rendered page to anonymous visitors from the cache.
+
+    Only successful GET responses are stored. Authenticated users always
+    reach the view, since the page header is personalised.
+
+    The CSRF token is stored as a placeholder and replaced with the
+    visitor's own token when the page is served, which also sets their
+    CSRF cookie. The token is found through a {% csrf_token %} form input;
+    pages using it without one are not cached.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method != "GET" or get_viewer_role(request.user) != "anonymous":
+                return view_func(request, *args, **kwargs)
+
+            key = make_cache_key(view_name, "anonymous", request)
+            content = cache.get(key)
+            if content is not None:
+                if CSRF_PLACEHOLDER in content:
+                    content = content.replace(CSRF_PLACEHOLDER, get_token(request).encode())
+                return HttpResponse(content)
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                content = response.content
+                if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+                    # The page used the visitor's token; one render uses one value
+                    match = CSRF_INPUT_RE.search(content)
+                    if match is None:
+                        return response
+                    content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+                cache.set(key, content, PAGE_CACHE_TIMEOUT)
+            return response
+        return _wrapped
+    return decorator
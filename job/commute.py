@@ -0,0 +1,253 @@
+"""
+Server-side commute time cache for the job map.
+
+Commute times are looked up from the center of the searcher's grid cell (see
+utils.geo) rather than their exact position, so everyone in the same cell
+shares one CommuteTime row per job and travel mode. Misses are computed in
+batches through the provider named by the COMMUTE_PROVIDER setting:
+GoogleCommuteProvider (Distance Matrix API over a pooled session, with
+retries and a circuit breaker) or the offline StubCommuteProvider used by
+tests and benchmarks. Rows expire after COMMUTE_CACHE_TTL seconds; transient
+failures are never stored.
+"""
+import threading
+import time
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from account.geocoding import CircuitBreaker
+from utils.geo import cell_center, grid_cell, haversine
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+DISTANCE_MATRIX_TIMEOUT = 10
+
+# The Distance Matrix API accepts at most 25 destinations per request
+MAX_DESTINATIONS = 25
+
+MODES = ("driving", "transit", "walking", "bicycling")
+
+# Element statuses that are a final answer for the route
+DEFINITIVE_STATUSES = {"OK", "NOT_FOUND", "ZERO_RESULTS", "MAX_ROUTE_LENGTH_EXCEEDED"}
+
+# Request statuses worth retrying after a short backoff
+RETRYABLE_STATUSES = {"ERROR", "OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+DEFAULT_PROVIDER = "job.commute.GoogleCommuteProvider"
+
+METERS_PER_MILE = 1609.34
+
+Result = Tuple[Optional[float], Optional[float], str]
+
+
+class CommuteProvider:
+    """
+    Interface for commute time backends.
+
+    matrix() returns one (minutes, miles, status) per destination, in order.
+    status is "OK", a definitive failure such as "ZERO_RESULTS" (no route),
+    or a transient failure such as "ERROR" (request failed) or "UNAVAILABLE"
+    (circuit breaker open).
+    """
+
+    configured = True
+
+    def matrix(self, origin: Tuple[float, float], destinations: List[Tuple[float, float]], mode: str) -> List[Result]:
+        raise NotImplementedError
+
+
+class GoogleCommuteProvider(CommuteProvider):
+    """Google Distance Matrix API over one pooled requests.Session."""
+
+    def __init__(self, api_key=None, timeout=DISTANCE_MATRIX_TIMEOUT, retries=2, backoff=0.5,
+                 failure_threshold=5, reset_after=60.0, pool_size=4):
+        self.api_key = settings.GOOGLE_MAPS_API_KEY if api_key is None else api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_after)
+        self.session = requests.Session()
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def request(self, origin, destinations, mode) -> Tuple[str, List[Result]]:
+        """Make a single API call; status is "ERROR" when the request itself failed."""
+        params = {
+            "origins": f"{origin[0]},{origin[1]}",
+            "destinations": "|".join(f"{lat},{lng}" for lat, lng in destinations),
+            "mode": mode,
+            "key": self.api_key,
+        }
+        try:
+            response = self.session.get(DISTANCE_MATRIX_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error requesting commute times ({mode}): {e}")
+            return "ERROR", []
+
+        status = data.get("status") or "ERROR"
+        if status != "OK":
+            return status, []
+        results = []
+        for element in data["rows"][0]["elements"]:
+            if element.get("status") == "OK":
+                results.append((
+                    element["duration"]["value"] / 60,
+                    element["distance"]["value"] / METERS_PER_MILE,
+                    "OK",
+                ))
+            else:
+                results.append((None, None, element.get("status") or "ERROR"))
+        return status, results
+
+    def matrix(self, origin, destinations, mode) -> List[Result]:
+        if not self.breaker.allow():
+            return [(None, None, "UNAVAILABLE")] * len(destinations)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            status, results = self.request(origin, destinations, mode)
+            if status not in RETRYABLE_STATUSES:
+                break
+        self.breaker.record(status == "OK")
+        if status != "OK" or len(results) != len(destinations):
+            return [(None, None, status if status != "OK" else "ERROR")] * len(destinations)
+        return results
+
+
+class StubCommuteProvider(CommuteProvider):
+    """
+    Offline provider for tests and benchmarks.
+
+    Commutes follow the great-circle distance, lengthened by `detour`, at a
+    fixed speed per mode (`speeds`, in mph). `latency` adds a delay per call
+    to imitate a remote API.
+    """
+
+    SPEEDS = {"driving": 30.0, "transit": 18.0, "bicycling": 10.0, "walking": 3.0}
+
+    def __init__(self, speeds=None, detour=1.3, latency=0.0):
+        self.speeds = {**self.SPEEDS, **(speeds or {})}
+        self.detour = detour
+        self.latency = latency
+        self.calls = 0
+
+    def matrix(self, origin, destinations, mode) -> List[Result]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        results = []
+        for lat, lng in destinations:
+            miles = haversine(origin[0], origin[1], lat, lng) * self.detour
+            results.append((miles / self.speeds[mode] * 60, miles, "OK"))
+        return results
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> CommuteProvider:
+    """
+    Return the process-wide provider built from COMMUTE_PROVIDER.
+
+    Keyword arguments come from COMMUTE_PROVIDER_OPTIONS. The instance is
+    shared so its session pool and circuit breaker span all callers.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            provider_class = import_string(getattr(settings, "COMMUTE_PROVIDER", DEFAULT_PROVIDER))
+            _provider = provider_class(**getattr(settings, "COMMUTE_PROVIDER_OPTIONS", {}))
+        return _provider
+
+
+def reset_provider() -> None:
+    """Drop the shared provider so the next call rebuilds it from settings."""
+    global _provider
+    with _provider_lock:
+        _provider = None
+
+
+def get_commute_times(origin_lat: float, origin_lng: float, jobs, mode: str,
+                      max_misses: Optional[int] = None) -> Tuple[dict, list]:
+    """
+    Commute times from a point to job postings, answered from CommuteTime when possible.
+
+    jobs is a queryset of postings; those without coordinates are skipped.
+    Misses are requested from the provider from the center of the origin's
+    grid cell, MAX_DESTINATIONS at a time, and stored for COMMUTE_CACHE_TTL.
+    At most max_misses of them are computed per call (all when None).
+
+    Returns:
+        (times, pending): times maps job id to (minutes, miles), both None
+        when there is no route; pending lists the job ids not answered yet,
+        either beyond max_misses or hit by a transient provider failure.
+    """
+    from .models import CommuteTime
+
+    origin_cell = grid_cell(origin_lat, origin_lng)
+    targets = {
+        pk: (lat, lng, cell)
+        for pk, lat, lng, cell in jobs.filter(latitude__isnull=False, longitude__isnull=False)
+        .values_list("pk", "latitude", "longitude", "geo_cell")
+    }
+
+    results = {}
+    cached = CommuteTime.objects.filter(
+        origin_cell=origin_cell,
+        mode=mode,
+        job_id__in=list(targets),
+        job_cell=F("job__geo_cell"),
+        expires_at__gt=timezone.now(),
+    )
+    for job_id, minutes, miles in cached.values_list("job_id", "minutes", "miles"):
+        results[job_id] = (minutes, miles)
+
+    missing = [pk for pk in targets if pk not in results]
+    if not missing:
+        return results, []
+    provider = get_provider()
+    if not provider.configured:
+        print("Warning: GOOGLE_MAPS_API_KEY not set in environment variables")
+        return results, missing
+    if max_misses is not None:
+        missing, deferred = missing[:max_misses], missing[max_misses:]
+    else:
+        deferred = []
+
+    origin = cell_center(origin_cell)
+    expires_at = timezone.now() + timedelta(seconds=getattr(settings, "COMMUTE_CACHE_TTL", 30 * 24 * 3600))
+    rows = []
+    for start in range(0, len(missing), MAX_DESTINATIONS):
+        batch = missing[start:start + MAX_DESTINATIONS]
+        answers = provider.matrix(origin, [targets[pk][:2] for pk in batch], mode)
+        for pk, (minutes, miles, status) in zip(batch, answers):
+            if status not in DEFINITIVE_STATUSES:
+                continue
+            results[pk] = (minutes, miles)
+            rows.append(CommuteTime(
+                origin_cell=origin_cell,
+                job_id=pk,
+                job_cell=targets[pk][2],
+                mode=mode,
+                minutes=minutes,
+                miles=miles,
+                expires_at=expires_at,
+            ))
+    CommuteTime.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["origin_cell", "mode", "job"],
+        update_fields=["job_cell", "minutes", "miles", "expires_at"],
+    )
+    return results, [pk for pk in missing if pk not in results] + deferred
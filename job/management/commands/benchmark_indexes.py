@@ -0,0 +1,94 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+
+from account.models import Account
+from applicant.models import Application, Skill
+from job.models import JobPosting, JobSkill
+from recruiter.models import Message, Notification
+
+
+class Command(BaseCommand):
+    help = 'Time the hot-path queries with and without their secondary indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Number of times each query is run per measurement',
+        )
+
+    def get_benchmarks(self):
+        """
+        Return (label, index names, query) tuples for the current database.
+
+        Sample values are taken from existing rows so every query hits data.
+        """
+        account = Account.objects.order_by('date_joined').first()
+        partner = Message.objects.values_list('sender_id', 'recipient_id').first() or (None, None)
+        job = JobPosting.objects.order_by('-created_at').first()
+        skill_name = Skill.objects.values_list('skill_name', flat=True).first() or 'Python'
+        job_skill = JobSkill.objects.values_list('skill_name', 'importance_level').first() or ('Python', 'required')
+        city = (account.city if account else '').lower()
+        state = (account.state if account else '').lower()
+        country = (account.country if account else '').lower()
+
+        return [
+            ('Active jobs, newest first', ['job_active_created_idx'],
+             lambda: list(JobPosting.objects.filter(is_active=True).order_by('-created_at')[:20])),
+            ('Jobs by type', ['job_type_idx'],
+             lambda: JobPosting.objects.filter(job_type='remote').count()),
+            ('Applicants by skill name', ['skill_name_idx'],
+             lambda: list(Skill.objects.filter(skill_name__in=[skill_name]).values_list('applicant_id', flat=True))),
+            ('Job skills by name and importance', ['jobskill_name_importance_idx'],
+             lambda: list(JobSkill.objects.filter(skill_name=job_skill[0], importance_level=job_skill[1]))),
+            ('Unread notifications', ['notif_recipient_read_idx'],
+             lambda: Notification.objects.filter(recipient=account, is_read=False).count()),
+            ('Unread messages from partner', ['message_unread_idx'],
+             lambda: Message.objects.filter(recipient_id=partner[1], sender_id=partner[0], is_read=False).count()),
+            ('Latest message in thread', ['message_thread_idx'],
+             lambda: Message.objects.filter(sender_id=partner[0], recipient_id=partner[1]).order_by('-created_at').first()),
+            ('Applications by job and status', ['application_job_status_idx'],
+             lambda: Application.objects.filter(job=job, status='applied').count()),
+            ('Accounts by city', ['account_city_lower_idx'],
+             lambda: Account.objects.alias(city_lower=Lower('city')).filter(city_lower=city).count()),
+            ('Accounts by state', ['account_state_lower_idx'],
+             lambda: Account.objects.alias(state_lower=Lower('state')).filter(state_lower=state).count()),
+            ('Accounts by country', ['account_country_lower_idx'],
+             lambda: Account.objects.alias(country_lower=Lower('country')).filter(country_lower=country).count()),
+        ]
+
+    def time_query(self, query, repeat):
+        """Return the mean run time of a query in milliseconds."""
+        query()  # warm up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def time_without_indexes(self, index_names, query, repeat):
+        """Time a query with its indexes dropped inside a rolled-back transaction."""
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in index_names:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+            elapsed = self.time_query(query, repeat)
+            transaction.set_rollback(True)
+        return elapsed
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+
+        self.stdout.write(f'Running each query {repeat} times on {connection.vendor}\n')
+        self.stdout.write(f'{"Query":<36} {"Before (ms)":>12} {"After (ms)":>12} {"Speedup":>9}')
+
+        for label, index_names, query in self.get_benchmarks():
+            before = self.time_without_indexes(index_names, query, repeat)
+            after = self.time_query(query, repeat)
+            speedup = before / after if after else 0
+            self.stdout.write(f'{label:<36} {before:>12.3f} {after:>12.3f} {speedup:>8.1f}x')
+
+        self.stdout.write(self.style.SUCCESS('\nDone. Seed data first (e.g. populate_dummy_data) for meaningful numbers.'))
@@ -0,0 +1,53 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from job.models import ExchangeRate, JobPosting
+from job.utils import normalize_salaries
+
+
+class Command(BaseCommand):
+    help = 'Backfill the USD-normalized salary columns on job postings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rate',
+            action='append',
+            default=[],
+            metavar='CODE=USD_RATE',
+            help='Store an exchange rate before normalizing, e.g. --rate EUR=1.08 (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of postings written per bulk update',
+        )
+
+    def handle(self, *args, **options):
+        for entry in options['rate']:
+            code, _, value = entry.partition('=')
+            try:
+                usd_rate = Decimal(value)
+            except InvalidOperation:
+                raise CommandError(f'Invalid rate "{entry}", expected CODE=USD_RATE')
+            # Use update() so each rate doesn't trigger its own renormalization pass
+            code = code.strip().upper()
+            if not ExchangeRate.objects.filter(currency=code).update(usd_rate=usd_rate):
+                ExchangeRate.objects.bulk_create([ExchangeRate(currency=code, usd_rate=usd_rate)])
+            self.stdout.write(f'Stored rate: 1 {code} = {usd_rate} USD')
+
+        updated = normalize_salaries(JobPosting.objects.all(), batch_size=options['batch_size'])
+
+        missing = (
+            JobPosting.objects
+            .filter(salary_min_usd__isnull=True, salary_max_usd__isnull=True)
+            .exclude(salary_min__isnull=True, salary_max__isnull=True)
+            .values_list('salary_currency', flat=True)
+            .distinct()
+        )
+        for currency in missing:
+            self.stdout.write(
+                self.style.WARNING(f'No exchange rate stored for "{currency}"; those postings stay unnormalized')
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'\nNormalized salaries for {updated} job postings'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from job.utils import refresh_skill_cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the skill co-occurrence table used for search expansion'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of related skills kept per skill',
+        )
+        parser.add_argument(
+            '--min-count',
+            type=int,
+            default=2,
+            help='Minimum number of profiles/postings listing both skills',
+        )
+
+    def handle(self, *args, **options):
+        rows = refresh_skill_cooccurrence(top_n=options['top'], min_count=options['min_count'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {rows} skill neighbour rows'))
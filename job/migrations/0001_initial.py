@@ -0,0 +1,166 @@
+# Generated by Django 6.1.2 on 2026-10-19 06:37
+
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('account', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(help_text='ISO 4217 currency code', max_length=3, unique=True)),
+                ('usd_rate', models.DecimalField(decimal_places=6, help_text='Value of one unit of this currency in USD', max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['currency'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('company', models.CharField(default='', max_length=200)),
+                ('location', models.CharField(default='', max_length=200)),
+                ('street_address', models.CharField(blank=True, help_text='Street address', max_length=200)),
+                ('city', models.CharField(blank=True, help_text='City', max_length=100)),
+                ('state', models.CharField(blank=True, help_text='State/Province', max_length=100)),
+                ('zip_code', models.CharField(blank=True, help_text='ZIP/Postal code', max_length=20)),
+                ('country', models.CharField(blank=True, default='USA', help_text='Country', max_length=100)),
+                ('latitude', models.FloatField(blank=True, help_text='Latitude for map display', null=True)),
+                ('longitude', models.FloatField(blank=True, help_text='Longitude for map display', null=True)),
+                ('geo_cell', models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('latitude'), '+', models.Value(90)), '*', models.Value(10)), models.IntegerField()), '*', models.Value(3600)), '+', django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('longitude'), '+', models.Value(180)), '*', models.Value(10)), models.IntegerField())), output_field=models.IntegerField(null=True))),
+                ('geocode_status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='done', editable=False, max_length=10)),
+                ('job_type', models.CharField(choices=[('full-time', 'Full Time'), ('part-time', 'Part Time'), ('contract', 'Contract'), ('internship', 'Internship'), ('remote', 'Remote')], default='full-time', max_length=50)),
+                ('description', models.TextField(default='', help_text='Job description and summary.', max_length=2000)),
+                ('requirements', models.TextField(blank=True, help_text='Job requirements.')),
+                ('benefits', models.TextField(blank=True, help_text='Benefits and perks.')),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('salary_currency', models.CharField(default='USD', max_length=3)),
+                ('salary_min_usd', models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True)),
+                ('salary_max_usd', models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True)),
+                ('visa_sponsorship', models.BooleanField(default=False, help_text='Visa sponsorship available?')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application_deadline', models.DateTimeField(blank=True, null=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_postings', to=settings.AUTH_USER_MODEL)),
+                ('place', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_postings', to='account.location')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('personalized_note', models.TextField(blank=True, help_text='Add a personalized note to make your application stand out')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('reviewed', 'Reviewed'), ('shortlisted', 'Shortlisted'), ('rejected', 'Rejected'), ('hired', 'Hired')], default='pending', max_length=20)),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_applications', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_applications', to='job.jobposting')),
+            ],
+            options={
+                'ordering': ['-applied_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CommuteTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin_cell', models.IntegerField()),
+                ('job_cell', models.IntegerField()),
+                ('mode', models.CharField(max_length=20)),
+                ('minutes', models.FloatField(blank=True, null=True)),
+                ('miles', models.FloatField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='commute_times', to='job.jobposting')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill_name', models.CharField(max_length=100)),
+                ('importance_level', models.CharField(choices=[('required', 'Required'), ('preferred', 'Preferred'), ('nice_to_have', 'Nice to Have')], default='required', max_length=20)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='required_skills', to='job.jobposting')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SkillCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('related_skill', models.CharField(max_length=100)),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 is the strongest neighbour')),
+                ('count', models.PositiveIntegerField(help_text='Profiles and postings listing both skills')),
+                ('score', models.FloatField(help_text='Jaccard similarity of the two skills')),
+            ],
+            options={
+                'ordering': ['skill', 'rank'],
+                'indexes': [models.Index(fields=['skill', 'rank'], name='skill_cooccurrence_rank_idx')],
+                'unique_together': {('skill', 'related_skill')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_active', '-created_at'], name='job_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['job_type'], name='job_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_active', 'salary_min_usd'], name='job_active_salary_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_active', 'salary_max_usd'], name='job_active_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_active', 'latitude', 'longitude'], name='job_active_lat_lng_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['is_active', 'geo_cell'], name='job_active_geo_cell_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(condition=models.Q(('geocode_status', 'pending')), fields=['geocode_status'], name='job_geocode_pending_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobapplication',
+            unique_together={('job', 'applicant')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='commutetime',
+            unique_together={('origin_cell', 'mode', 'job')},
+        ),
+        migrations.AddIndex(
+            model_name='jobskill',
+            index=models.Index(fields=['skill_name', 'importance_level'], name='jobskill_name_importance_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobskill',
+            unique_together={('job', 'skill_name')},
+        ),
+    ]
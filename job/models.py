@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 from django.db import models
 from django.db.models import Q
 from django.utils import timezone
-from account.models import Account
+from account.models import Account, GeocodeStatus, Location, assign_place
+from utils.geo import grid_cell_expression
 
 
 class JobPosting(models.Model):
@@ -24,6 +27,30 @@ class JobPosting(models.Model):
     # 🌍 Added for User Story 7–9
     latitude = models.FloatField(null=True, blank=True, help_text="Latitude for map display")
     longitude = models.FloatField(null=True, blank=True, help_text="Longitude for map display")
+    # Grid cell of the coordinates for radius queries, kept current by the
+    # database on every write (see utils.geo)
+    geo_cell = models.GeneratedField(
+        expression=grid_cell_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
+    # Set to pending when the address changes; resolved by the geocode_worker command
+    geocode_status = models.CharField(
+        max_length=10,
+        choices=GeocodeStatus.choices,
+        default=GeocodeStatus.DONE,
+        editable=False,
+    )
+
+    # Normalized location, filled on save from city/state/country
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='job_postings',
+    )
 
     job_type = models.CharField(
         max_length=50,
@@ -42,6 +69,9 @@ class JobPosting(models.Model):
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     salary_currency = models.CharField(max_length=3, default='USD')
+    # Annual salary converted to USD via ExchangeRate, filled on save for range filtering
+    salary_min_usd = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    salary_max_usd = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
     visa_sponsorship = models.BooleanField(default=False, help_text="Visa sponsorship available?")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -50,6 +80,53 @@ class JobPosting(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', '-created_at'], name='job_active_created_idx'),
+            models.Index(fields=['job_type'], name='job_type_idx'),
+            models.Index(fields=['is_active', 'salary_min_usd'], name='job_active_salary_min_idx'),
+            models.Index(fields=['is_active', 'salary_max_usd'], name='job_active_salary_max_idx'),
+            models.Index(fields=['is_active', 'latitude', 'longitude'], name='job_active_lat_lng_idx'),
+            models.Index(fields=['is_active', 'geo_cell'], name='job_active_geo_cell_idx'),
+            models.Index(
+                fields=['geocode_status'],
+                name='job_geocode_pending_idx',
+                condition=Q(geocode_status='pending'),
+            ),
+        ]
+
+    SALARY_FIELDS = {'salary_min', 'salary_max', 'salary_currency'}
+
+    def save(self, *args, **kwargs):
+        assign_place(self, kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.update_normalized_salary()
+        elif self.SALARY_FIELDS & set(update_fields):
+            self.update_normalized_salary()
+            kwargs['update_fields'] = set(update_fields) | {'salary_min_usd', 'salary_max_usd'}
+        super().save(*args, **kwargs)
+
+    def update_normalized_salary(self, usd_rate=None):
+        """
+        Fill salary_min_usd/salary_max_usd from the raw salary and currency.
+
+        Args:
+            usd_rate (Decimal): Rate to use instead of looking up ExchangeRate
+
+        Leaves both columns empty when no rate is stored for the currency, so
+        the posting is excluded from salary range filters rather than compared
+        in the wrong currency.
+        """
+        if usd_rate is None:
+            usd_rate = ExchangeRate.get_usd_rate(self.salary_currency)
+
+        def convert(amount):
+            if amount is None or usd_rate is None:
+                return None
+            return (Decimal(amount) * usd_rate).quantize(Decimal('0.01'))
+
+        self.salary_min_usd = convert(self.salary_min)
+        self.salary_max_usd = convert(self.salary_max)
 
     def get_candidate_recommendations(self, min_matching_skills=1, include_applied=True):
         """
@@ -199,6 +276,83 @@ class JobSkill(models.Model):
 
     class Meta:
         unique_together = ['job', 'skill_name']
+        indexes = [
+            models.Index(fields=['skill_name', 'importance_level'], name='jobskill_name_importance_idx'),
+        ]
 
     def __str__(self):
         return f"{self.job.title} - {self.skill_name}"
+
+
+class SkillCooccurrence(models.Model):
+    """
+    Top-N related skills per skill, derived from applicant profiles and job
+    postings by the refresh_skill_cooccurrence command.
+
+    skill is the lowercased key; related_skill keeps the most common
+    spelling so it can be shown and matched against stored skill names.
+    """
+    skill = models.CharField(max_length=100)
+    related_skill = models.CharField(max_length=100)
+    rank = models.PositiveSmallIntegerField(help_text="1 is the strongest neighbour")
+    count = models.PositiveIntegerField(help_text="Profiles and postings listing both skills")
+    score = models.FloatField(help_text="Jaccard similarity of the two skills")
+
+    class Meta:
+        unique_together = ['skill', 'related_skill']
+        indexes = [
+            models.Index(fields=['skill', 'rank'], name='skill_cooccurrence_rank_idx'),
+        ]
+        ordering = ['skill', 'rank']
+
+    def __str__(self):
+        return f"{self.skill} → {self.related_skill} ({self.score:.2f})"
+
+
+class CommuteTime(models.Model):
+    """
+    Precomputed commute from a grid cell to a job posting (see job.commute).
+
+    Everyone whose position falls in the same origin cell shares one entry
+    per job and travel mode. job_cell records the posting's grid cell at the
+    time, so entries are ignored once the posting moves to another cell.
+    Null minutes mean the provider found no route.
+    """
+    origin_cell = models.IntegerField()
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='commute_times')
+    job_cell = models.IntegerField()
+    mode = models.CharField(max_length=20)
+    minutes = models.FloatField(null=True, blank=True)
+    miles = models.FloatField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ['origin_cell', 'mode', 'job']
+
+    def __str__(self):
+        return f"cell {self.origin_cell} → job {self.job_id} ({self.mode}): {self.minutes} min"
+
+
+class ExchangeRate(models.Model):
+    """Locally stored conversion rate used to normalize salaries to USD"""
+    currency = models.CharField(max_length=3, unique=True, help_text="ISO 4217 currency code")
+    usd_rate = models.DecimalField(max_digits=12, decimal_places=6, help_text="Value of one unit of this currency in USD")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['currency']
+
+    @classmethod
+    def get_usd_rate(cls, currency):
+        """Return the USD rate for a currency code, or None if it is unknown."""
+        currency = (currency or '').strip().upper()
+        if currency == 'USD':
+            return Decimal('1')
+        return cls.objects.filter(currency=currency).values_list('usd_rate', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        self.currency = self.currency.strip().upper()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"1 {self.currency} = {self.usd_rate} USD"
@@ -0,0 +1,43 @@
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .commute import reset_provider
+from .models import ExchangeRate, JobPosting, JobSkill
+from .utils import normalize_salaries
+from utils.geo import register_sql_functions
+
+
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+@receiver(post_save, sender=JobSkill)
+@receiver(post_delete, sender=JobSkill)
+def invalidate_job_board_cache(sender, **kwargs):
+    """
+    Bump the job board cache generation whenever a posting or its skills
+    change, so cached listing and search pages are rebuilt on next request.
+    """
+    bump_generation()
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def renormalize_salaries_for_rate(sender, instance, **kwargs):
+    """Re-convert salaries of postings in a currency whose rate changed."""
+    normalize_salaries(JobPosting.objects.filter(salary_currency__iexact=instance.currency))
+
+
+@receiver(connection_created)
+def register_geo_functions(sender, connection, **kwargs):
+    """Make HAVERSINE() available to queries on every new SQLite connection."""
+    if connection.vendor == 'sqlite':
+        register_sql_functions(connection.connection)
+
+
+@receiver(setting_changed)
+def reset_commute_provider(sender, setting, **kwargs):
+    """Rebuild the shared commute provider when its settings change (e.g. in tests)."""
+    if setting in ('GOOGLE_MAPS_API_KEY', 'COMMUTE_PROVIDER', 'COMMUTE_PROVIDER_OPTIONS'):
+        reset_provider()
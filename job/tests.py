@@ -1,3 +1,497 @@
-from django.test import TestCase
+import json
+import math
+import re
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import requests
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from account.models import Account
+from applicant.models import Applicant, Skill
+from job.commute import get_commute_times, get_provider, reset_provider
+from job.models import CommuteTime, ExchangeRate, JobPosting, JobSkill, SkillCooccurrence
+from job.utils import expand_skills, refresh_skill_cooccurrence
+from utils.geo import covering_cell_ranges, grid_cell, haversine
+
+
+class JobBoardPageCacheTestCase(TestCase):
+    """Test cases for the anonymous job board page cache"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            email='recruiter@test.com',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        self.job = JobPosting.objects.create(
+            owner=self.recruiter_user,
+            title='Backend Engineer',
+            company='Test Company',
+            location='Test City',
+        )
+        self.client = Client()
+
+    def test_anonymous_listing_served_from_cache(self):
+        """Test that a repeated anonymous request does not touch the database"""
+        response = self.client.get(reverse('job:job_listings'))
+        self.assertContains(response, 'Backend Engineer')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('job:job_listings'))
+        self.assertContains(response, 'Backend Engineer')
+
+    def test_cached_page_sets_csrf_token(self):
+        """Test that a visitor served a cached page can post with its CSRF token"""
+        self.client.get(reverse('job:job_listings'))
+
+        client = Client(enforce_csrf_checks=True)
+        with self.assertNumQueries(0):
+            response = client.get(reverse('job:job_listings'))
+        self.assertNotContains(response, '__csrf_token__')
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+
+        response = client.post(
+            reverse('account:login'),
+            json.dumps({'username': 'nobody', 'password': 'wrong'}),
+            content_type='application/json',
+            HTTP_X_CSRFTOKEN=token,
+        )
+        self.assertNotEqual(response.status_code, 403)
+
+        response = client.post(reverse('account:login'), '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_query_string_is_normalized(self):
+        """Test that parameter order and empty parameters share a cache entry"""
+        self.client.get(reverse('job:search_jobs') + '?title=Backend&remote=&visa=')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('job:search_jobs') + '?visa=&title=Backend')
+        self.assertContains(response, 'Backend Engineer')
+
+    def test_job_save_invalidates_cache(self):
+        """Test that editing a posting bumps the cache generation"""
+        self.client.get(reverse('job:job_listings'))
+
+        self.job.title = 'Platform Engineer'
+        self.job.save()
+
+        response = self.client.get(reverse('job:job_listings'))
+        self.assertContains(response, 'Platform Engineer')
+        self.assertNotContains(response, 'Backend Engineer')
+
+    def test_job_skill_delete_invalidates_cache(self):
+        """Test that removing a job skill bumps the cache generation"""
+        skill = JobSkill.objects.create(job=self.job, skill_name='Python')
+        self.client.get(reverse('job:job_listings'))
+
+        skill.delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('job:job_listings'))
+        self.assertGreater(len(queries), 0)
+
+
+class SalaryNormalizationTestCase(TestCase):
+    """Test cases for USD-normalized salary columns"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        ExchangeRate.objects.create(currency='eur', usd_rate=Decimal('1.100000'))
+
+    def create_job(self, title, salary_min, salary_max, currency):
+        return JobPosting.objects.create(
+            owner=self.recruiter_user,
+            title=title,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            salary_currency=currency,
+        )
+
+    def test_salary_normalized_on_save(self):
+        """Test that salaries are converted to USD when a posting is saved"""
+        job = self.create_job('Euro Job', 100000, 120000, 'EUR')
+
+        self.assertEqual(job.salary_min_usd, Decimal('110000.00'))
+        self.assertEqual(job.salary_max_usd, Decimal('132000.00'))
+
+    def test_unknown_currency_left_unnormalized(self):
+        """Test that postings in a currency without a rate are not compared"""
+        job = self.create_job('Yen Job', 9000000, 12000000, 'JPY')
+
+        self.assertIsNone(job.salary_min_usd)
+        self.assertIsNone(job.salary_max_usd)
+
+    def test_rate_change_renormalizes_postings(self):
+        """Test that updating a rate re-converts postings in that currency"""
+        job = self.create_job('Euro Job', 100000, 120000, 'EUR')
+
+        rate = ExchangeRate.objects.get(currency='EUR')
+        rate.usd_rate = Decimal('1.200000')
+        rate.save()
+
+        job.refresh_from_db()
+        self.assertEqual(job.salary_min_usd, Decimal('120000.00'))
+
+    def test_search_compares_salaries_in_usd(self):
+        """Test that salary range search uses the normalized columns"""
+        self.create_job('Euro Job', 100000, 120000, 'EUR')
+        self.create_job('Dollar Job', 100000, 120000, 'USD')
+
+        response = self.client.get(reverse('job:search_jobs'), {'salary_min': '105000'})
+
+        self.assertContains(response, 'Euro Job')
+        self.assertNotContains(response, 'Dollar Job')
+
+    def test_non_finite_salaries_are_ignored(self):
+        """Test that NaN and infinite salary bounds are treated as invalid input"""
+        self.create_job('Dollar Job', 100000, 120000, 'USD')
+
+        for value in ['nan', 'sNaN', 'inf', '-Infinity', 'abc']:
+            response = self.client.get(reverse('job:search_jobs'), {'salary_min': value, 'salary_max': value})
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, 'Dollar Job')
+
+
+class SkillCooccurrenceTestCase(TestCase):
+    """Test cases for skill co-occurrence expansion"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        for i, skills in enumerate([['React', 'Next.js'], ['react', 'Next.js', 'Redux'], ['React', 'Redux'], ['Java']]):
+            account = Account.objects.create_user(
+                username=f'applicant{i}',
+                password='testpass123',
+                city='Test City',
+                state='TS',
+                country='Test Country',
+                zip_code='12345'
+            )
+            applicant = Applicant.objects.create(account=account)
+            for name in skills:
+                Skill.objects.create(applicant=applicant, skill_name=name)
+
+        self.next_job = JobPosting.objects.create(
+            owner=self.recruiter_user, title='Frontend', requirements='Next.js and TypeScript'
+        )
+        for name in ['Next.js', 'React']:
+            JobSkill.objects.create(job=self.next_job, skill_name=name)
+
+    def test_refresh_builds_ranked_neighbours(self):
+        """Test that neighbours are ranked and pairs below min_count are dropped"""
+        refresh_skill_cooccurrence(top_n=5, min_count=2)
+
+        neighbours = list(
+            SkillCooccurrence.objects.filter(skill='react').values_list('related_skill', 'rank', 'count')
+        )
+        self.assertEqual(neighbours, [('Next.js', 1, 3), ('Redux', 2, 2)])
+        self.assertFalse(SkillCooccurrence.objects.filter(skill='java').exists())
+
+    def test_expand_skills_uses_one_query(self):
+        """Test that expansion of several terms is a single lookup"""
+        refresh_skill_cooccurrence(top_n=5, min_count=2)
+
+        with self.assertNumQueries(1):
+            expansions = expand_skills(['React', 'Redux', 'Cobol'], limit=1)
+        self.assertEqual(expansions, {'React': ['Next.js'], 'Redux': [], 'Cobol': []})
+
+    def test_search_jobs_expansion(self):
+        """Test that search_jobs offers expansion and applies it with expand=1"""
+        refresh_skill_cooccurrence(top_n=5, min_count=2)
+
+        response = self.client.get(reverse('job:search_jobs'), {'skills': 'React'})
+        self.assertEqual(list(response.context['jobs']), [])
+        self.assertEqual(response.context['skill_expansions'], [('React', ['Next.js', 'Redux'])])
+
+        response = self.client.get(reverse('job:search_jobs'), {'skills': 'React', 'expand': '1'})
+        self.assertEqual(list(response.context['jobs']), [self.next_job])
+
+
+class NearbyJobsTestCase(TestCase):
+    """Test cases for distance filtering with the HAVERSINE SQL function"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        # Georgia Tech, Marietta (~15 mi), Athens (~60 mi) and one without coordinates
+        self.midtown = self.create_job('Midtown', 33.7756, -84.3963)
+        self.marietta = self.create_job('Marietta', 33.9526, -84.5499)
+        self.athens = self.create_job('Athens', 33.9519, -83.3576)
+        self.create_job('Nowhere', None, None)
+
+    def create_job(self, title, latitude, longitude):
+        job = JobPosting.objects.create(owner=self.recruiter_user, title=title)
+        JobPosting.objects.filter(pk=job.pk).update(latitude=latitude, longitude=longitude)
+        return job
+
+    def test_sql_function_matches_python(self):
+        """Test that HAVERSINE is registered on the connection and agrees with Python"""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT HAVERSINE(33.7756, -84.3963, 33.9519, -83.3576)')
+            distance = cursor.fetchone()[0]
+
+        self.assertAlmostEqual(distance, haversine(33.7756, -84.3963, 33.9519, -83.3576))
+        self.assertTrue(59 < distance < 62)
+
+    def test_search_jobs_near_sorted_by_distance(self):
+        """Test that near= keeps jobs within the radius, nearest first"""
+        response = self.client.get(reverse('job:search_jobs'), {'near': '33.78,-84.40', 'radius': '25'})
+        self.assertEqual(list(response.context['jobs']), [self.midtown, self.marietta])
+
+        response = self.client.get(reverse('job:job_listings'), {'near': '33.95,-83.36', 'radius': '100'})
+        self.assertEqual(list(response.context['jobs']), [self.athens, self.midtown, self.marietta])
+
+    def test_geo_cell_follows_coordinates(self):
+        """Test that the database computes the same grid cell as Python"""
+        cells = dict(JobPosting.objects.values_list('title', 'geo_cell'))
+        self.assertEqual(cells['Midtown'], grid_cell(33.7756, -84.3963))
+        self.assertIsNone(cells['Nowhere'])
+
+        JobPosting.objects.filter(pk=self.midtown.pk).update(latitude=-33.87, longitude=151.21)
+        self.midtown.refresh_from_db()
+        self.assertEqual(self.midtown.geo_cell, grid_cell(-33.87, 151.21))
+
+    def test_cell_ranges_cover_radius(self):
+        """Test that every point within the radius falls in a covering cell"""
+        for lat, lng in [(33.78, -84.40), (64.8, -147.7), (-36.85, 174.76), (0.0, 179.95)]:
+            ranges = covering_cell_ranges(lat, lng, 25)
+            for step in range(36):
+                bearing = math.radians(step * 10)
+                point_lat = lat + math.degrees(24.9 / 3958.8) * math.cos(bearing)
+                point_lng = lng + math.degrees(24.9 / 3958.8) * math.sin(bearing) / math.cos(math.radians(point_lat))
+                if point_lng > 180:
+                    point_lng -= 360
+                cell = grid_cell(point_lat, point_lng)
+                self.assertTrue(any(first <= cell <= last for first, last in ranges), (lat, lng, step))
+
+    def test_invalid_near_is_ignored(self):
+        """Test that malformed coordinates fall back to the unfiltered search"""
+        response = self.client.get(reverse('job:search_jobs'), {'near': 'atlanta'})
+        self.assertEqual(len(response.context['jobs']), 4)
+
+
+class JobMapDataTestCase(TestCase):
+    """Test cases for the viewport job map endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        self.midtown = self.create_job('Midtown', 33.7756, -84.3963)
+        self.athens = self.create_job('Athens', 33.9519, -83.3576)
+        self.closed = self.create_job('Closed', 33.7800, -84.3900, is_active=False)
+        self.fiji = self.create_job('Fiji', -17.7134, 178.0650)
+        self.url = reverse('job:job_map_data')
+
+    def create_job(self, title, latitude, longitude, is_active=True):
+        job = JobPosting.objects.create(owner=self.recruiter_user, title=title, company='Acme', is_active=is_active)
+        JobPosting.objects.filter(pk=job.pk).update(latitude=latitude, longitude=longitude)
+        return job
+
+    def test_returns_active_jobs_in_viewport_as_columns(self):
+        """Test that only active jobs inside the bbox are returned, as parallel arrays"""
+        response = self.client.get(self.url, {'bbox': '-85,33,-84,34'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['id'], [self.midtown.pk])
+        self.assertEqual(data['title'], ['Midtown'])
+        self.assertEqual(data['company'], ['Acme'])
+        self.assertEqual((data['lat'], data['lng']), ([33.7756], [-84.3963]))
+        self.assertFalse(data['truncated'])
+
+    def test_viewport_across_antimeridian(self):
+        """Test that a bbox with west > east wraps around the antimeridian"""
+        response = self.client.get(self.url, {'bbox': '170,-20,-170,-10'})
+        self.assertEqual(response.json()['id'], [self.fiji.pk])
+
+    def test_invalid_bbox(self):
+        """Test that a missing or malformed bbox is rejected"""
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'bbox': '-85,34,-84,33'}).status_code, 400)
+
+    def test_etag_revalidation(self):
+        """Test that unchanged viewports return 304 until a job changes"""
+        response = self.client.get(self.url, {'bbox': '-85,33,-83,34'})
+        etag = response['ETag']
+
+        response = self.client.get(self.url, {'bbox': '-85,33,-83,34'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.athens.is_active = False
+        self.athens.save()
+        response = self.client.get(self.url, {'bbox': '-85,33,-83,34'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], [self.midtown.pk])
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_map_page_does_not_embed_jobs(self):
+        """Test that the map page loads jobs from the endpoint instead of inline"""
+        response = self.client.get(reverse('job:job_map'))
+        self.assertContains(response, self.url)
+        self.assertNotContains(response, 'Midtown')
+
+
+@override_settings(COMMUTE_PROVIDER='job.commute.StubCommuteProvider', COMMUTE_PROVIDER_OPTIONS={})
+class CommuteTimeTestCase(TestCase):
+    """Test cases for the shared commute time cache"""
+
+    def setUp(self):
+        """Set up test data"""
+        reset_provider()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Test City',
+            state='TS',
+            country='Test Country',
+            zip_code='12345'
+        )
+        self.midtown = self.create_job('Midtown', 33.7756, -84.3963)
+        self.athens = self.create_job('Athens', 33.9519, -83.3576)
+        self.url = reverse('job:job_map_commute')
+
+    def create_job(self, title, latitude, longitude):
+        job = JobPosting.objects.create(owner=self.recruiter_user, title=title)
+        JobPosting.objects.filter(pk=job.pk).update(latitude=latitude, longitude=longitude)
+        return job
+
+    def test_neighbours_share_cached_times(self):
+        """Test that origins in the same grid cell reuse one provider call"""
+        jobs = JobPosting.objects.all()
+        first, pending = get_commute_times(33.751, -84.391, jobs, 'driving')
+        second, _ = get_commute_times(33.759, -84.399, jobs, 'driving')
+
+        self.assertEqual(first, second)
+        self.assertEqual(pending, [])
+        self.assertEqual(set(first), {self.midtown.pk, self.athens.pk})
+        self.assertEqual(get_provider().calls, 1)
+        self.assertEqual(CommuteTime.objects.count(), 2)
+        self.assertLess(first[self.midtown.pk][0], first[self.athens.pk][0])
+
+        get_commute_times(33.751, -84.391, jobs, 'walking')
+        self.assertEqual(get_provider().calls, 2)
+
+    def test_moved_job_is_recomputed(self):
+        """Test that a cached time is ignored once the job moves to another cell"""
+        jobs = JobPosting.objects.filter(pk=self.athens.pk)
+        before = get_commute_times(33.75, -84.39, jobs, 'driving')[0][self.athens.pk]
+        JobPosting.objects.filter(pk=self.athens.pk).update(latitude=33.78, longitude=-84.40)
+
+        after = get_commute_times(33.75, -84.39, jobs, 'driving')[0][self.athens.pk]
+        self.assertLess(after[0], before[0])
+        self.assertEqual(get_provider().calls, 2)
+        self.assertEqual(CommuteTime.objects.count(), 1)
+
+    @override_settings(
+        COMMUTE_PROVIDER='job.commute.GoogleCommuteProvider',
+        COMMUTE_PROVIDER_OPTIONS={'api_key': 'test-key', 'backoff': 0},
+    )
+    def test_google_provider_skips_transient_failures(self):
+        """Test that routes are parsed and failed requests are not cached"""
+        response = mock.Mock()
+        response.json.return_value = {
+            'status': 'OK',
+            'rows': [{'elements': [
+                {'status': 'OK', 'duration': {'value': 900}, 'distance': {'value': 8046.7}},
+                {'status': 'ZERO_RESULTS'},
+            ]}],
+        }
+        jobs = JobPosting.objects.order_by('pk')
+        with mock.patch('job.commute.requests.Session.get', side_effect=[response]) as get:
+            times, _ = get_commute_times(33.75, -84.39, jobs, 'transit')
+        self.assertEqual(get.call_args.kwargs['params']['mode'], 'transit')
+        self.assertAlmostEqual(times[self.midtown.pk][0], 15)
+        self.assertAlmostEqual(times[self.midtown.pk][1], 5, places=2)
+        self.assertEqual(times[self.athens.pk], (None, None))
+
+        with mock.patch('job.commute.requests.Session.get', side_effect=requests.exceptions.Timeout):
+            self.assertEqual(
+                get_commute_times(33.75, -84.39, jobs, 'driving'), ({}, [self.midtown.pk, self.athens.pk])
+            )
+        self.assertFalse(CommuteTime.objects.filter(mode='driving').exists())
+
+    def test_misses_are_capped(self):
+        """Test that uncached times beyond max_misses are returned as pending"""
+        jobs = JobPosting.objects.order_by('pk')
+        times, pending = get_commute_times(33.75, -84.39, jobs, 'driving', max_misses=1)
+        self.assertEqual(list(times), [self.midtown.pk])
+        self.assertEqual(pending, [self.athens.pk])
+
+        # Cached times do not count towards the cap
+        times, pending = get_commute_times(33.75, -84.39, jobs, 'driving', max_misses=1)
+        self.assertEqual(set(times), {self.midtown.pk, self.athens.pk})
+        self.assertEqual(pending, [])
+        self.assertEqual(get_provider().calls, 2)
+
+    def test_commute_endpoint(self):
+        """Test that the endpoint returns columnar minutes and validates its input"""
+        params = {'origin': '33.75,-84.39', 'ids': str(self.midtown.pk)}
+        self.assertEqual(self.client.get(self.url, params).status_code, 302)
+        self.assertEqual(get_provider().calls, 0)
+
+        self.client.force_login(self.recruiter_user)
+        response = self.client.get(self.url, {
+            'origin': '33.75,-84.39', 'mode': 'DRIVING', 'ids': f'{self.athens.pk},{self.midtown.pk},999999',
+        })
+        data = response.json()
+        self.assertEqual(data['id'], [self.athens.pk, self.midtown.pk])
+        self.assertEqual(len(data['minutes']), 2)
+        self.assertEqual(len(data['miles']), 2)
+        self.assertEqual(data['pending'], [])
+
+        with mock.patch('job.views.MAX_COMMUTE_MISSES', 0):
+            data = self.client.get(self.url, {'origin': '40.0,-80.0', 'ids': str(self.midtown.pk)}).json()
+        self.assertEqual(data['id'], [])
+        self.assertEqual(data['pending'], [self.midtown.pk])
+
+        self.assertEqual(self.client.get(self.url, {'origin': '33.75,-84.39', 'mode': 'flying', 'ids': '1'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'origin': '33.75,-84.39', 'ids': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': '1'}).status_code, 400)
@@ -9,4 +9,6 @@ urlpatterns = [
     path('<int:job_id>/apply/', views.apply_to_job, name='apply_to_job'),
 
     path('map/', views.job_map, name='job_map'),
+    path('map/data/', views.job_map_data, name='job_map_data'),
+    path('map/commute/', views.job_map_commute, name='job_map_commute'),
 ]
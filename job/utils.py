@@ -1,6 +1,9 @@
-import requests
+from decimal import Decimal, InvalidOperation
 from typing import Optional, Tuple
-from django.conf import settings
+
+from account.gazetteer import lookup_centroid
+from account.geocoding import format_address, geocode_full_address
+from account.models import GeocodeStatus, mark_geocode_pending
 
 
 def geocode_address(
@@ -13,6 +16,9 @@ def geocode_address(
     """
     Geocode an address using Google Geocoding API.
 
+    Addresses without a street are resolved offline from the gazetteer (ZIP
+    or city/state centroid) without calling the API.
+
     Returns a tuple of (latitude, longitude) or (None, None) if geocoding fails.
 
     Args:
@@ -25,46 +31,208 @@ def geocode_address(
     Returns:
         Tuple of (latitude, longitude) or (None, None) if geocoding fails
     """
-    api_key = settings.GOOGLE_MAPS_API_KEY
-
-    if not api_key:
-        print("Warning: GOOGLE_MAPS_API_KEY not set in environment variables")
-        return None, None
+    if not (street_address and street_address.strip()):
+        # Only exact street addresses go to the external geocoder
+        return lookup_centroid(city, state, zip_code, country) or (None, None)
 
     # Build the full address string from components
-    address_parts = [
-        part.strip()
-        for part in [street_address, city, state, zip_code, country]
-        if part and part.strip()
+    full_address = format_address(street_address, city, state, zip_code, country)
+
+    # Identical addresses are answered from the shared geocode cache
+    return geocode_full_address(full_address)
+
+
+JOB_ADDRESS_FIELDS = {'street_address', 'city', 'state', 'zip_code', 'country'}
+
+
+def queue_job_geocode(job, changed_fields=None) -> None:
+    """
+    Mark a posting for background geocoding when its coordinates are stale.
+
+    Coordinates set by the caller (the map picker) are kept. Otherwise a new
+    posting without coordinates, or a form that changes the address, is
+    marked pending for the geocode_worker command. Forms prefill new postings
+    with the recruiter's address and coordinates, so their changed_data is
+    passed on create too: prefilled coordinates only stand while the address
+    they belong to is unchanged.
+
+    Args:
+        job: Unsaved JobPosting instance
+        changed_fields: Form changed_data; None trusts any coordinates already set
+    """
+    has_coordinates = job.latitude is not None and job.longitude is not None
+    changed = set(changed_fields or ())
+
+    if has_coordinates and (changed_fields is None or changed & {'latitude', 'longitude'}):
+        job.geocode_status = GeocodeStatus.DONE
+    elif not has_coordinates or changed & JOB_ADDRESS_FIELDS:
+        mark_geocode_pending(job)
+
+
+def parse_salary(value) -> Optional[Decimal]:
+    """Parse a salary search bound; None if malformed or not finite (NaN, Infinity)."""
+    try:
+        salary = Decimal(value)
+    except (TypeError, InvalidOperation):
+        return None
+    return salary if salary.is_finite() else None
+
+
+def normalize_salaries(queryset, batch_size: int = 500) -> int:
+    """
+    Recompute the USD salary columns for every posting in a queryset.
+
+    Rates are looked up once per currency and rows are written back with
+    bulk_update, so this is safe to run over the whole table.
+
+    Returns:
+        Number of postings updated
+    """
+    from .cache import bump_generation
+    from .models import ExchangeRate, JobPosting
+
+    rates = {}
+    batch = []
+    updated = 0
+
+    postings = queryset.only('id', 'salary_min', 'salary_max', 'salary_currency')
+    for job in postings.iterator(chunk_size=batch_size):
+        currency = (job.salary_currency or '').strip().upper()
+        if currency not in rates:
+            rates[currency] = ExchangeRate.get_usd_rate(currency)
+        job.update_normalized_salary(usd_rate=rates[currency])
+        batch.append(job)
+
+        if len(batch) >= batch_size:
+            JobPosting.objects.bulk_update(batch, ['salary_min_usd', 'salary_max_usd'])
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        JobPosting.objects.bulk_update(batch, ['salary_min_usd', 'salary_max_usd'])
+        updated += len(batch)
+
+    # bulk_update skips save signals, so invalidate cached job pages here
+    if updated:
+        bump_generation()
+
+    return updated
+
+
+def refresh_skill_cooccurrence(top_n: int = 10, min_count: int = 2) -> int:
+    """
+    Rebuild the SkillCooccurrence table from applicant and job skills.
+
+    Every applicant profile and job posting counts as one set of skills.
+    Pairs listed together at least min_count times are scored by Jaccard
+    similarity and the top_n neighbours of each skill are stored.
+
+    Returns:
+        Number of rows written
+    """
+    from collections import Counter, defaultdict
+    from itertools import combinations
+
+    from django.db import transaction
+
+    from applicant.models import Skill
+    from .models import JobSkill, SkillCooccurrence
+
+    skill_sets = defaultdict(set)
+    spellings = defaultdict(Counter)
+    sources = [
+        ('applicant', Skill.objects.values_list('applicant_id', 'skill_name')),
+        ('job', JobSkill.objects.values_list('job_id', 'skill_name')),
     ]
+    for kind, rows in sources:
+        for owner_id, name in rows.iterator(chunk_size=2000):
+            key = name.strip().lower()
+            if key:
+                skill_sets[(kind, owner_id)].add(key)
+                spellings[key][name.strip()] += 1
+
+    frequency = Counter()
+    pairs = Counter()
+    for names in skill_sets.values():
+        frequency.update(names)
+        pairs.update(combinations(sorted(names), 2))
+
+    neighbours = defaultdict(list)
+    for (a, b), count in pairs.items():
+        if count < min_count:
+            continue
+        score = count / (frequency[a] + frequency[b] - count)
+        neighbours[a].append((score, count, b))
+        neighbours[b].append((score, count, a))
 
-    if not address_parts:
-        return None, None
+    rows = []
+    for skill, candidates in neighbours.items():
+        candidates.sort(key=lambda c: (-c[0], -c[1], c[2]))
+        for rank, (score, count, other) in enumerate(candidates[:top_n], start=1):
+            rows.append(SkillCooccurrence(
+                skill=skill,
+                related_skill=spellings[other].most_common(1)[0][0],
+                rank=rank,
+                count=count,
+                score=score,
+            ))
 
-    full_address = ", ".join(address_parts)
+    with transaction.atomic():
+        SkillCooccurrence.objects.all().delete()
+        SkillCooccurrence.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def expand_skills(skill_names, limit: int = 3) -> dict:
+    """
+    Look up the strongest related skills for each skill name.
 
-    # Use Google Geocoding API
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {
-        "address": full_address,
-        "key": api_key
+    All names are resolved in one query over the (skill, rank) index.
+
+    Returns:
+        Dict mapping each given name to its related skill names, best first
+    """
+    from .models import SkillCooccurrence
+
+    keys = {name: name.strip().lower() for name in skill_names if name.strip()}
+    if not keys:
+        return {}
+
+    related = {}
+    rows = (
+        SkillCooccurrence.objects
+        .filter(skill__in=set(keys.values()), rank__lte=limit)
+        .order_by('skill', 'rank')
+        .values_list('skill', 'related_skill')
+    )
+    for key, related_skill in rows:
+        related.setdefault(key, []).append(related_skill)
+
+    return {
+        name: [r for r in related.get(key, []) if r.lower() not in keys.values()]
+        for name, key in keys.items()
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-
-        if data.get("status") == "OK" and data.get("results"):
-            location = data["results"][0]["geometry"]["location"]
-            latitude = location["lat"]
-            longitude = location["lng"]
-            print(f"Geocoded '{full_address}' to ({latitude}, {longitude})")
-            return latitude, longitude
-        else:
-            print(f"Geocoding failed for '{full_address}': {data.get('status')}")
-            return None, None
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error geocoding address: {e}")
-        return None, None
+
+def skill_expansion_context(request, skill_names) -> dict:
+    """
+    Template context offering "also matches" expansion for searched skills.
+
+    Expansion is applied when the request has expand=1; skill_alternatives
+    is then the mapping to pass to the skill filter, otherwise it is empty.
+    """
+    expansions = expand_skills(skill_names)
+    expanded = request.GET.get('expand') == '1'
+
+    params = request.GET.copy()
+    if expanded:
+        params.pop('expand', None)
+    else:
+        params['expand'] = '1'
+
+    return {
+        'skill_expansions': [(name, related) for name, related in expansions.items() if related],
+        'skills_expanded': expanded,
+        'expand_toggle_query': params.urlencode(),
+        'skill_alternatives': expansions if expanded else {},
+    }
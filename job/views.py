@@ -1,15 +1,31 @@
+import hashlib
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.contrib import messages
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.db import IntegrityError
+from django.db.models import Q
+from .cache import cache_anonymous_page, get_cached_jobs, get_generation
+from .commute import MODES, get_commute_times
 from .models import JobPosting
+from .utils import parse_salary, skill_expansion_context
 from applicant.models import Application
 from applicant.utils import is_applicant
 from django.conf import settings  # ✅ Access GOOGLE_MAPS_API_KEY
+from utils.geo import filter_near, filter_viewport, parse_bbox, parse_near, parse_radius
+
+# Most postings returned for one job map viewport
+MAX_MAP_JOBS = 2000
+# Most postings per commute time request
+MAX_COMMUTE_JOBS = 200
+# Most uncached commute times computed per request; the rest are returned as pending
+MAX_COMMUTE_MISSES = 50
 
 
+@cache_anonymous_page('job_listings')
 def job_listings(request):
     """Display all active job listings"""
     jobs = JobPosting.objects.filter(is_active=True).select_related('owner')
@@ -27,6 +43,13 @@ def job_listings(request):
     if company:
         jobs = jobs.filter(company__icontains=company)
 
+    # Jobs near a point, nearest first (near=lat,lng&radius=miles)
+    near = parse_near(request.GET.get('near'))
+    if near:
+        jobs = filter_near(jobs, *near, parse_radius(request.GET.get('radius')), cell_field='geo_cell')
+
+    jobs = get_cached_jobs(request, 'job_listings', jobs)
+
     if request.user.is_authenticated and is_applicant(request.user):
         applied_job_ids = Application.objects.filter(
             applicant=request.user
@@ -39,6 +62,7 @@ def job_listings(request):
         'applied_job_ids': applied_job_ids,
         'job_types': JobPosting._meta.get_field('job_type').choices,
         'google_maps_api_key': settings.GOOGLE_MAPS_API_KEY,
+        'near': near,
     }
     return render(request, 'job/job_listings.html', context)
 
@@ -94,6 +118,7 @@ def apply_to_job(request, job_id):
         return JsonResponse({'error': 'Failed to submit application'}, status=500)
 
 
+@cache_anonymous_page('search_jobs')
 def search_jobs(request):
     """Enhanced job search with advanced filtering"""
     jobs = JobPosting.objects.filter(is_active=True).select_related('owner')
@@ -107,21 +132,22 @@ def search_jobs(request):
 
     if title:
         jobs = jobs.filter(title__icontains=title)
-    if skills:
-        for skill in [s.strip() for s in skills.split(',') if s.strip()]:
-            jobs = jobs.filter(requirements__icontains=skill)
+    skill_names = [s.strip() for s in skills.split(',') if s.strip()]
+    expansion = skill_expansion_context(request, skill_names)
+    for skill in skill_names:
+        # Each searched skill may also be satisfied by its related skills
+        skill_q = Q(requirements__icontains=skill)
+        for related in expansion['skill_alternatives'].get(skill, []):
+            skill_q |= Q(requirements__icontains=related)
+        jobs = jobs.filter(skill_q)
     if location:
         jobs = jobs.filter(location__icontains=location)
-    if salary_min:
-        try:
-            jobs = jobs.filter(salary_min__gte=float(salary_min))
-        except ValueError:
-            pass
-    if salary_max:
-        try:
-            jobs = jobs.filter(salary_max__lte=float(salary_max))
-        except ValueError:
-            pass
+    salary_min = parse_salary(salary_min)
+    if salary_min is not None:
+        jobs = jobs.filter(salary_min_usd__gte=salary_min)
+    salary_max = parse_salary(salary_max)
+    if salary_max is not None:
+        jobs = jobs.filter(salary_max_usd__lte=salary_max)
     if remote == 'remote':
         jobs = jobs.filter(job_type='remote')
     elif remote == 'onsite':
@@ -130,6 +156,11 @@ def search_jobs(request):
         jobs = jobs.filter(visa_sponsorship=True)
     elif visa == 'no':
         jobs = jobs.filter(visa_sponsorship=False)
+    near = parse_near(request.GET.get('near'))
+    if near:
+        jobs = filter_near(jobs, *near, parse_radius(request.GET.get('radius')), cell_field='geo_cell')
+
+    jobs = get_cached_jobs(request, 'search_jobs', jobs)
 
     applied_job_ids = (
         Application.objects.filter(applicant=request.user).values_list('job_id', flat=True)
@@ -141,16 +172,100 @@ def search_jobs(request):
         'jobs': jobs,
         'applied_job_ids': applied_job_ids,
         'job_types': JobPosting._meta.get_field('job_type').choices,
+        'near': near,
+        **expansion,
     }
     return render(request, 'job/search.html', context)
 
 
 # 🌍 User Stories 7–9 — Interactive Map View
 def job_map(request):
-    """Display all job postings with latitude/longitude on a Google Map."""
-    jobs = JobPosting.objects.exclude(latitude__isnull=True, longitude__isnull=True)
+    """
+    Display active job postings on a Google Map.
+
+    Jobs are loaded per viewport from job_map_data as the user pans, so the
+    page itself does not embed any postings.
+    """
     context = {
-        "jobs": jobs,
         "google_maps_api_key": settings.GOOGLE_MAPS_API_KEY,  # ✅ pulled from .env via settings.py
     }
     return render(request, "job/job_map.html", context)
+
+
+def job_map_etag(request):
+    """ETag for a job map viewport: changes whenever any job posting changes."""
+    bbox = parse_bbox(request.GET.get('bbox'))
+    if bbox is None:
+        return None
+    return f"{get_generation()}-{hashlib.md5(repr(bbox).encode()).hexdigest()}"
+
+
+@require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=job_map_etag)
+def job_map_data(request):
+    """
+    Return the active jobs inside a map viewport as JSON.
+
+    Expects bbox=west,south,east,north. The payload is columnar: parallel
+    id, lat, lng, title and company arrays, plus a truncated flag when the
+    viewport holds more than MAX_MAP_JOBS postings. Responses carry an ETag
+    so unchanged viewports revalidate with a 304.
+    """
+    bbox = parse_bbox(request.GET.get('bbox'))
+    if bbox is None:
+        return JsonResponse({'error': 'bbox=west,south,east,north is required'}, status=400)
+
+    jobs = filter_viewport(JobPosting.objects.filter(is_active=True).order_by(), bbox, cell_field='geo_cell')
+    rows = list(jobs.values_list('id', 'latitude', 'longitude', 'title', 'company')[:MAX_MAP_JOBS + 1])
+    truncated = len(rows) > MAX_MAP_JOBS
+    columns = list(zip(*rows[:MAX_MAP_JOBS])) or [()] * 5
+    ids, lat, lng, title, company = (list(column) for column in columns)
+    return JsonResponse({
+        'id': ids,
+        'lat': lat,
+        'lng': lng,
+        'title': title,
+        'company': company,
+        'truncated': truncated,
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def job_map_commute(request):
+    """
+    Return commute times from a point to job postings as JSON.
+
+    Expects origin=lat,lng, mode (driving, transit, walking or bicycling)
+    and ids, a comma-separated list of up to MAX_COMMUTE_JOBS job IDs. The
+    payload has parallel id, minutes and miles arrays for the active jobs
+    whose commute is known; minutes and miles are null when there is no
+    route. Times are shared with everyone starting from the same grid cell.
+
+    Only MAX_COMMUTE_MISSES uncached times are computed per request, since
+    each one is a paid API lookup; the other job IDs are listed in pending
+    for the client to ask for again.
+    """
+    origin = parse_near(request.GET.get('origin'))
+    mode = request.GET.get('mode', 'driving').lower()
+    try:
+        ids = list(dict.fromkeys(int(pk) for pk in request.GET.get('ids', '').split(',') if pk.strip()))
+    except ValueError:
+        ids = None
+    if origin is None or mode not in MODES or not ids or len(ids) > MAX_COMMUTE_JOBS:
+        return JsonResponse({
+            'error': f'origin=lat,lng, mode and up to {MAX_COMMUTE_JOBS} comma-separated ids are required'
+        }, status=400)
+
+    times, pending = get_commute_times(
+        *origin, JobPosting.objects.filter(is_active=True, pk__in=ids), mode, max_misses=MAX_COMMUTE_MISSES
+    )
+    known = [pk for pk in ids if pk in times]
+    return JsonResponse({
+        'mode': mode,
+        'id': known,
+        'minutes': [times[pk][0] for pk in known],
+        'miles': [times[pk][1] for pk in known],
+        'pending': pending,
+    })
@@ -89,6 +89,26 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The job board page cache is invalidated by a generation counter, so every
+# worker must share one backend in production. Set REDIS_URL to enable it;
+# local memory is only suitable for a single development process.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -151,3 +171,25 @@ EMAIL_SUBJECT_PREFIX = '[DevJobs] '
 
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 
+# Geocoding results are cached per normalized address (account.GeocodeCache);
+# failed lookups expire sooner so corrected addresses are retried.
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", str(90 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600)))
+
+# Geocoding backend (see account/geocoding.py). Use
+# "account.geocoding.StubGeocodingProvider" to work offline.
+GEOCODING_PROVIDER = os.getenv("GEOCODING_PROVIDER", "account.geocoding.GoogleGeocodingProvider")
+GEOCODING_PROVIDER_OPTIONS = {}
+
+# Gazetteer files for offline approximate geocoding (see account/gazetteer.py),
+# separated by os.pathsep, e.g. the Census 2020_Gaz_zcta_national.txt and
+# 2020_Gaz_place_national.txt. Empty uses the small bundled sample.
+GAZETTEER_FILES = [path for path in os.getenv("GAZETTEER_FILES", "").split(os.pathsep) if path]
+
+# Commute times from a map grid cell to a job are cached in job.CommuteTime
+# (see job/commute.py). Use "job.commute.StubCommuteProvider" to work offline.
+COMMUTE_PROVIDER = os.getenv("COMMUTE_PROVIDER", "job.commute.GoogleCommuteProvider")
+COMMUTE_PROVIDER_OPTIONS = {}
+COMMUTE_CACHE_TTL = int(os.getenv("COMMUTE_CACHE_TTL", str(30 * 24 * 3600)))
+
+
@@ -0,0 +1,72 @@
+"""
+Search-as-you-type narrowing cache for the candidate search keyword.
+
+Typing q=pyt -> pyth -> python produces queries whose matches are subsets of
+the previous ones. The matching candidate IDs are kept briefly per session,
+so a keyword that extends the previous one runs the same database predicate
+over those IDs only, instead of over every candidate. Entries are keyed by
+the candidate generation (see applicant.cache), so profile edits are seen
+at once. Misses, expired entries and non-extending edits run the full query.
+"""
+import string
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from applicant.cache import get_generation
+
+NARROWING_CACHE_TIMEOUT = 120
+MAX_NARROWING_CANDIDATES = 1000
+
+KEYWORD_FIELDS = (
+    'account__first_name',
+    'account__last_name',
+    'account__username',
+    'headline',
+)
+
+# SQLite's LIKE only ignores case for ASCII letters, so only those are folded
+# when deciding whether a keyword extends the previous one
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def keyword_q(q) -> Q:
+    """Q matching candidates whose name, username or headline contains q."""
+    query = Q()
+    for field in KEYWORD_FIELDS:
+        query |= Q(**{f'{field}__icontains': q})
+    return query
+
+
+def narrowing_cache_key(request):
+    """Per-session cache key, or None when the request has no session yet."""
+    session_key = request.session.session_key
+    return f'candidate_search:narrow:{get_generation()}:{session_key}' if session_key else None
+
+
+def filter_by_keyword(request, candidates, q):
+    """
+    Filter candidates by keyword, narrowing the previous result set if possible.
+
+    candidates must only carry filters that do not depend on request
+    parameters (e.g. visibility), since the cached IDs are reused as other
+    filters change.
+    """
+    folded = q.translate(ASCII_LOWER)
+    key = narrowing_cache_key(request)
+    entry = cache.get(key) if key else None
+
+    matches = candidates.filter(keyword_q(q))
+    if entry and folded.startswith(entry['q']):
+        # Anything matching q also matched the previous keyword
+        matches = matches.filter(pk__in=entry['ids'])
+    ids = list(matches.values_list('pk', flat=True)[:MAX_NARROWING_CANDIDATES + 1])
+    if len(ids) > MAX_NARROWING_CANDIDATES:
+        # Too broad to be worth caching; let the database do the filtering
+        if key:
+            cache.delete(key)
+        return candidates.filter(keyword_q(q))
+
+    if key:
+        cache.set(key, {'q': folded, 'ids': ids}, NARROWING_CACHE_TIMEOUT)
+    return candidates.filter(pk__in=ids)
@@ -0,0 +1,352 @@
+"""
+Server-side marker clustering for the candidate map.
+
+The map page no longer embeds every candidate. The browser requests the
+visible bounding box and zoom level; the viewport is split into standard
+256px Web Mercator tiles and each tile is answered with up to
+CLUSTER_CELLS x CLUSTER_CELLS clusters (count, centroid, top skills), or
+with individual candidate markers from POINTS_ZOOM on. Tiles are cached
+per filter set for TILE_CACHE_TIMEOUT seconds, so the response size and
+the work per request are bounded by the viewport, not the candidate pool.
+
+Markers are binned by the position actually shown on the map, so a
+candidate with an approximate location is only ever counted at their
+place's centroid (see Location.refresh_centroids), and is not drawn while
+the place has none. Tiles are also read by that position: candidates whose
+real coordinates fall in the tile, plus those whose Location centroid is
+inside it, both selected by bounding box in SQL. Cached tiles are keyed by the candidate generation
+(see applicant.cache), so profile, skill and privacy edits show up at once.
+"""
+import hashlib
+import math
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from account.models import Location
+from applicant.filters import filter_all_skills, parse_skill_list
+from applicant.cache import get_generation
+from applicant.models import Applicant, Skill
+from utils.geo import filter_bbox, filter_near, parse_near, parse_radius
+
+TILE_SIZE = 256
+CLUSTER_CELLS = 4
+POINTS_ZOOM = 13
+MAX_ZOOM = 21
+MAX_TILES = 64
+TILE_CACHE_TIMEOUT = 300
+TOP_SKILLS = 3
+# Skills listed on an individual candidate marker
+MARKER_SKILLS = 5
+# Skills are counted over at most this many members of each cluster
+SKILL_SAMPLE = 100
+# Degrees of padding around the candidates' extent, so it does not pinpoint anyone
+POSITION_MARGIN = 0.5
+MAX_LATITUDE = 85.0511
+
+FILTER_PARAMS = ('skills', 'city', 'state', 'country', 'near', 'radius')
+
+
+def map_applicants(request):
+    """
+    Visible, geocoded applicants matching the candidate map filters.
+
+    Returns:
+        Tuple of (applicants queryset, filters dict for the template)
+    """
+    applicants = (
+        Applicant.objects
+        .filter(
+            Q(privacy_settings__visible_to_recruiters=True) |
+            Q(privacy_settings__isnull=True)  # Include profiles without privacy settings
+        )
+        .filter(
+            Q(privacy_settings__isnull=True) |
+            Q(privacy_settings__show_exact_location=True) |
+            Q(privacy_settings__show_approximate_location=True)
+        )
+        .filter(
+            account__latitude__isnull=False,
+            account__longitude__isnull=False
+        )
+    )
+
+    # Apply search filters from query parameters
+    skills = request.GET.get('skills')
+    city = request.GET.get('city')
+    state = request.GET.get('state')
+    country = request.GET.get('country')
+
+    if skills:
+        applicants = filter_all_skills(applicants, parse_skill_list(skills))
+    if city or state or country:
+        applicants = applicants.filter(
+            account__place__in=Location.matching(city=city, state=state, country=country)
+        )
+
+    # Candidates near a point (near=lat,lng&radius=miles), via the grid cell index
+    near = parse_near(request.GET.get('near'))
+    radius = parse_radius(request.GET.get('radius'))
+    if near:
+        applicants = filter_near(
+            applicants, *near, radius,
+            lat_field='account__latitude', lng_field='account__longitude', cell_field='account__geo_cell',
+        )
+
+    filters = {
+        'skills': skills or '',
+        'city': city or '',
+        'state': state or '',
+        'country': country or '',
+        'near': request.GET.get('near', '') if near else '',
+        'radius': radius,
+    }
+    return applicants, filters
+
+
+def _flag(value):
+    """Privacy flags default to True when the settings row does not exist."""
+    return value is None or bool(value)
+
+
+def display_position(latitude, longitude, show_exact, show_approximate, place=None):
+    """
+    Where a candidate is drawn on the map, honouring their privacy settings.
+
+    Approximate locations are drawn at the centroid of the candidate's
+    Location, never at their own coordinates.
+
+    Returns:
+        Tuple of (latitude, longitude, location_type), or None when the
+        candidate hides both their exact and approximate location, or their
+        place has no centroid
+    """
+    if _flag(show_exact):
+        return latitude, longitude, 'exact'
+    if not _flag(show_approximate):
+        return None
+    if place and place[0] is not None and place[1] is not None:
+        return place[0], place[1], 'approximate'
+    return None
+
+
+def candidate_markers(applicants):
+    """
+    Build the map marker payload (profile summary and position) for applicants.
+
+    One joined query reads the accounts and privacy settings and one more
+    reads the skills, keeping the first MARKER_SKILLS per applicant, so the
+    cost does not grow with the number of candidates. Applicants without
+    privacy settings get the defaults (everything shown).
+    """
+    rows = applicants.values(
+        'pk',
+        'headline',
+        'account__username',
+        'account__first_name',
+        'account__last_name',
+        'account__email',
+        'account__street_address',
+        'account__city',
+        'account__state',
+        'account__country',
+        'account__latitude',
+        'account__longitude',
+        'account__place__latitude',
+        'account__place__longitude',
+        'privacy_settings__show_exact_location',
+        'privacy_settings__show_approximate_location',
+        'privacy_settings__show_headline',
+        'privacy_settings__show_skills',
+        'privacy_settings__show_email',
+    )
+    # Skill filters join applicant_skill, which can repeat an applicant
+    rows = list({row['pk']: row for row in rows}.values())
+
+    top_skills = {}
+    skills = Skill.objects.filter(
+        applicant__in=applicants.filter(
+            Q(privacy_settings__isnull=True) | Q(privacy_settings__show_skills=True)
+        ).values('pk')
+    ).order_by('applicant_id', 'pk')
+    for applicant_id, name in skills.values_list('applicant_id', 'skill_name'):
+        names = top_skills.setdefault(applicant_id, [])
+        if len(names) < MARKER_SKILLS:
+            names.append(name)
+
+    markers = []
+    for row in rows:
+        position = display_position(
+            row['account__latitude'],
+            row['account__longitude'],
+            row['privacy_settings__show_exact_location'],
+            row['privacy_settings__show_approximate_location'],
+            (row['account__place__latitude'], row['account__place__longitude']),
+        )
+        if position is None:
+            continue  # Skip if no location to show
+        latitude, longitude, location_type = position
+
+        city_state = f"{row['account__city']}, {row['account__state']}"
+        if location_type == 'exact' and row['account__street_address']:
+            location_display = f"{row['account__street_address']}, {city_state}"
+        else:
+            location_display = city_state
+
+        full_name = f"{row['account__first_name']} {row['account__last_name']}".strip()
+        markers.append({
+            'id': str(row['pk']),
+            'name': full_name or row['account__username'],
+            'username': row['account__username'],
+            'headline': row['headline'] if _flag(row['privacy_settings__show_headline']) else '',
+            'location': location_display,
+            'location_type': location_type,  # 'exact' or 'approximate'
+            'latitude': latitude,
+            'longitude': longitude,
+            'skills': top_skills.get(row['pk'], []) if _flag(row['privacy_settings__show_skills']) else [],
+            'email': row['account__email'] if _flag(row['privacy_settings__show_email']) else None,
+        })
+    return markers
+
+
+def parse_zoom(value):
+    """Parse a map zoom level, clamped to [0, MAX_ZOOM]; None if invalid."""
+    try:
+        return min(max(int(value), 0), MAX_ZOOM)
+    except (TypeError, ValueError):
+        return None
+
+
+def tile_x(lng, zoom):
+    return (lng + 180) / 360 * 2 ** zoom
+
+
+def tile_y(lat, zoom):
+    lat = math.radians(min(max(lat, -MAX_LATITUDE), MAX_LATITUDE))
+    return (1 - math.asinh(math.tan(lat)) / math.pi) / 2 * 2 ** zoom
+
+
+def tile_bounds(zoom, x, y):
+    """(west, south, east, north) of a Web Mercator tile."""
+    n = 2 ** zoom
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)
+
+
+def tiles_for_bbox(bbox, zoom):
+    """Tiles (x, y) covering a bounding box; boxes crossing the antimeridian wrap."""
+    west, south, east, north = bbox
+    n = 2 ** zoom
+    rows = range(int(tile_y(north, zoom)), min(int(tile_y(south, zoom)), n - 1) + 1)
+    first, last = int(tile_x(west, zoom)), min(int(tile_x(east, zoom)), n - 1)
+    columns = list(range(first, last + 1)) if west <= east else [*range(first, n), *range(0, last + 1)]
+    return [(x, y) for y in rows for x in columns]
+
+
+def filters_key(request):
+    """Digest of the filter parameters, shared by every recruiter using the same filters."""
+    params = '&'.join(f'{name}={request.GET.get(name, "")}' for name in FILTER_PARAMS)
+    return hashlib.md5(params.encode()).hexdigest()
+
+
+def build_tile(applicants, zoom, x, y):
+    """Clusters, or individual markers from POINTS_ZOOM on, for one tile."""
+    west, south, east, north = tile_bounds(zoom, x, y)
+    # Real coordinates in the tile, or an approximate marker at a centroid in it
+    places_in_tile = Location.objects.filter(
+        latitude__gte=south, latitude__lt=north, longitude__gte=west, longitude__lt=east
+    ).values('pk')
+    rows = (
+        filter_bbox(
+            applicants, south, north, west, east,
+            lat_field='account__latitude', lng_field='account__longitude', cell_field='account__geo_cell',
+        )
+        | applicants.filter(account__place__in=places_in_tile)
+    ).values_list(
+        'pk',
+        'account__latitude',
+        'account__longitude',
+        'account__place__latitude',
+        'account__place__longitude',
+        'privacy_settings__show_exact_location',
+        'privacy_settings__show_approximate_location',
+        'privacy_settings__show_skills',
+    )
+
+    cells = {}
+    for pk, lat, lng, place_lat, place_lng, exact, approximate, show_skills in rows:
+        position = display_position(lat, lng, exact, approximate, (place_lat, place_lng))
+        if position is None:
+            continue
+        lat, lng = position[0], position[1]
+        if not (south <= lat < north and west <= lng < east):
+            continue  # Shown in a neighbouring tile
+        column = min(int((tile_x(lng, zoom) - x) * CLUSTER_CELLS), CLUSTER_CELLS - 1)
+        row = min(int((tile_y(lat, zoom) - y) * CLUSTER_CELLS), CLUSTER_CELLS - 1)
+        cell = cells.setdefault((column, row), {'count': 0, 'lat': 0.0, 'lng': 0.0, 'pks': [], 'sample': []})
+        cell['count'] += 1
+        cell['lat'] += lat
+        cell['lng'] += lng
+        cell['pks'].append(pk)
+        if _flag(show_skills) and len(cell['sample']) < SKILL_SAMPLE:
+            cell['sample'].append(pk)
+
+    if zoom >= POINTS_ZOOM:
+        pks = [pk for cell in cells.values() for pk in cell['pks']]
+        return {'clusters': [], 'points': candidate_markers(Applicant.objects.filter(pk__in=pks))}
+
+    sampled = {pk: key for key, cell in cells.items() for pk in cell['sample']}
+    skill_counts = {key: Counter() for key in cells}
+    spellings = {}
+    for applicant_id, name in Skill.objects.filter(applicant_id__in=list(sampled)).values_list('applicant_id', 'skill_name'):
+        key = name.strip().lower()
+        spellings.setdefault(key, name.strip())
+        skill_counts[sampled[applicant_id]][key] += 1
+
+    clusters = [
+        {
+            'count': cell['count'],
+            'latitude': cell['lat'] / cell['count'],
+            'longitude': cell['lng'] / cell['count'],
+            'top_skills': [spellings[name] for name, _ in skill_counts[key].most_common(TOP_SKILLS)],
+        }
+        for key, cell in sorted(cells.items())
+    ]
+    return {'clusters': clusters, 'points': []}
+
+
+def get_clusters(request, applicants, bbox, zoom):
+    """
+    Clusters and markers for every tile in the viewport, using cached tiles.
+
+    Returns:
+        Dict with clusters, points and the total candidate count
+    """
+    tiles = tiles_for_bbox(bbox, zoom)
+    if len(tiles) > MAX_TILES:
+        raise ValueError('Viewport covers too many tiles for this zoom level')
+
+    prefix = f'candidate_map:tile:{get_generation()}:{filters_key(request)}:{zoom}'
+    keys = {f'{prefix}:{x}:{y}': (x, y) for x, y in tiles}
+    cached = cache.get_many(list(keys))
+    missing = {
+        key: build_tile(applicants, zoom, x, y)
+        for key, (x, y) in keys.items()
+        if key not in cached
+    }
+    if missing:
+        cache.set_many(missing, TILE_CACHE_TIMEOUT)
+    cached.update(missing)
+
+    clusters = [cluster for key in keys for cluster in cached[key]['clusters']]
+    points = [point for key in keys for point in cached[key]['points']]
+    return {
+        'zoom': zoom,
+        'clusters': clusters,
+        'points': points,
+        'count': sum(cluster['count'] for cluster in clusters) + len(points),
+    }
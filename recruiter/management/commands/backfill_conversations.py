@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recruiter.models import Conversation, Message
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the inbox conversation summaries from all messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Messages read and conversations written per batch',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # One pass over the messages in time order; the last one seen per pair is the latest
+        summaries = {}
+        messages = Message.objects.order_by('created_at', 'pk').values_list(
+            'pk', 'sender_id', 'recipient_id', 'created_at', 'is_read'
+        )
+        count = 0
+        for pk, sender_id, recipient_id, created_at, is_read in messages.iterator(chunk_size=batch_size):
+            user_a, user_b = Conversation.pair(sender_id, recipient_id)
+            summary = summaries.setdefault((user_a, user_b), {'unread_a': 0, 'unread_b': 0})
+            summary['last_message_id'] = pk
+            summary['last_activity_at'] = created_at
+            if not is_read:
+                summary['unread_a' if recipient_id == user_a else 'unread_b'] += 1
+            count += 1
+
+        with transaction.atomic():
+            Conversation.objects.all().delete()
+            Conversation.objects.bulk_create(
+                [
+                    Conversation(user_a_id=user_a, user_b_id=user_b, **summary)
+                    for (user_a, user_b), summary in summaries.items()
+                ],
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(summaries)} conversations from {count} messages'
+        ))
@@ -1,9 +1,11 @@
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Greatest
 
-from account.models import Account
+from account.models import Account, Location, assign_place
 
 
 class Recruiter(models.Model):
@@ -73,6 +75,9 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recipient_read_idx'),
+        ]
     
     def __str__(self):
         return f"{self.recipient.username}: {self.title}"
@@ -105,11 +110,113 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Unread counts per conversation partner
+            models.Index(fields=['recipient', 'sender', 'is_read'], name='message_unread_idx'),
+            # Conversation history between two users
+            models.Index(fields=['sender', 'recipient', 'created_at'], name='message_thread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.username} → {self.recipient.username}: {self.subject[:50]}"
 
 
+class Conversation(models.Model):
+    """
+    Denormalized summary of the messages between two users, for the inbox.
+
+    user_a is the participant with the smaller ID. The row is kept current
+    as messages are sent, read and deleted (see recruiter.signals and
+    mark_read), so the inbox loads in one indexed query. The
+    backfill_conversations command rebuilds every row from Message.
+    """
+    # Indexed below together with last_activity_at
+    user_a = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+', db_index=False)
+    user_b = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='+', db_index=False)
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_activity_at = models.DateTimeField()
+    unread_a = models.PositiveIntegerField(default=0, help_text="Messages to user_a not yet read")
+    unread_b = models.PositiveIntegerField(default=0, help_text="Messages to user_b not yet read")
+
+    class Meta:
+        unique_together = ['user_a', 'user_b']
+        indexes = [
+            # Each participant's inbox, most recent first
+            models.Index(fields=['user_a', '-last_activity_at'], name='conversation_a_activity_idx'),
+            models.Index(fields=['user_b', '-last_activity_at'], name='conversation_b_activity_idx'),
+        ]
+
+    @staticmethod
+    def pair(user_id, other_id):
+        """Participant IDs in (user_a, user_b) order."""
+        return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+
+    @classmethod
+    def for_user(cls, user):
+        """Conversations the user takes part in, most recent first."""
+        return cls.objects.filter(Q(user_a=user) | Q(user_b=user)).order_by('-last_activity_at')
+
+    @classmethod
+    def record_message(cls, message):
+        """Make message the latest in its conversation and count it as unread for the recipient."""
+        user_a, user_b = cls.pair(message.sender_id, message.recipient_id)
+        conversation, created = cls.objects.get_or_create(
+            user_a_id=user_a, user_b_id=user_b, defaults={'last_activity_at': message.created_at}
+        )
+        unread_field = 'unread_a' if message.recipient_id == user_a else 'unread_b'
+        updates = {unread_field: models.F(unread_field) + (0 if message.is_read else 1)}
+        if created or message.created_at >= conversation.last_activity_at:
+            updates.update(last_message=message, last_activity_at=message.created_at)
+        cls.objects.filter(pk=conversation.pk).update(**updates)
+
+    @classmethod
+    def rebuild(cls, user_id, other_id):
+        """Recompute one conversation from its messages, deleting it if none are left."""
+        user_a, user_b = cls.pair(user_id, other_id)
+        messages = Message.objects.filter(
+            Q(sender_id=user_a, recipient_id=user_b) | Q(sender_id=user_b, recipient_id=user_a)
+        )
+        last_message = messages.order_by('-created_at', '-pk').first()
+        if last_message is None:
+            cls.objects.filter(user_a_id=user_a, user_b_id=user_b).delete()
+            return
+        unread = messages.filter(is_read=False)
+        cls.objects.update_or_create(user_a_id=user_a, user_b_id=user_b, defaults={
+            'last_message': last_message,
+            'last_activity_at': last_message.created_at,
+            'unread_a': unread.filter(recipient_id=user_a).count(),
+            'unread_b': unread.filter(recipient_id=user_b).count(),
+        })
+
+    def partner_of(self, user):
+        """The other participant."""
+        return self.user_b if self.user_a_id == user.pk else self.user_a
+
+    def unread_for(self, user):
+        """Number of messages in this conversation the user has not read."""
+        return self.unread_a if self.user_a_id == user.pk else self.unread_b
+
+    def mark_read(self, user):
+        """
+        Mark every message to user in this conversation as read.
+
+        The counter is decremented by the number of messages actually marked
+        rather than reset, so a message arriving in between stays counted.
+        """
+        partner_id = self.user_b_id if self.user_a_id == user.pk else self.user_a_id
+        unread_field = 'unread_a' if self.user_a_id == user.pk else 'unread_b'
+        with transaction.atomic():
+            updated = Message.objects.filter(sender_id=partner_id, recipient=user, is_read=False).update(is_read=True)
+            if updated:
+                Conversation.objects.filter(pk=self.pk).update(
+                    **{unread_field: Greatest(models.F(unread_field) - updated, 0)}
+                )
+        setattr(self, unread_field, max(getattr(self, unread_field) - updated, 0))
+
+    def __str__(self):
+        return f"{self.user_a_id} ↔ {self.user_b_id}"
+
+
 class CandidateEmail(models.Model):
     """Model to track emails sent from recruiters to candidates"""
     sender = models.ForeignKey(
@@ -162,15 +269,96 @@ class SavedSearch(models.Model):
     city = models.CharField(max_length=100, blank=True, help_text="City to search for candidates")
     state = models.CharField(max_length=100, blank=True, help_text="State to search for candidates")
     country = models.CharField(max_length=100, blank=True, help_text="Country to search for candidates")
+    place = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='saved_searches',
+    )
 
     # Metadata
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_notification_sent = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True, help_text="When results were last fetched")
+
+    # Normalized criteria, rebuilt from the fields above on every save
+    compiled_criteria = models.JSONField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):
+        assign_place(self, kwargs)
+        self.compiled_criteria = self.compile_criteria()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'compiled_criteria' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['compiled_criteria']
+        super().save(*args, **kwargs)
+
+    def compile_criteria(self):
+        """
+        Normalize the search criteria into the form used to build queries.
+
+        Skills are lowercased and deduplicated. Because skills match by
+        substring, a skill contained in another required skill (e.g. "java"
+        in "javascript") is implied by it and dropped from the plan.
+        """
+        skills = sorted({s.strip().lower() for s in (self.skills or []) if s and s.strip()})
+        skills = [
+            skill for skill in skills
+            if not any(skill != other and skill in other for other in skills)
+        ]
+        return {
+            'skills': skills,
+            'city': (self.city or '').strip(),
+            'state': (self.state or '').strip(),
+            'country': (self.country or '').strip(),
+        }
+
+    def get_compiled_criteria(self):
+        """Return the cached compiled criteria, compiling rows saved before it existed."""
+        if self.compiled_criteria is None:
+            self.save(update_fields=['compiled_criteria'])
+        return self.compiled_criteria
+
+    def get_matching_candidates(self, since=None):
+        """
+        Get candidates matching this saved search.
+
+        Args:
+            since (datetime): Only include candidates who joined after this time
+
+        Returns:
+            QuerySet: Applicant objects visible to recruiters, newest first
+        """
+        from applicant.filters import filter_all_skills
+        from applicant.models import Applicant
+
+        criteria = self.get_compiled_criteria()
+
+        candidates = Applicant.objects.filter(
+            Q(privacy_settings__visible_to_recruiters=True) | Q(privacy_settings__isnull=True)
+        )
+        candidates = filter_all_skills(candidates, criteria['skills'])
+
+        if criteria['city'] or criteria['state'] or criteria['country']:
+            candidates = candidates.filter(account__place__in=Location.matching(
+                city=criteria['city'], state=criteria['state'], country=criteria['country']
+            ))
+
+        if since:
+            candidates = candidates.filter(account__date_joined__gt=since)
+
+        return (
+            candidates
+            .select_related('account', 'privacy_settings')
+            .prefetch_related('skills')
+            .order_by('-account__date_joined')
+        )
+
     def __str__(self):
-        return f"{self.recruiter.username}: {self.name}"
\ No newline at end of file
+        return f"{self.recruiter.username}: {self.name}"
@@ -3,7 +3,7 @@ from django.dispatch import receiver
 from django.db.models import Q
 from django.utils import timezone
 
-from .models import Notification, SavedSearch
+from .models import Conversation, Message, Notification, SavedSearch
 from applicant.models import Applicant, Skill
 
 
@@ -103,3 +103,16 @@ def matches_saved_search(candidate, search):
     
     # If we get here, the candidate matches ALL the search criteria
     return True
+
+
+@receiver(post_save, sender=Message)
+def update_conversation_on_message(sender, instance, created, **kwargs):
+    """Keep the inbox summary current when a message is sent."""
+    if created:
+        Conversation.record_message(instance)
+
+
+@receiver(post_delete, sender=Message)
+def rebuild_conversation_on_delete(sender, instance, **kwargs):
+    """Recompute the latest message and unread counts after a message is deleted."""
+    Conversation.rebuild(instance.sender_id, instance.recipient_id)
@@ -1,3 +1,484 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import json
+
+from account.models import Account
+from applicant.models import Applicant, ProfilePrivacySettings, Skill
+from recruiter.clusters import candidate_markers
+from recruiter.models import Conversation, Message, Recruiter, SavedSearch
+from utils.messaging import MESSAGE_PAGE_SIZE
+
+
+class RunSavedSearchTestCase(TestCase):
+    """Test cases for running saved searches on demand"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=self.recruiter_user, company='Test Company')
+
+        self.search = SavedSearch.objects.create(
+            recruiter=self.recruiter_user,
+            name='Atlanta JS',
+            skills=['Java', 'JavaScript', ' javascript '],
+            city='atlanta',
+        )
+
+        self.matching = self.create_applicant('matching', 'Atlanta', ['JavaScript', 'Django'])
+        self.create_applicant('elsewhere', 'Boston', ['JavaScript'])
+        self.create_applicant('noskill', 'Atlanta', ['Python'])
+
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+    def create_applicant(self, username, city, skills):
+        account = Account.objects.create_user(
+            username=username,
+            password='testpass123',
+            city=city,
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        applicant = Applicant.objects.create(account=account)
+        for skill_name in skills:
+            Skill.objects.create(applicant=applicant, skill_name=skill_name)
+        return applicant
+
+    def test_compiled_criteria_drops_implied_skills(self):
+        """Test that compilation dedupes skills and drops substrings of other skills"""
+        self.assertEqual(self.search.compiled_criteria['skills'], ['javascript'])
+        self.assertEqual(self.search.compiled_criteria['city'], 'atlanta')
+
+    def test_run_returns_matching_candidates(self):
+        """Test that running a saved search returns only matching candidates"""
+        response = self.client.get(reverse('recruiter:run_saved_search', args=[self.search.id]))
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual([c['username'] for c in data['data']], ['matching'])
+        self.assertEqual(data['pagination']['total_count'], 1)
+
+        self.search.refresh_from_db()
+        self.assertIsNotNone(self.search.last_run_at)
+
+    def test_since_last_run_only_returns_newcomers(self):
+        """Test that since=last_run only returns candidates who joined after the last run"""
+        self.search.last_run_at = timezone.now()
+        self.search.save(update_fields=['last_run_at'])
+
+        newcomer = self.create_applicant('newcomer', 'Atlanta', ['JavaScript'])
+        newcomer.account.date_joined = timezone.now() + timedelta(seconds=1)
+        newcomer.account.save(update_fields=['date_joined'])
+
+        response = self.client.get(
+            reverse('recruiter:run_saved_search', args=[self.search.id]),
+            {'since': 'last_run'}
+        )
+
+        data = json.loads(response.content)
+        self.assertEqual([c['username'] for c in data['data']], ['newcomer'])
+
+    def test_other_recruiters_cannot_run_search(self):
+        """Test that a saved search is only runnable by its owner"""
+        other = Account.objects.create_user(
+            username='otherrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=other)
+        self.client.login(username='otherrecruiter', password='testpass123')
+
+        response = self.client.get(reverse('recruiter:run_saved_search', args=[self.search.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CandidateSearchNarrowingTestCase(TestCase):
+    """Test cases for the search-as-you-type narrowing cache"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=self.recruiter_user)
+
+        self.python = self.create_applicant('alice', 'Python developer')
+        self.pytorch = self.create_applicant('bob', 'PyTorch researcher')
+        self.create_applicant('carol', 'Java engineer')
+
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+    def create_applicant(self, username, headline):
+        account = Account.objects.create_user(
+            username=username,
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        return Applicant.objects.create(account=account, headline=headline)
+
+    def search(self, q):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('recruiter:candidate_search'), {'q': q})
+        keyword_queries = [query['sql'] for query in captured.captured_queries if '"headline" LIKE' in query['sql']]
+        return list(response.context['candidates']), keyword_queries
+
+    def test_extending_keyword_narrows_cached_ids(self):
+        """Test that q=py then q=pyth re-runs the match over the cached IDs only"""
+        candidates, keyword_queries = self.search('py')
+        self.assertEqual(set(candidates), {self.python, self.pytorch})
+        self.assertNotIn('"account_id" IN', keyword_queries[0])
+
+        candidates, keyword_queries = self.search('Pyth')
+        self.assertEqual(candidates, [self.python])
+        self.assertEqual(len(keyword_queries), 1)
+        self.assertIn('"account_id" IN', keyword_queries[0])
+
+    def test_narrowing_matches_like_the_database(self):
+        """Test that narrowing agrees with the database on non-ASCII case"""
+        zoe = self.create_applicant('zoe', 'Élan engineer')
+        self.assertEqual(self.search('él')[0], [])
+
+        candidates, keyword_queries = self.search('Él')
+        self.assertEqual(candidates, [zoe])
+        self.assertNotIn('"account_id" IN', keyword_queries[0])
+        self.assertEqual(self.search('élan')[0], [])
+
+    def test_profile_edits_are_seen(self):
+        """Test that a candidate whose headline changes is found by the next keystroke"""
+        self.search('py')
+        Applicant.objects.filter(pk=self.python.pk).update(headline='Rust developer')
+        carol = Applicant.objects.get(account__username='carol')
+        carol.headline = 'Python engineer'
+        carol.save()
+
+        self.assertEqual(self.search('pyth')[0], [carol])
+
+    def test_non_extending_keyword_hits_database(self):
+        """Test that an edit that is not an extension falls back to the database"""
+        self.search('python')
+
+        candidates, keyword_queries = self.search('java')
+        self.assertEqual(candidates, [Applicant.objects.get(account__username='carol')])
+        self.assertTrue(keyword_queries)
+
+    def test_expired_entry_hits_database(self):
+        """Test that a missing cache entry falls back to the database"""
+        self.search('py')
+        cache.clear()
+
+        candidates, keyword_queries = self.search('pyt')
+        self.assertEqual(set(candidates), {self.python, self.pytorch})
+        self.assertTrue(keyword_queries)
+
+
+class CandidateMapClustersTestCase(TestCase):
+    """Test cases for server-side candidate map clustering"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=self.recruiter_user)
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+        for i in range(3):
+            self.create_applicant(f'atl{i}', 'Atlanta', 33.70 + i * 0.01, -84.40, ['Python'])
+        self.create_applicant('savannah', 'Savannah', 32.08, -81.09, ['Java'])
+        private = self.create_applicant('private', 'Atlanta', 33.90, -84.10, ['Go'])
+        ProfilePrivacySettings.objects.create(applicant=private, show_exact_location=False)
+
+    def create_applicant(self, username, city, latitude, longitude, skills):
+        account = Account.objects.create_user(username=username, password='testpass123', city=city, state='GA')
+        Account.objects.filter(pk=account.pk).update(latitude=latitude, longitude=longitude)
+        applicant = Applicant.objects.create(account=account)
+        for skill_name in skills:
+            Skill.objects.create(applicant=applicant, skill_name=skill_name)
+        return applicant
+
+    def get_clusters(self, bbox, zoom, **filters):
+        response = self.client.get(reverse('recruiter:candidate_map_clusters'), {'bbox': bbox, 'zoom': zoom, **filters})
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_page_does_not_embed_candidates(self):
+        """Test that the map page only carries the count and a padded extent"""
+        response = self.client.get(reverse('recruiter:candidate_map'))
+
+        self.assertEqual(response.context['candidates_count'], 5)
+        self.assertNotIn('candidates_json', response.context)
+        self.assertEqual(response.context['bounds'], {'south': 31, 'north': 35, 'west': -85, 'east': -80})
+
+    def test_low_zoom_returns_clusters(self):
+        """Test that a zoomed-out viewport gets counts, centroids and top skills"""
+        data = self.get_clusters('-90,25,-75,40', 5)
+
+        self.assertEqual(data['points'], [])
+        self.assertEqual(data['count'], 5)
+        atlanta = max(data['clusters'], key=lambda cluster: cluster['count'])
+        self.assertEqual(atlanta['count'], 4)
+        self.assertEqual(atlanta['top_skills'][0], 'Python')
+
+        self.assertEqual(self.get_clusters('-90,25,-75,40', 5, skills='java')['count'], 1)
+
+    def test_high_zoom_returns_points_at_displayed_position(self):
+        """Test that approximate candidates are only found at their city centroid"""
+        around_real_location = self.get_clusters('-84.12,33.88,-84.08,33.92', 14)
+        self.assertEqual(around_real_location['points'], [])
+
+        around_centroid = self.get_clusters('-84.40,33.73,-84.37,33.76', 14)
+        self.assertEqual([point['username'] for point in around_centroid['points']], ['private'])
+        self.assertEqual(around_centroid['points'][0]['location_type'], 'approximate')
+
+    def test_approximate_candidates_far_from_centroid_are_shown(self):
+        """Test that a candidate is found at their city centroid however far away they really are"""
+        remote = self.create_applicant('remote', 'Atlanta', 36.50, -79.00, ['Rust'])
+        ProfilePrivacySettings.objects.create(applicant=remote, show_exact_location=False)
+
+        around_centroid = self.get_clusters('-84.40,33.73,-84.37,33.76', 14)
+        self.assertEqual(sorted(point['username'] for point in around_centroid['points']), ['private', 'remote'])
+        self.assertEqual(self.get_clusters('-79.02,36.48,-78.98,36.52', 14)['points'], [])
+
+    def test_approximate_candidates_without_centroid_are_hidden(self):
+        """Test that an approximate candidate is never drawn at their own coordinates"""
+        hidden = self.create_applicant('hidden', 'Smallville', 33.95, -84.20, ['Go'])
+        ProfilePrivacySettings.objects.create(applicant=hidden, show_exact_location=False)
+
+        self.assertEqual(self.get_clusters('-84.22,33.93,-84.18,33.97', 14)['points'], [])
+        self.assertEqual(self.get_clusters('-90,25,-75,40', 5)['count'], 5)
+        self.assertNotIn('hidden', [marker['username'] for marker in candidate_markers(Applicant.objects.all())])
+
+    def test_tiles_are_rebuilt_after_candidate_changes(self):
+        """Test that cached tiles are not served after skill, privacy or profile edits"""
+        bbox = '-90,25,-75,40'
+        self.assertEqual(self.get_clusters(bbox, 5, skills='rust')['count'], 0)
+
+        savannah = Applicant.objects.get(account__username='savannah')
+        Skill.objects.create(applicant=savannah, skill_name='Rust')
+        self.assertEqual(self.get_clusters(bbox, 5, skills='rust')['count'], 1)
+
+        ProfilePrivacySettings.objects.create(applicant=savannah, visible_to_recruiters=False)
+        self.assertEqual(self.get_clusters(bbox, 5, skills='rust')['count'], 0)
+
+    def test_invalid_viewport(self):
+        """Test that a missing bbox or an oversized viewport is rejected"""
+        url = reverse('recruiter:candidate_map_clusters')
+        self.assertEqual(self.client.get(url, {'zoom': 5}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'bbox': '-180,-85,180,85', 'zoom': 10}).status_code, 400)
+
+    def test_markers_use_constant_queries(self):
+        """Test that marker payloads cost the same queries for any number of candidates"""
+        for i in range(10):
+            self.create_applicant(f'extra{i}', 'Atlanta', 33.60, -84.30 - i * 0.01, ['Python', 'Django', 'SQL', 'Go', 'AWS', 'Rust'])
+        hidden = Applicant.objects.get(account__username='savannah')
+        ProfilePrivacySettings.objects.create(applicant=hidden, show_skills=False, show_email=False)
+
+        with self.assertNumQueries(2):  # candidates, skills
+            markers = {marker['username']: marker for marker in candidate_markers(Applicant.objects.all())}
+
+        self.assertEqual(len(markers), 15)
+        self.assertEqual(markers['extra0']['skills'], ['Python', 'Django', 'SQL', 'Go', 'AWS'])
+        self.assertEqual((markers['savannah']['skills'], markers['savannah']['email']), ([], None))
+        self.assertEqual(markers['private']['location_type'], 'approximate')
+        self.assertEqual(ProfilePrivacySettings.objects.count(), 2)
+
+
+class ConversationTestCase(TestCase):
+    """Test cases for the denormalized inbox conversations"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=self.recruiter_user)
+        self.candidates = [
+            Account.objects.create_user(username=f'candidate{i}', password='testpass123', city='Atlanta', state='GA')
+            for i in range(3)
+        ]
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+    def send(self, sender, recipient, body='Hello'):
+        return Message.objects.create(sender=sender, recipient=recipient, subject='Hi', body=body)
+
+    def conversation(self, user, other):
+        user_a, user_b = Conversation.pair(user.pk, other.pk)
+        return Conversation.objects.get(user_a=user_a, user_b=user_b)
+
+    def test_messages_update_conversation(self):
+        """Test that sending keeps the latest message and per-participant unread counts"""
+        candidate = self.candidates[0]
+        self.send(self.recruiter_user, candidate)
+        self.send(self.recruiter_user, candidate)
+        reply = self.send(candidate, self.recruiter_user, 'Thanks')
+
+        conversation = self.conversation(self.recruiter_user, candidate)
+        self.assertEqual(conversation.last_message, reply)
+        self.assertEqual(conversation.unread_for(candidate), 2)
+        self.assertEqual(conversation.unread_for(self.recruiter_user), 1)
+
+        reply.delete()
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_for(self.recruiter_user), 0)
+        self.assertNotEqual(conversation.last_message_id, reply.pk)
+
+    def test_inbox_queries_do_not_grow_with_conversations(self):
+        """Test that the inbox lists conversations by activity in a constant number of queries"""
+        for candidate in self.candidates:
+            self.send(candidate, self.recruiter_user)
+        self.send(self.candidates[0], self.recruiter_user, 'Latest')
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('recruiter:messages'))
+        conversations = response.context['conversations']
+        self.assertEqual([c['partner'] for c in conversations][0], self.candidates[0])
+        self.assertEqual(conversations[0]['latest_message'].body, 'Latest')
+        self.assertEqual(conversations[0]['unread_count'], 2)
+
+        self.send(Account.objects.create_user(username='late', password='testpass123'), self.recruiter_user)
+        with self.assertNumQueries(len(captured)):
+            self.client.get(reverse('recruiter:messages'))
+
+    def test_opening_conversation_marks_it_read(self):
+        """Test that viewing a conversation resets its unread count"""
+        candidate = self.candidates[0]
+        self.send(candidate, self.recruiter_user)
+
+        self.client.get(reverse('recruiter:messages'), {'partner_id': str(candidate.pk)})
+
+        self.assertEqual(self.conversation(self.recruiter_user, candidate).unread_for(self.recruiter_user), 0)
+        self.assertFalse(Message.objects.filter(recipient=self.recruiter_user, is_read=False).exists())
+
+    def test_mark_read_only_counts_messages_it_marked(self):
+        """Test that marking read subtracts the messages it marked instead of resetting the count"""
+        candidate = self.candidates[0]
+        self.send(candidate, self.recruiter_user)
+        self.send(candidate, self.recruiter_user)
+        conversation = self.conversation(self.recruiter_user, candidate)
+
+        # One more message counted by a concurrent sender, not yet visible to the UPDATE
+        Conversation.objects.filter(pk=conversation.pk).update(unread_a=3, unread_b=3)
+        conversation.mark_read(self.recruiter_user)
+        self.assertEqual(self.conversation(self.recruiter_user, candidate).unread_for(self.recruiter_user), 1)
+
+        # A stored count of zero does not stop the thread from being marked read
+        self.send(candidate, self.recruiter_user)
+        Conversation.objects.filter(pk=conversation.pk).update(unread_a=0, unread_b=0)
+        self.client.get(reverse('recruiter:messages'), {'partner_id': str(candidate.pk)})
+        self.assertFalse(Message.objects.filter(recipient=self.recruiter_user, is_read=False).exists())
+        self.assertEqual(self.conversation(self.recruiter_user, candidate).unread_for(self.recruiter_user), 0)
+
+    def test_backfill_matches_incremental_updates(self):
+        """Test that the backfill command rebuilds the same summaries from messages"""
+        for candidate in self.candidates:
+            self.send(self.recruiter_user, candidate)
+            self.send(candidate, self.recruiter_user)
+        fields = ('user_a', 'user_b', 'last_message', 'last_activity_at', 'unread_a', 'unread_b')
+        expected = sorted(Conversation.objects.values_list(*fields))
+
+        Conversation.objects.all().delete()
+        call_command('backfill_conversations', stdout=StringIO())
+
+        self.assertEqual(sorted(Conversation.objects.values_list(*fields)), expected)
+
+
+class ConversationHistoryTestCase(TestCase):
+    """Test cases for keyset-paginated conversation history"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.recruiter_user = Account.objects.create_user(
+            username='testrecruiter',
+            password='testpass123',
+            city='Atlanta',
+            state='GA',
+            country='USA',
+            zip_code='30332'
+        )
+        Recruiter.objects.create(account=self.recruiter_user)
+        self.candidate = Account.objects.create_user(username='candidate', password='testpass123', city='Atlanta', state='GA')
+        self.client = Client()
+        self.client.login(username='testrecruiter', password='testpass123')
+
+        # The first six messages share one timestamp, exercising the id tie-break
+        now = timezone.now()
+        for i in range(MESSAGE_PAGE_SIZE + 10):
+            sender, recipient = (self.recruiter_user, self.candidate) if i % 2 else (self.candidate, self.recruiter_user)
+            message = Message.objects.create(sender=sender, recipient=recipient, subject='Hi', body=f'Message {i}')
+            created_at = now - timedelta(minutes=MESSAGE_PAGE_SIZE + 10 - max(i, 5))
+            Message.objects.filter(pk=message.pk).update(created_at=created_at)
+        self.url = reverse('recruiter:conversation_history', args=[self.candidate.pk])
+
+    def test_page_shows_latest_messages_with_cursor(self):
+        """Test that the messages view renders only the newest page"""
+        response = self.client.get(reverse('recruiter:messages'), {'partner_id': str(self.candidate.pk)})
+        selected = response.context['selected_conversation']
+
+        bodies = [message.body for message in selected['messages']]
+        self.assertEqual(bodies, [f'Message {i}' for i in range(10, MESSAGE_PAGE_SIZE + 10)])
+        self.assertIsNotNone(selected['older_cursor'])
+        self.assertContains(response, 'Load older messages')
+
+        response = self.client.get(reverse('recruiter:messages'), {
+            'partner_id': str(self.candidate.pk), 'before': selected['older_cursor'],
+        })
+        older = response.context['selected_conversation']
+        self.assertEqual([message.body for message in older['messages']], [f'Message {i}' for i in range(10)])
+        self.assertIsNone(older['older_cursor'])
+
+    def test_history_endpoint_pages_back_to_the_start(self):
+        """Test that following cursors returns every message exactly once"""
+        bodies = []
+        cursor = None
+        while True:
+            data = self.client.get(self.url, {'before': cursor} if cursor else {}).json()
+            bodies = [message['body'] for message in data['messages']] + bodies
+            cursor = data['older_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(bodies, [f'Message {i}' for i in range(MESSAGE_PAGE_SIZE + 10)])
+        self.assertTrue(data['messages'][1]['from_me'])
+        self.assertEqual(self.client.get(self.url, {'before': 'yesterday'}).status_code, 400)
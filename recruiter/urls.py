@@ -7,6 +7,7 @@ urlpatterns = [
     path("search/", views.recruiter_search, name="recruiter_search"),
     path("candidates/", views.candidate_search, name="candidate_search"),
     path("candidates/map/", views.candidate_map, name="candidate_map"),
+    path("candidates/map/clusters/", views.candidate_map_clusters, name="candidate_map_clusters"),
     path("profile/", views.profile, name="profile"),
     path("jobs/", views.my_job_postings, name="jobs"),
     path("jobs/create/", views.job_create, name="job_create"),
@@ -17,6 +18,7 @@ urlpatterns = [
     path("applications/update-status/", views.update_application_status, name="update_application_status"),
     path("notifications/", views.notifications, name="notifications"),
     path("messages/", views.messages_list, name="messages"),
+    path("messages/<uuid:partner_id>/history/", views.conversation_history, name="conversation_history"),
     path("message/<uuid:recipient_id>/", views.send_message, name="send_message"),
     path("email/<uuid:candidate_id>/", views.compose_email, name="compose_email"),
     path("emails/", views.email_history, name="email_history"),
@@ -25,4 +27,5 @@ urlpatterns = [
     path("save-search/", views.save_search, name="save_search"),
     path("save-search/<int:search_id>/", views.save_search, name="edit_saved_search"),
     path("saved-search/<int:search_id>/delete/", views.delete_saved_search, name="delete_saved_search"),
+    path("api/saved-search/<int:search_id>/run/", views.run_saved_search, name="run_saved_search"),
 ]
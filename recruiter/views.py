@@ -3,24 +3,31 @@ from django.contrib.auth.decorators import login_required
 from django.core.mail import send_mail
 from django.core.paginator import Paginator
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Count, Max, Min, Q
 from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import json
+import math
 
+from .cache import filter_by_keyword
+from .clusters import POSITION_MARGIN, get_clusters, map_applicants, parse_zoom
 from .decorators import recruiter_required
 from .forms import MessageForm, SavedSearchForm, CandidateEmailForm
 from .models import Recruiter, Notification, Message, SavedSearch, CandidateEmail
 from job.forms import JobPostingForm
 from job.models import JobPosting
-from job.utils import geocode_address
-from applicant.models import Applicant, Application, ApplicationStatus
-from account.models import Account
-from utils.messaging import get_messages_context
+from job.utils import queue_job_geocode, skill_expansion_context
+from applicant.filters import filter_all_skills, filter_related, parse_skill_list
+from applicant.models import Applicant, Application, ApplicationStatus, ProfilePrivacySettings
+from applicant.query import QueryParseError, compile_query
+from account.models import Account, Location
+from utils.messaging import get_conversation_page, get_messages_context, parse_cursor
+from utils.geo import parse_bbox
 
 
 @require_http_methods(["GET"])
@@ -37,18 +44,14 @@ def recruiter_search(request):
     if position:
         recruiters = recruiters.filter(position__icontains=position)
 
-    # Account-level filters
+    # Account-level filters, matched against the normalized location table
     city = request.GET.get("city")
-    if city:
-        recruiters = recruiters.filter(account__city__icontains=city)
-
     state = request.GET.get("state")
-    if state:
-        recruiters = recruiters.filter(account__state__icontains=state)
-
     country = request.GET.get("country")
-    if country:
-        recruiters = recruiters.filter(account__country__icontains=country)
+    if city or state or country:
+        recruiters = recruiters.filter(
+            account__place__in=Location.matching(city=city, state=state, country=country)
+        )
 
     username = request.GET.get("username")
     if username:
@@ -154,17 +157,9 @@ def job_create(request):
         job = form.save(commit=False)
         job.owner = request.user
 
-        # Geocode the address to get latitude and longitude
-        latitude, longitude = geocode_address(
-            street_address=job.street_address,
-            city=job.city,
-            state=job.state,
-            zip_code=job.zip_code,
-            country=job.country
-        )
-        if latitude and longitude:
-            job.latitude = latitude
-            job.longitude = longitude
+        # Geocoded in the background by geocode_worker unless picked on the map;
+        # coordinates prefilled from the recruiter's account only count if unchanged
+        queue_job_geocode(job, changed_fields=form.changed_data)
 
         job.save()
         form.save_skills(job)
@@ -218,17 +213,8 @@ def job_update(request, pk: int):
     if form.is_valid():
         job = form.save(commit=False)
 
-        # Geocode the address to get latitude and longitude
-        latitude, longitude = geocode_address(
-            street_address=job.street_address,
-            city=job.city,
-            state=job.state,
-            zip_code=job.zip_code,
-            country=job.country
-        )
-        if latitude and longitude:
-            job.latitude = latitude
-            job.longitude = longitude
+        # Geocoded in the background by geocode_worker unless picked on the map
+        queue_job_geocode(job, changed_fields=form.changed_data)
 
         job.save()
         form.save_skills(job)
@@ -339,47 +325,48 @@ def candidate_search(request):
     city = request.GET.get('city', '').strip()
     state = request.GET.get('state', '').strip()
     country = request.GET.get('country', '').strip()
+    query = request.GET.get('query', '').strip()  # Boolean expression, see applicant.query
+    query_error = None
 
     # Apply filters
     if username:
         # Exact username match (takes priority over q)
         candidates = candidates.filter(account__username__iexact=username)
     elif q:
-        # Search in name (first_name, last_name, username) and headline
-        candidates = candidates.filter(
-            Q(account__first_name__icontains=q) |
-            Q(account__last_name__icontains=q) |
-            Q(account__username__icontains=q) |
-            Q(headline__icontains=q)
-        )
+        # Search in name (first_name, last_name, username) and headline.
+        # Applied first so search-as-you-type can narrow the cached ID set.
+        candidates = filter_by_keyword(request, candidates, q)
 
-    if skills:
-        # Search in skills (comma-separated)
-        for skill in [s.strip() for s in skills.split(',') if s.strip()]:
-            candidates = candidates.filter(skills__skill_name__icontains=skill)
+    if query:
+        try:
+            candidates = candidates.filter(compile_query(query))
+        except QueryParseError as e:
+            query_error = str(e)
+            candidates = candidates.none()
+
+    skill_names = parse_skill_list(skills)
+    expansion = skill_expansion_context(request, skill_names)
+    if skill_names:
+        # Search in skills (comma-separated); one EXISTS per skill
+        candidates = filter_all_skills(candidates, skill_names, expansion['skill_alternatives'])
 
     if projects:
         # Search in links (GitHub, portfolio URLs, descriptions)
-        candidates = candidates.filter(
-            Q(links__url__icontains=projects) |
-            Q(links__description__icontains=projects)
+        candidates = filter_related(
+            candidates, 'links',
+            Q(url__icontains=projects) | Q(description__icontains=projects)
         )
 
-    if city:
-        candidates = candidates.filter(account__city__icontains=city)
-
-    if state:
-        candidates = candidates.filter(account__state__icontains=state)
-
-    if country:
-        candidates = candidates.filter(account__country__icontains=country)
-
-    # Remove duplicates that might occur due to joins
-    candidates = candidates.distinct()
+    if city or state or country:
+        candidates = candidates.filter(
+            account__place__in=Location.matching(city=city, state=state, country=country)
+        )
 
     context = {
         'candidates': candidates,
+        'query_error': query_error,
         'template_data': {'title': 'Find Candidates · DevJobs'},
+        **expansion,
     }
     return render(request, 'recruiter/candidate_search.html', context)
 
@@ -536,6 +523,129 @@ def delete_saved_search(request, search_id):
     return redirect('recruiter:saved_searches')
 
 
+@login_required
+@recruiter_required
+@require_http_methods(["GET"])
+def run_saved_search(request, search_id):
+    """
+    API endpoint returning the current candidates for a saved search.
+
+    Pass since=last_run to only return candidates who joined after the
+    previous run, or an ISO timestamp (as returned in "since") to keep
+    paging through the same delta.
+    """
+    search = get_object_or_404(SavedSearch, id=search_id, recruiter=request.user)
+
+    since_param = request.GET.get("since", "").strip()
+    since = None
+    if since_param == "last_run":
+        since = search.last_run_at
+    elif since_param:
+        since = parse_datetime(since_param)
+        if since is None:
+            return JsonResponse({"success": False, "error": "Invalid since value"}, status=400)
+
+    # Pagination
+    limit = request.GET.get("limit", 20)
+    offset = request.GET.get("offset", 0)
+
+    try:
+        limit = int(limit)
+        offset = int(offset)
+    except (ValueError, TypeError):
+        limit = 20
+        offset = 0
+
+    # Ensure reasonable limits
+    limit = min(max(1, limit), 100)  # Between 1 and 100
+    offset = max(0, offset)
+
+    candidates = search.get_matching_candidates(since=since)
+    total_count = candidates.count()
+
+    results = []
+    for applicant in candidates[offset : offset + limit]:
+        account = applicant.account
+        try:
+            privacy_settings = applicant.privacy_settings
+        except ProfilePrivacySettings.DoesNotExist:
+            privacy_settings = ProfilePrivacySettings(applicant=applicant)
+
+        results.append({
+            "id": str(account.id),
+            "username": account.username,
+            "name": account.get_full_name() or account.username,
+            "headline": applicant.headline if privacy_settings.show_headline else "",
+            "city": account.city if privacy_settings.show_location else "",
+            "state": account.state if privacy_settings.show_location else "",
+            "country": account.country if privacy_settings.show_location else "",
+            "skills": [s.skill_name for s in applicant.skills.all()] if privacy_settings.show_skills else [],
+            "date_joined": account.date_joined.isoformat(),
+        })
+
+    # Only the first page of a run advances the delta cursor, so later pages
+    # of the same run still see the same "since" window
+    if offset == 0:
+        search.last_run_at = timezone.now()
+        search.save(update_fields=["last_run_at"])
+
+    return JsonResponse(
+        {
+            "success": True,
+            "data": results,
+            "since": since.isoformat() if since else None,
+            "pagination": {
+                "total_count": total_count,
+                "limit": limit,
+                "offset": offset,
+                "has_next": offset + limit < total_count,
+                "has_previous": offset > 0,
+            },
+        },
+        status=200,
+    )
+
+
+@login_required
+@require_http_methods(["GET"])
+def conversation_history(request, partner_id):
+    """
+    API endpoint returning one page of a conversation, for infinite scroll.
+
+    Returns the latest page, or with before=<cursor> the page of messages
+    preceding it, oldest first, plus the cursor for the next older page
+    (null once the start of the conversation is reached).
+    """
+    partner = get_object_or_404(Account, id=partner_id)
+    before = None
+    if request.GET.get('before'):
+        before = parse_cursor(request.GET['before'])
+        if before is None:
+            return JsonResponse({'success': False, 'error': 'Invalid before cursor'}, status=400)
+
+    page, older_cursor = get_conversation_page(request.user, partner, before=before)
+    return JsonResponse({
+        'success': True,
+        'messages': [
+            {
+                'id': message.pk,
+                'from_me': message.sender_id == request.user.pk,
+                'sender': message.sender.get_full_name() or message.sender.username,
+                'subject': message.subject,
+                'body': message.body,
+                'created_at': message.created_at.isoformat(),
+                'related_job': {
+                    'id': message.related_job.id,
+                    'title': message.related_job.title,
+                    'url': reverse('job:job_detail', args=[message.related_job.id]),
+                } if message.related_job else None,
+            }
+            for message in page
+        ],
+        'older_cursor': older_cursor,
+    })
+
+
 @login_required
 def get_unread_notifications_count(request):
     """API endpoint to get unread notifications count"""
@@ -716,103 +826,65 @@ def candidate_map(request):
     """
     Display candidates on an interactive map with location clustering.
     Respects privacy settings for exact vs approximate locations.
+
+    Markers and clusters are loaded per viewport from candidate_map_clusters,
+    so the page itself only carries the filters and the overall extent.
     """
-    # Get all visible applicants with geocoded locations and privacy settings
-    applicants = (
-        Applicant.objects
-        .select_related('account', 'privacy_settings')
-        .prefetch_related('skills')
-        .filter(
-            Q(privacy_settings__visible_to_recruiters=True) |
-            Q(privacy_settings__isnull=True)  # Include profiles without privacy settings
-        )
-        .filter(
-            account__latitude__isnull=False,
-            account__longitude__isnull=False
-        )
+    applicants, filters = map_applicants(request)
+    extent = applicants.aggregate(
+        count=Count('pk'),
+        south=Min('account__latitude'),
+        north=Max('account__latitude'),
+        west=Min('account__longitude'),
+        east=Max('account__longitude'),
     )
-
-    # Apply search filters from query parameters
-    skills = request.GET.get('skills')
-    if skills:
-        skill_list = [s.strip() for s in skills.split(',')]
-        for skill in skill_list:
-            applicants = applicants.filter(skills__skill_name__icontains=skill)
-
-    city = request.GET.get('city')
-    if city:
-        applicants = applicants.filter(account__city__icontains=city)
-
-    state = request.GET.get('state')
-    if state:
-        applicants = applicants.filter(account__state__icontains=state)
-
-    country = request.GET.get('country')
-    if country:
-        applicants = applicants.filter(account__country__icontains=country)
-
-    # Build candidate data for the map
-    candidates_data = []
-    for applicant in applicants.distinct():
-        privacy_settings = applicant.get_or_create_privacy_settings()
-
-        # Determine what location info to show based on privacy settings
-        show_exact = privacy_settings.show_exact_location
-        show_approx = privacy_settings.show_approximate_location
-
-        # Skip if both location settings are False
-        if not show_exact and not show_approx:
-            continue
-
-        # Get account data
-        account = applicant.account
-
-        # Determine location precision for display
-        if show_exact:
-            location_type = 'exact'
-            location_display = f"{account.street_address}, {account.city}, {account.state}" if account.street_address else f"{account.city}, {account.state}"
-        elif show_approx:
-            location_type = 'approximate'
-            location_display = f"{account.city}, {account.state}"
-        else:
-            continue  # Skip if no location to show
-
-        # Get top skills
-        top_skills = list(applicant.skills.values_list('skill_name', flat=True)[:5])
-
-        candidates_data.append({
-            'id': str(applicant.account.id),
-            'name': account.get_full_name() or account.username,
-            'username': account.username,
-            'headline': applicant.headline if privacy_settings.show_headline else '',
-            'location': location_display,
-            'location_type': location_type,  # 'exact' or 'approximate'
-            'latitude': account.latitude,
-            'longitude': account.longitude,
-            'skills': top_skills if privacy_settings.show_skills else [],
-            'email': account.email if privacy_settings.show_email else None,
-        })
-
-    import json
+    count = extent.pop('count')
+    bounds = None
+    if count:
+        # Pad the extent so it does not pinpoint any single candidate
+        bounds = {
+            'south': math.floor(extent['south'] - POSITION_MARGIN),
+            'north': math.ceil(extent['north'] + POSITION_MARGIN),
+            'west': math.floor(extent['west'] - POSITION_MARGIN),
+            'east': math.ceil(extent['east'] + POSITION_MARGIN),
+        }
 
     context = {
         'template_data': {
             'title': 'Candidate Map · DevJobs'
         },
-        'candidates_json': json.dumps(candidates_data),
-        'candidates_count': len(candidates_data),
+        'candidates_count': count,
+        'bounds': bounds,
         'google_maps_api_key': settings.GOOGLE_MAPS_API_KEY,
-        'filters': {
-            'skills': skills or '',
-            'city': city or '',
-            'state': state or '',
-            'country': country or '',
-        }
+        'filters': filters,
     }
 
     return render(request, 'recruiter/candidate_map.html', context)
 
 
+@login_required
+@recruiter_required
+@require_http_methods(["GET"])
+def candidate_map_clusters(request):
+    """
+    Return candidate clusters for a map viewport as JSON.
+
+    Expects bbox=west,south,east,north and zoom=<level> plus the candidate
+    map filters. From POINTS_ZOOM on, individual markers are returned
+    instead of clusters.
+    """
+    bbox = parse_bbox(request.GET.get('bbox'))
+    zoom = parse_zoom(request.GET.get('zoom'))
+    if bbox is None or zoom is None:
+        return JsonResponse({'error': 'bbox=west,south,east,north and zoom are required'}, status=400)
+
+    applicants, filters = map_applicants(request)
+    try:
+        return JsonResponse(get_clusters(request, applicants, bbox, zoom))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
 @recruiter_required
 @require_http_methods(["GET", "POST"])
 def profile(request):
@@ -840,26 +912,13 @@ def profile(request):
                 user.zip_code = data.get("zip_code", user.zip_code)
                 user.country = data.get("country", user.country)
 
-                # Geocode address if it changed
-                if user.street_address and user.city and user.state:
-                    latitude = data.get("latitude")
-                    longitude = data.get("longitude")
-
-                    # Use provided coordinates or geocode
-                    if latitude and longitude:
-                        user.latitude = float(latitude)
-                        user.longitude = float(longitude)
-                    else:
-                        lat, lng = geocode_address(
-                            street_address=user.street_address,
-                            city=user.city,
-                            state=user.state,
-                            zip_code=user.zip_code,
-                            country=user.country
-                        )
-                        if lat and lng:
-                            user.latitude = lat
-                            user.longitude = lng
+                # Use coordinates picked on the map; otherwise an address change is
+                # queued for the geocode worker by the Account pre_save signal
+                latitude = data.get("latitude")
+                longitude = data.get("longitude")
+                if user.street_address and user.city and user.state and latitude and longitude:
+                    user.latitude = float(latitude)
+                    user.longitude = float(longitude)
 
                 user.save()
 
@@ -0,0 +1,221 @@
+"""
+Shared geographic helpers for distance filtering and sorting in the database.
+
+The HAVERSINE SQL function is registered on every SQLite connection (see
+job.signals), so querysets can filter and ORDER BY great-circle distance
+without loading rows into Python.
+
+Account and JobPosting also carry an indexed geo_cell column: the number of
+the GRID_CELL_DEGREES-sized grid cell containing the coordinates, computed
+by the database from latitude/longitude. Cells are numbered row by row, so
+the cells covering a radius form one contiguous range per grid row and can
+be read from the index with a few range scans.
+"""
+import math
+
+from django.db.models import F, FloatField, Func, IntegerField, Q, Value
+from django.db.models.functions import Cast
+
+EARTH_RADIUS_MILES = 3958.8
+DEFAULT_RADIUS_MILES = 25.0
+MAX_RADIUS_MILES = 500.0
+
+# 0.1 degree cells are about 7 miles tall; cells are numbered row by row
+GRID_CELLS_PER_DEGREE = 10
+GRID_COLUMNS = 360 * GRID_CELLS_PER_DEGREE
+# Above this many grid rows, cover the radius with a single cell range
+MAX_CELL_RANGES = 64
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in miles between two points.
+
+    Returns None when any coordinate is missing, matching SQL NULL handling.
+    """
+    if lat1 is None or lng1 is None or lat2 is None or lng2 is None:
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def register_sql_functions(dbapi_connection):
+    """Register HAVERSINE(lat1, lng1, lat2, lng2) on a sqlite3 connection."""
+    dbapi_connection.create_function("HAVERSINE", 4, haversine, deterministic=True)
+
+
+class Haversine(Func):
+    """Distance in miles from a (latitude, longitude) column pair to a point."""
+
+    function = "HAVERSINE"
+    output_field = FloatField()
+
+    def __init__(self, lat_field, lng_field, lat, lng, **extra):
+        super().__init__(lat_field, lng_field, Value(float(lat)), Value(float(lng)), **extra)
+
+
+def bounding_box(lat, lng, radius):
+    """
+    Return (min_lat, max_lat, min_lng, max_lng) enclosing a radius in miles.
+
+    The longitude bounds are None when the box would wrap around a pole or
+    the antimeridian, in which case only the latitude bounds are usable.
+    """
+    d_lat = math.degrees(radius / EARTH_RADIUS_MILES)
+    min_lat, max_lat = lat - d_lat, lat + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    d_lng = math.degrees(radius / (EARTH_RADIUS_MILES * math.cos(math.radians(lat))))
+    min_lng, max_lng = lng - d_lng, lng + d_lng
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def grid_cell(lat, lng):
+    """Grid cell number for a point, matching grid_cell_expression; None if missing."""
+    if lat is None or lng is None:
+        return None
+    return _grid_row(lat) * GRID_COLUMNS + _grid_column(lng)
+
+
+def cell_center(cell):
+    """(lat, lng) of the center of a grid cell."""
+    row, column = divmod(cell, GRID_COLUMNS)
+    return (
+        (row + 0.5) / GRID_CELLS_PER_DEGREE - 90,
+        (column + 0.5) / GRID_CELLS_PER_DEGREE - 180,
+    )
+
+
+def _grid_row(lat):
+    # Truncation equals floor here because the offset makes the value non-negative
+    return int((lat + 90) * GRID_CELLS_PER_DEGREE)
+
+
+def _grid_column(lng):
+    return int((lng + 180) * GRID_CELLS_PER_DEGREE)
+
+
+def grid_cell_expression(lat_field="latitude", lng_field="longitude"):
+    """Database expression for the grid cell of a row, used by GeneratedField."""
+    row = Cast((F(lat_field) + 90) * GRID_CELLS_PER_DEGREE, IntegerField())
+    column = Cast((F(lng_field) + 180) * GRID_CELLS_PER_DEGREE, IntegerField())
+    return row * GRID_COLUMNS + column
+
+
+def covering_cell_ranges(lat, lng, radius):
+    """
+    Inclusive (first, last) grid cell ranges covering a radius around a point.
+
+    There is one range per grid row of the bounding box, or a single range
+    spanning whole rows when the box wraps or covers too many rows.
+    """
+    return bbox_cell_ranges(*bounding_box(lat, lng, radius))
+
+
+def bbox_cell_ranges(min_lat, max_lat, min_lng=None, max_lng=None):
+    """Inclusive (first, last) grid cell ranges covering a bounding box."""
+    first_row, last_row = _grid_row(max(min_lat, -90.0)), _grid_row(min(max_lat, 90.0))
+    if min_lng is None or last_row - first_row + 1 > MAX_CELL_RANGES:
+        return [(first_row * GRID_COLUMNS, (last_row + 1) * GRID_COLUMNS - 1)]
+
+    first_column, last_column = _grid_column(max(min_lng, -180.0)), _grid_column(min(max_lng, 180.0))
+    return [
+        (row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column)
+        for row in range(first_row, last_row + 1)
+    ]
+
+
+def cell_ranges_q(cell_field, ranges):
+    """Q matching rows whose grid cell falls in any of the given ranges."""
+    cells = Q()
+    for first, last in ranges:
+        cells |= Q(**{f"{cell_field}__range": (first, last)})
+    return cells
+
+
+def filter_bbox(queryset, min_lat, max_lat, min_lng, max_lng,
+                lat_field="latitude", lng_field="longitude", cell_field="geo_cell"):
+    """Restrict a queryset to rows inside a bounding box, read through the grid cell index."""
+    return queryset.filter(
+        cell_ranges_q(cell_field, bbox_cell_ranges(min_lat, max_lat, min_lng, max_lng)),
+        **{f"{lat_field}__range": (min_lat, max_lat), f"{lng_field}__range": (min_lng, max_lng)},
+    )
+
+
+def filter_viewport(queryset, bbox, lat_field="latitude", lng_field="longitude", cell_field="geo_cell"):
+    """
+    Restrict a queryset to a (west, south, east, north) map viewport.
+
+    A viewport crossing the antimeridian (west > east) is read as two boxes.
+    """
+    west, south, east, north = bbox
+    if west <= east:
+        return filter_bbox(queryset, south, north, west, east, lat_field, lng_field, cell_field)
+    return (
+        filter_bbox(queryset, south, north, west, 180, lat_field, lng_field, cell_field)
+        | filter_bbox(queryset, south, north, -180, east, lat_field, lng_field, cell_field)
+    )
+
+
+def parse_bbox(value):
+    """Parse "west,south,east,north" in degrees; return the tuple or None if invalid."""
+    try:
+        west, south, east, north = (float(part) for part in (value or "").split(","))
+    except ValueError:
+        return None
+    if not all(math.isfinite(v) for v in (west, south, east, north)):
+        return None
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south < north <= 90):
+        return None
+    return west, south, east, north
+
+
+def parse_near(value):
+    """Parse a "lat,lng" query parameter; return (lat, lng) or None if invalid."""
+    try:
+        lat, lng = (float(part) for part in (value or "").split(","))
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def parse_radius(value, default=DEFAULT_RADIUS_MILES):
+    """Parse a radius in miles, clamped to (0, MAX_RADIUS_MILES]."""
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(radius) or radius <= 0:
+        return default
+    return min(radius, MAX_RADIUS_MILES)
+
+
+def filter_near(queryset, lat, lng, radius, lat_field="latitude", lng_field="longitude", cell_field=None):
+    """
+    Restrict a queryset to rows within radius miles of a point, nearest first.
+
+    A prefilter discards far rows before the HAVERSINE call: the covering
+    grid cells when cell_field is given, otherwise a bounding box on the raw
+    columns. Rows are annotated with ``distance`` in miles.
+    """
+    if cell_field:
+        queryset = queryset.filter(cell_ranges_q(cell_field, covering_cell_ranges(lat, lng, radius)))
+    else:
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius)
+        queryset = queryset.filter(**{f"{lat_field}__range": (min_lat, max_lat)})
+        if min_lng is not None:
+            queryset = queryset.filter(**{f"{lng_field}__range": (min_lng, max_lng)})
+    return (
+        queryset
+        .annotate(distance=Haversine(lat_field, lng_field, lat, lng))
+        .filter(distance__lte=radius)
+        .order_by("distance")
+    )
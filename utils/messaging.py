@@ -1,14 +1,67 @@
 """
 Shared messaging utilities for handling conversations between users.
 """
+from django.core.exceptions import ValidationError
 from django.db.models import Q
-from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_datetime
 
-from recruiter.models import Message
+from recruiter.models import Conversation, Message
 
 User = get_user_model()
 
+# Messages shown per page of conversation history
+MESSAGE_PAGE_SIZE = 50
+
+
+def encode_cursor(message):
+    """Keyset cursor pointing just before a message: "<created_at ISO>,<id>"."""
+    return f"{message.created_at.isoformat()},{message.pk}"
+
+
+def parse_cursor(value):
+    """Parse a cursor from encode_cursor; return (created_at, id) or None if invalid."""
+    created_at, _, pk = (value or "").rpartition(",")
+    try:
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if created_at is None:
+        return None
+    return created_at, pk
+
+
+def get_conversation_page(user, partner, before=None, page_size=MESSAGE_PAGE_SIZE):
+    """
+    One page of the messages between user and partner, oldest first.
+
+    Pages are read newest first with a keyset on (created_at, id), so
+    loading older history costs the same however long the thread is.
+
+    Args:
+        before: (created_at, id) cursor from parse_cursor, or None for the latest page
+
+    Returns:
+        Tuple of (messages, cursor for the next older page or None)
+    """
+    messages = Message.objects.filter(
+        Q(sender=user, recipient=partner) |
+        Q(sender=partner, recipient=user)
+    )
+    if before:
+        created_at, pk = before
+        # created_at <= cursor keeps the thread index usable; ties are broken by id
+        messages = messages.filter(created_at__lte=created_at).exclude(created_at=created_at, pk__gte=pk)
+
+    page = list(
+        messages.select_related('sender', 'recipient', 'related_job').order_by('-created_at', '-pk')[:page_size + 1]
+    )
+    older_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    page = page[:page_size]
+    page.reverse()
+    return page, older_cursor
+
 
 def get_messages_context(request):
     """
@@ -23,67 +76,46 @@ def get_messages_context(request):
     Returns:
         dict: Context dictionary containing:
             - conversations: List of conversation data
-            - selected_conversation: Selected conversation details (if any)
+            - selected_conversation: Selected conversation details (if any),
+              with one page of messages and the cursor for older ones
     """
-    # Get all unique conversations (people the user has messaged or been messaged by)
-    sent_to = Message.objects.filter(sender=request.user).values_list('recipient', flat=True).distinct()
-    received_from = Message.objects.filter(recipient=request.user).values_list('sender', flat=True).distinct()
+    partner_id = request.GET.get('partner_id')
 
-    # Get all conversation partners
-    all_conversation_partners = set(sent_to) | set(received_from)
+    # One indexed query over the denormalized conversation summaries
+    rows = Conversation.for_user(request.user).select_related('user_a', 'user_b', 'last_message__sender')
 
-    # Create conversation data with latest message and unread count
     conversations = []
-    for partner_id in all_conversation_partners:
-        partner = User.objects.get(id=partner_id)
-
-        # Get latest message in this conversation
-        latest_message = Message.objects.filter(
-            Q(sender=request.user, recipient=partner) |
-            Q(sender=partner, recipient=request.user)
-        ).order_by('-created_at').first()
-
-        # Count unread messages from this partner
-        unread_count = Message.objects.filter(
-            sender=partner,
-            recipient=request.user,
-            is_read=False
-        ).count()
-
-        # Mark messages as read when viewing conversation
-        if request.GET.get('partner_id') == str(partner_id):
-            Message.objects.filter(
-                sender=partner,
-                recipient=request.user,
-                is_read=False
-            ).update(is_read=True)
+    for conversation in rows:
+        partner = conversation.partner_of(request.user)
+        is_active = partner_id == str(partner.pk)
+
+        # Mark messages as read when viewing conversation, whatever the stored count says
+        if is_active:
+            conversation.mark_read(request.user)
 
         conversations.append({
             'partner': partner,
-            'latest_message': latest_message,
-            'unread_count': unread_count,
-            'is_active': request.GET.get('partner_id') == str(partner_id)
+            'latest_message': conversation.last_message,
+            'unread_count': conversation.unread_for(request.user),
+            'is_active': is_active,
         })
 
-    # Sort conversations by latest message date
-    conversations.sort(key=lambda x: x['latest_message'].created_at if x['latest_message'] else timezone.now() - timezone.timedelta(days=365), reverse=True)
-
-    # Get messages for selected conversation
+    # Get the latest page (or an older page, with ?before=<cursor>) of the selected conversation
     selected_conversation = None
-    if request.GET.get('partner_id'):
+    if partner_id:
         try:
-            partner = User.objects.get(id=request.GET.get('partner_id'))
-            conversation_messages = Message.objects.filter(
-                Q(sender=request.user, recipient=partner) |
-                Q(sender=partner, recipient=request.user)
-            ).select_related('sender', 'recipient', 'related_job').order_by('created_at')
-
+            partner = User.objects.get(id=partner_id)
+        except (User.DoesNotExist, ValidationError):
+            partner = None
+        if partner:
+            conversation_messages, older_cursor = get_conversation_page(
+                request.user, partner, before=parse_cursor(request.GET.get('before'))
+            )
             selected_conversation = {
                 'partner': partner,
-                'messages': conversation_messages
+                'messages': conversation_messages,
+                'older_cursor': older_cursor,
             }
-        except User.DoesNotExist:
-            pass
 
     return {
         'conversations': conversations,
@@ -0,0 +1,292 @@
+"""
+Query-plan regression tests for the hot views.
+
+Each test requests a view against a seeded SQLite database, runs every SELECT
+it issued under EXPLAIN QUERY PLAN, and checks that the expected indexes are
+used and that no large table is read with a full table scan.
+"""
+import random
+import re
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from account.models import Account
+from applicant.models import Applicant, Application, Skill
+from job.models import JobPosting, JobSkill
+from recruiter.models import Message, Notification, Recruiter
+
+# Tables that grow with usage; a plain "SCAN <table>" on these is a regression
+LARGE_TABLES = {
+    'account_account',
+    'applicant_applicant',
+    'applicant_skill',
+    'applicant_application',
+    'job_jobposting',
+    'job_jobskill',
+    'recruiter_conversation',
+    'recruiter_message',
+    'recruiter_notification',
+}
+
+# Django's deterministic names for the Account.place foreign key index and the
+# (applicant, skill_name) unique constraint on Skill
+ACCOUNT_PLACE_INDEX = 'account_account_place_id_c3f0478f'
+SKILL_UNIQUE_INDEX = 'applicant_skill_applicant_id_skill_name_b7d753a6_uniq'
+
+CITIES = ['Atlanta', 'Boston', 'Austin', 'Denver', 'Seattle']
+SKILLS = ['Python', 'Django', 'React', 'Java', 'JavaScript', 'Go', 'Rust', 'SQL', 'AWS', 'Docker']
+
+
+class QueryPlanTestCase(TestCase):
+    """Test cases asserting index usage for hot query paths"""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seed enough rows that the planner has real choices to make"""
+        rng = random.Random(2340)
+
+        Account.objects.bulk_create([
+            Account(
+                username=f'user{i}',
+                city=rng.choice(CITIES),
+                state='GA',
+                country='USA',
+                zip_code='30332',
+                latitude=33.0 + rng.random(),
+                longitude=-84.0 - rng.random(),
+            )
+            for i in range(300)
+        ])
+        accounts = list(Account.objects.order_by('username'))
+        applicant_accounts, recruiter_accounts = accounts[:270], accounts[270:]
+
+        Applicant.objects.bulk_create([Applicant(account=a) for a in applicant_accounts])
+        Recruiter.objects.bulk_create([Recruiter(account=a) for a in recruiter_accounts])
+        Skill.objects.bulk_create([
+            Skill(applicant_id=a.pk, skill_name=name)
+            for a in applicant_accounts
+            for name in rng.sample(SKILLS, 4)
+        ])
+
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                owner=rng.choice(recruiter_accounts),
+                title=f'Job {i}',
+                job_type=rng.choice(['full-time', 'remote', 'contract']),
+                is_active=rng.random() < 0.8,
+                latitude=33.0 + rng.random(),
+                longitude=-84.0 - rng.random(),
+            )
+            for i in range(200)
+        ])
+        jobs = list(JobPosting.objects.all())
+        JobSkill.objects.bulk_create([
+            JobSkill(job=job, skill_name=name, importance_level=rng.choice(['required', 'preferred']))
+            for job in jobs
+            for name in rng.sample(SKILLS, 3)
+        ])
+        Application.objects.bulk_create([
+            Application(applicant=rng.choice(applicant_accounts), job=rng.choice(jobs))
+            for _ in range(600)
+        ], ignore_conflicts=True)
+
+        cls.recruiter_user = recruiter_accounts[0]
+        cls.applicant_user = applicant_accounts[0]
+        cls.job = jobs[0]
+        cls.job.owner = cls.recruiter_user
+        cls.job.save()
+
+        Message.objects.bulk_create([
+            Message(
+                sender=rng.choice(accounts[:20] + [cls.applicant_user]),
+                recipient=rng.choice(accounts[:20] + [cls.recruiter_user]),
+                subject='Hello',
+                body='Body',
+                is_read=rng.random() < 0.5,
+            )
+            for _ in range(1000)
+        ])
+        call_command('backfill_conversations', stdout=StringIO())
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=rng.choice(accounts),
+                notification_type='system',
+                title='Notice',
+                message='Body',
+                is_read=rng.random() < 0.5,
+            )
+            for _ in range(1000)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def capture_plans(self, user, url, params=None):
+        """
+        Request a URL and return (sql, plan lines) for every distinct SELECT it ran.
+        """
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+
+        plans = []
+        seen = set()
+        with connection.cursor() as cursor:
+            for query in captured.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or sql in seen:
+                    continue
+                seen.add(sql)
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assertIndexUsed(self, plans, index_name):
+        lines = [line for _, plan in plans for line in plan]
+        self.assertTrue(
+            any(re.search(rf'\bINDEX {re.escape(index_name)}\b', line) for line in lines),
+            f'Expected index {index_name} in query plans:\n' + '\n'.join(lines)
+        )
+
+    def assertNoFullTableScan(self, plans):
+        for sql, plan in plans:
+            # Subqueries name their tables by alias (e.g. "applicant_skill" U0)
+            aliases = dict((alias, table) for table, alias in re.findall(r'"(\w+)" (U\d+)\b', sql))
+            for line in plan:
+                # Scanning a whole index is no better than scanning the table
+                match = re.match(r'SCAN (\w+)', line)
+                table = match and aliases.get(match.group(1), match.group(1))
+                if table in LARGE_TABLES:
+                    self.fail(f'Full table scan of {table}:\n{sql}\n' + '\n'.join(plan))
+
+    def test_search_jobs(self):
+        """Test that job search reads active postings through the listing index"""
+        plans = self.capture_plans(self.applicant_user, reverse('job:search_jobs'), {'title': 'Job'})
+
+        self.assertIndexUsed(plans, 'job_active_created_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_search_jobs_skill_expansion(self):
+        """Test that skill expansion is an indexed lookup on the co-occurrence table"""
+        plans = self.capture_plans(self.applicant_user, reverse('job:search_jobs'), {'skills': 'Python,Django'})
+
+        self.assertIndexUsed(plans, 'skill_cooccurrence_rank_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_search_jobs_near(self):
+        """Test that the distance search prefilters on the grid cell index"""
+        plans = self.capture_plans(
+            self.applicant_user, reverse('job:search_jobs'), {'near': '33.5,-84.5', 'radius': '25'}
+        )
+
+        self.assertIndexUsed(plans, 'job_active_geo_cell_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_job_map_data(self):
+        """Test that the job map viewport is read through an active-jobs location index"""
+        plans = self.capture_plans(self.applicant_user, reverse('job:job_map_data'), {'bbox': '-84.5,33.2,-84.3,33.4'})
+
+        # Either the grid cell ranges or the latitude range may drive the search
+        lines = [line for _, plan in plans for line in plan]
+        self.assertTrue(
+            any(re.search(r'\bINDEX job_active_(geo_cell|lat_lng)_idx\b', line) for line in lines),
+            'Expected an active-jobs location index in query plans:\n' + '\n'.join(lines)
+        )
+        self.assertNoFullTableScan(plans)
+
+    def test_candidate_search(self):
+        """Test that candidate search by skill and city starts from the matching places"""
+        plans = self.capture_plans(
+            self.recruiter_user,
+            reverse('recruiter:candidate_search'),
+            {'skills': 'Python,Django', 'city': 'Atlanta'}
+        )
+
+        self.assertIndexUsed(plans, ACCOUNT_PLACE_INDEX)
+        self.assertIndexUsed(plans, SKILL_UNIQUE_INDEX)
+        self.assertNoFullTableScan(plans)
+
+    def test_applicant_search(self):
+        """Test that the applicant search API starts from the matching places"""
+        plans = self.capture_plans(
+            self.recruiter_user,
+            reverse('applicant:applicant_search'),
+            {'skill': 'Python', 'city': 'Atlanta'}
+        )
+
+        self.assertIndexUsed(plans, ACCOUNT_PLACE_INDEX)
+        self.assertIndexUsed(plans, SKILL_UNIQUE_INDEX)
+        self.assertNoFullTableScan(plans)
+
+    def test_candidate_recommendations(self):
+        """Test that recommendations look up applicants by skill name"""
+        plans = self.capture_plans(self.recruiter_user, reverse('recruiter:job_detail', args=[self.job.pk]))
+
+        self.assertIndexUsed(plans, 'skill_name_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_messages_context(self):
+        """Test that the inbox reads the conversation summaries through their indexes"""
+        plans = self.capture_plans(self.applicant_user, reverse('applicant:messages'))
+
+        self.assertIndexUsed(plans, 'conversation_a_activity_idx')
+        self.assertIndexUsed(plans, 'conversation_b_activity_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_messages_context_selected_conversation(self):
+        """Test that an open conversation uses the thread and unread indexes"""
+        plans = self.capture_plans(
+            self.applicant_user, reverse('applicant:messages'), {'partner_id': str(self.recruiter_user.pk)}
+        )
+
+        self.assertIndexUsed(plans, 'message_thread_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_unread_notifications_count(self):
+        """Test that unread counts are answered from the notification index"""
+        plans = self.capture_plans(self.recruiter_user, reverse('recruiter:unread_notifications_count'))
+
+        self.assertIndexUsed(plans, 'notif_recipient_read_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_candidate_map(self):
+        """Test that the candidate map filters start from the matching places"""
+        plans = self.capture_plans(
+            self.recruiter_user,
+            reverse('recruiter:candidate_map'),
+            {'skills': 'Python', 'city': 'Atlanta'}
+        )
+
+        self.assertIndexUsed(plans, ACCOUNT_PLACE_INDEX)
+        self.assertIndexUsed(plans, SKILL_UNIQUE_INDEX)
+        self.assertNoFullTableScan(plans)
+
+    def test_candidate_map_near(self):
+        """Test that the candidate map radius filter reads the grid cell index"""
+        plans = self.capture_plans(
+            self.recruiter_user,
+            reverse('recruiter:candidate_map'),
+            {'near': '33.5,-84.5', 'radius': '25'}
+        )
+
+        self.assertIndexUsed(plans, 'account_geo_cell_idx')
+        self.assertNoFullTableScan(plans)
+
+    def test_candidate_map_clusters(self):
+        """Test that map tiles are read through the grid cell index"""
+        plans = self.capture_plans(
+            self.recruiter_user,
+            reverse('recruiter:candidate_map_clusters'),
+            {'bbox': '-85,33,-84,34', 'zoom': '8'}
+        )
+
+        self.assertIndexUsed(plans, 'account_geo_cell_idx')
+        self.assertNoFullTableScan(plans)